@@ -5,7 +5,11 @@ import json
 import pickle
 import random
 import re
+import select
+import shlex
 import socket
+import threading
+from contextlib import contextmanager
 from distutils.version import LooseVersion
 from time import sleep, time
 
@@ -13,6 +17,7 @@ import paramiko
 import requests
 import yaml
 
+from ceph import sftp
 from ceph.parallel import parallel
 from cli.ceph.ceph import Ceph as CephCli
 from utility import lvm_utils
@@ -161,74 +166,70 @@ class Ceph(object):
         """
         Open required ports on nodes based on relevant ceph demons types
         """
-        for node in self.get_nodes():
-            ports = list()
-            if node.role == "mon":
-                ports += ["6789"]
+        with parallel() as p:
+            for node in self.get_nodes():
+                p.spawn(self._open_ceph_ports, node)
 
-                # for upgrades from 2.5 to 3.x, we convert mon to mgr
-                # so lets open ports from 6800 to 6820
-                ports += ["6800-6820"]
+    @staticmethod
+    def _open_ceph_ports(node):
+        """Open the ports of the ceph daemons of the node."""
+        ports = list()
+        if node.role == "mon":
+            ports += ["6789"]
 
-            if node.role == "osd":
-                ports += ["6800-7300"]
+            # for upgrades from 2.5 to 3.x, we convert mon to mgr
+            # so lets open ports from 6800 to 6820
+            ports += ["6800-6820"]
 
-            if node.role == "mgr":
-                ports += ["6800-6820"]
+        if node.role == "osd":
+            ports += ["6800-7300"]
 
-            if node.role == "mds":
-                ports += ["6800"]
+        if node.role == "mgr":
+            ports += ["6800-6820"]
 
-            if node.role == "iscsi-gw":
-                ports += ["3260", "5000-5001"]
+        if node.role == "mds":
+            ports += ["6800"]
 
-            if node.role == "grafana":
-                ports += ["6800-6820"]
+        if node.role == "iscsi-gw":
+            ports += ["3260", "5000-5001"]
+
+        if node.role == "grafana":
+            ports += ["6800-6820"]
 
-            if ports:
-                node.configure_firewall()
-                node.open_firewall_port(port=ports, protocol="tcp")
+        if ports:
+            node.configure_firewall()
+            node.open_firewall_port(port=ports, protocol="tcp")
 
     def setup_ssh_keys(self):
         """
         Generate and distribute ssh keys within cluster
+
+        The keys are generated on all the nodes at once, then the authorized
+        keys, hosts and ssh config entries of the cluster are written to every
+        node by a single script, replacing the entries of the earlier runs.
         """
-        keys = ""
-        hosts = ""
-        hostkeycheck = (
-            "Host *\n\tStrictHostKeyChecking no\n\tServerAliveInterval 2400\n"
+        nodes = self.get_nodes()
+        with parallel() as p:
+            for ceph in nodes:
+                p.spawn(ceph.generate_id_rsa)
+
+        keys = dict.fromkeys(ceph.id_rsa_pub.strip() for ceph in nodes)
+        hosts = dict.fromkeys(
+            f"{ceph.ip_address}\t{ceph.hostname}\t{ceph.shortname}" for ceph in nodes
         )
-        for ceph in self.get_nodes():
-            ceph.generate_id_rsa()
-            keys = keys + ceph.id_rsa_pub
-            hosts = (
-                hosts
-                + ceph.ip_address
-                + "\t"
-                + ceph.hostname
-                + "\t"
-                + ceph.shortname
-                + "\n"
-            )
-        for ceph in self.get_nodes():
-            keys_file = ceph.remote_file(
-                file_name=".ssh/authorized_keys", file_mode="a"
-            )
-            hosts_file = ceph.remote_file(
-                sudo=True, file_name="/etc/hosts", file_mode="a"
-            )
-            ceph.exec_command(
-                cmd="[ -f ~/.ssh/config ] && chmod 700 ~/.ssh/config", check_ec=False
-            )
-            ssh_config = ceph.remote_file(file_name=".ssh/config", file_mode="a")
-            keys_file.write(keys)
-            hosts_file.write(hosts)
-            ssh_config.write(hostkeycheck)
-            keys_file.flush()
-            hosts_file.flush()
-            ssh_config.flush()
-            ceph.exec_command(cmd="chmod 600 ~/.ssh/authorized_keys")
-            ceph.exec_command(cmd="chmod 400 ~/.ssh/config")
+        names = sorted({name for c in nodes for name in (c.hostname, c.shortname)})
+        payload = {
+            "KEYS": "\n".join(keys),
+            "HOSTS": "\n".join(hosts),
+            "HOSTNAMES": " ".join(names),
+            "SSH_CONFIG": SSH_CLIENT_CONFIG,
+        }
+        script = "".join(f"{k}={shlex.quote(v)}\n" for k, v in payload.items())
+        script += SSH_SETUP_SCRIPT
+
+        with parallel() as p:
+            for ceph in nodes:
+                p.spawn(ceph.exec_command, cmd="bash -s", stdin=script)
 
     def generate_ansible_inventory(
         self, device_to_add=None, mixed_lvm_confs=None, filestore=False
@@ -1140,6 +1141,127 @@ class Ceph(object):
         return json.loads(CephCli(node).mgr.services(**args)[0])
 
 
+READ_BUFFER_SIZE = 65536
+READ_POLL_INTERVAL = 1
+SSH_PORT = 22
+SSH_READY_INTERVAL = 2
+# Prefix of the lines carrying the node facts in the output of the setup script.
+NODE_FACT_MARKER = "@@cephci-fact"
+NODE_SETUP_SCRIPT = """
+dmesg > /dev/null
+echo '{username}:{password}' | chpasswd
+echo 'root:{root_password}' | chpasswd
+echo 120 > /proc/sys/net/ipv4/tcp_keepalive_time
+echo 60 > /proc/sys/net/ipv4/tcp_keepalive_intvl
+echo 20 > /proc/sys/net/ipv4/tcp_keepalive_probes
+grep -qs '^TMOUT=600' ~{username}/.bashrc || echo 'TMOUT=600' >> ~{username}/.bashrc
+ls / ; uptime ; date
+echo "{marker} hostname=$({hostname_cmd})"
+echo "{marker} internal_ip=$(/sbin/ifconfig eth0 | grep 'inet ' | awk '{{ print $2}}')"
+[ -f /etc/redhat-release ] && echo "{marker} pkg_type=rpm" || echo "{marker} pkg_type=deb"
+"""
+# Gathers the cached node facts, every line of a fact is prefixed by marker:name
+NODE_FACTS_SCRIPT = """
+fact() {{ name=$1; shift; "$@" 2> /dev/null | sed "s/^/{marker}:$name /"; }}
+fact os_release cat /etc/os-release
+fact release cat /etc/redhat-release
+fact uname uname -a
+fact kernel uname -r
+fact cpus nproc
+fact cpu_model grep -m1 '^model name' /proc/cpuinfo
+fact memory grep -m1 '^MemTotal' /proc/meminfo
+fact interfaces ip -o addr show
+fact disks lsblk -dn -o NAME,SIZE,TYPE
+fact container_runtime sh -c 'command -v podman || command -v docker'
+"""
+
+
+def parse_node_facts(output):
+    """Return the node facts found in the output of NODE_FACTS_SCRIPT."""
+    prefix = f"{NODE_FACT_MARKER}:"
+    raw = dict()
+    for line in output.splitlines():
+        if line.startswith(prefix):
+            name, _, value = line[len(prefix) :].partition(" ")
+            raw.setdefault(name, []).append(value)
+
+    def first(name, default=""):
+        return raw.get(name, [default])[0].strip()
+
+    distro_info = dict()
+    for line in raw.get("os_release", []):
+        key, sep, value = line.strip().partition("=")
+        if sep:
+            distro_info[key] = value.strip('"')
+
+    interfaces = dict()
+    for line in raw.get("interfaces", []):
+        # 2: eth0    inet 10.0.0.1/24 brd 10.0.0.255 scope global eth0
+        fields = line.split()
+        if len(fields) > 3:
+            interfaces.setdefault(fields[1], []).append(fields[3])
+
+    memory = first("memory", "MemTotal: 0 kB").split()
+    return {
+        "distro_info": distro_info,
+        "release": "\n".join(raw.get("release", [])),
+        "uname": "\n".join(raw.get("uname", [])),
+        "kernel": first("kernel"),
+        "cpus": int(first("cpus", "0") or 0),
+        "cpu_model": first("cpu_model").partition(":")[2].strip(),
+        "memory_mb": int(memory[1]) // 1024 if len(memory) > 1 else 0,
+        "interfaces": interfaces,
+        "disks": [
+            dict(zip(["name", "size", "type"], line.split()))
+            for line in raw.get("disks", [])
+            if line.strip()
+        ],
+        "container_runtime": first("container_runtime").rpartition("/")[2],
+    }
+
+
+SSH_CLIENT_CONFIG = "Host *\n\tStrictHostKeyChecking no\n\tServerAliveInterval 2400"
+# Replaces the block of cluster entries in the files. In authorized_keys and
+# /etc/hosts the copies of the entries appended by earlier runs are dropped, as
+# are the stale /etc/hosts lines of the cluster hosts, in case their addresses
+# changed. The ssh config is made of stanzas, only its block is replaced.
+SSH_SETUP_SCRIPT = r"""
+set -e
+BEGIN='# BEGIN cephci cluster'
+END='# END cephci cluster'
+
+update() {
+    tmp=$(mktemp)
+    { [ -f "$1" ] && $4 cat "$1"; true; } | ENTRIES="$2" NAMES="$5" awk \
+        -v begin="$BEGIN" -v end="$END" -v dedup="$3" '
+        BEGIN {
+            n = split(ENVIRON["ENTRIES"], lines, "\n")
+            for (i = 1; i <= n; i++) if (lines[i] != "") seen[lines[i]] = 1
+            n = split(ENVIRON["NAMES"], names, " ")
+            for (i = 1; i <= n; i++) name[names[i]] = 1
+        }
+        $0 == begin { skip = 1; next }
+        $0 == end { skip = 0; next }
+        skip || (dedup && $0 in seen) { next }
+        $1 !~ /^(127\.|::1$)/ { for (i = 2; i <= NF; i++) if ($i in name) next }
+        { print }
+        ' > "$tmp"
+    printf '%s\n%s\n%s\n' "$BEGIN" "$2" "$END" >> "$tmp"
+    $4 cp "$tmp" "$1"
+    rm -f "$tmp"
+}
+
+mkdir -p ~/.ssh && chmod 700 ~/.ssh
+if [ -f ~/.ssh/config ]; then chmod 600 ~/.ssh/config; fi
+# Only the files of one independent entry per line are de-duplicated
+update ~/.ssh/authorized_keys "$KEYS" 1
+update ~/.ssh/config "$SSH_CONFIG" 0
+update /etc/hosts "$HOSTS" 1 sudo "$HOSTNAMES"
+chmod 600 ~/.ssh/authorized_keys
+chmod 400 ~/.ssh/config
+"""
+
+
 class CommandFailed(Exception):
     pass
 
@@ -1172,21 +1294,119 @@ def read_stream(channel, end_time, timeout, stderr=False, log=True):
     Raises:
       TimeoutException: if reading from the channel exceeds the allocated time.
     """
-    _output = ""
+    _output = bytearray()
+    _logged = 0
     _stream = channel.recv_stderr if stderr else channel.recv
-    _data = _stream(2048)
+    _log = logger.error if stderr else logger.debug
+    _data = _stream(READ_BUFFER_SIZE)
 
     while _data:
-        _output += _data.decode("utf-8")
+        _output += _data
         if log:
-            for _ln in _data.splitlines():
-                _log = logger.error if stderr else logger.debug
-                _log(_ln.decode("utf-8"))
+            _logged = _log_lines(_output, _logged, _log)
 
         check_timeout(end_time, timeout)
-        _data = _stream(2048)
+        _data = _stream(READ_BUFFER_SIZE)
+
+    if log:
+        _log_lines(_output, _logged, _log, flush=True)
+
+    return _output.decode("utf-8", errors="replace")
 
-    return _output
+
+def _log_lines(buffer, offset, log, flush=False):
+    """Logs the complete lines found in buffer after the given offset.
+
+    Args:
+      buffer: bytearray holding the data read so far.
+      offset: position in the buffer up to which data has been logged.
+      log: logger method to be used.
+      flush: log the trailing partial line as well. Default is False.
+
+    Returns:
+      the new offset up to which the buffer has been logged.
+    """
+    _end = len(buffer) if flush else buffer.rfind(b"\n", offset) + 1
+    if _end <= offset:
+        return offset
+
+    for _ln in bytes(buffer[offset:_end]).splitlines():
+        log(_ln.decode("utf-8", errors="replace"))
+
+    return _end
+
+
+def read_channel(channel, end_time, timeout, log=True, stream=None):
+    """Reads stdout and stderr of the given channel till the command exits.
+
+    Instead of polling the channel at fixed intervals, the method waits on the
+    channel's file descriptor and returns as soon as the remote command has
+    exited and the buffered data has been consumed.
+
+    Args:
+      channel: the paramiko.Channel object on which the command is executing.
+      end_time: maximum allocated time for the command.
+      timeout: Flag to check if timeout must be enforced.
+      log: log the output. Default is True.
+      stream: callable fed with the stdout data as it arrives, instead of
+              collecting it.
+
+    Returns:
+      a tuple of strings having the stdout and stderr data. stdout is empty
+      when streamed.
+
+    Raises:
+      TimeoutException: if the command exceeds the allocated time.
+    """
+    _out, _err = bytearray(), bytearray()
+    _out_logged, _err_logged = 0, 0
+
+    while True:
+        # Read before the buffers, so that an idle pass after it proves that the
+        # output sent before the exit status has been received.
+        _exited = channel.exit_status_ready()
+        _idle = True
+        if channel.recv_ready():
+            _idle = False
+            if stream:
+                stream(channel.recv(READ_BUFFER_SIZE))
+            else:
+                _out += channel.recv(READ_BUFFER_SIZE)
+                if log:
+                    _out_logged = _log_lines(_out, _out_logged, logger.debug)
+
+        if channel.recv_stderr_ready():
+            _idle = False
+            _err += channel.recv_stderr(READ_BUFFER_SIZE)
+            if log:
+                _err_logged = _log_lines(_err, _err_logged, logger.error)
+
+        check_timeout(end_time, timeout)
+        if not _idle:
+            continue
+
+        if _exited:
+            break
+
+        _wait = READ_POLL_INTERVAL
+        if timeout:
+            _remaining = (end_time - datetime.datetime.now()).total_seconds()
+            _wait = max(min(_wait, _remaining), 0)
+
+        if channel.eof_received:
+            # The descriptor stays readable post EOF, wait for the exit status.
+            channel.status_event.wait(_wait)
+        else:
+            select.select([channel], [], [], _wait)
+
+    if log:
+        _log_lines(_out, _out_logged, logger.debug, flush=True)
+        _log_lines(_err, _err_logged, logger.error, flush=True)
+
+    return (
+        _out.decode("utf-8", errors="replace"),
+        _err.decode("utf-8", errors="replace"),
+    )
 
 
 class RolesContainer(object):
@@ -1262,7 +1482,38 @@ class NodeVolume(object):
         self.path = path
 
 
+class SSHMetrics(object):
+    """Channel usage metrics collected for a SSH connection."""
+
+    def __init__(self):
+        self.channels = 0
+        self.in_flight = 0
+        self.failures = 0
+        self.queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.open_time = 0.0
+        self.command_time = 0.0
+        self.sftp_sessions = 0
+        self.sftp_reuses = 0
+
+    def as_dict(self):
+        """Return the metrics along with the derived averages."""
+        _metrics = dict(self.__dict__)
+        _count = self.channels or 1
+        _metrics["avg_queue_wait"] = self.queue_wait / _count
+        _metrics["avg_open_time"] = self.open_time / _count
+        _metrics["avg_command_time"] = self.command_time / _count
+
+        return _metrics
+
+
 class SSHConnectionManager(object):
+    # OpenSSH refuses new sessions beyond MaxSessions (default 10) per connection.
+    DEFAULT_MAX_CHANNELS = 10
+    KEEPALIVE_INTERVAL = 15
+    # Idle SFTP sessions kept open for reuse, they hold on to their channel slot.
+    SFTP_IDLE_SESSIONS = 1
+
     def __init__(
         self,
         ip_address,
@@ -1271,30 +1522,50 @@ class SSHConnectionManager(object):
         look_for_keys=False,
         private_key_file_path="",
         outage_timeout=600,
+        max_channels=DEFAULT_MAX_CHANNELS,
     ):
         self.ip_address = ip_address
         self.username = username
         self.password = password
         self.look_for_keys = look_for_keys
+        self.private_key_file_path = private_key_file_path
         self.pkey = (
             paramiko.RSAKey.from_private_key_file(private_key_file_path)
             if look_for_keys
             else None
         )
+        self.outage_timeout = datetime.timedelta(seconds=outage_timeout)
+        self.max_channels = max_channels
+        self.metrics = SSHMetrics()
+        self.__init_session()
+
+    def __init_session(self):
         self.__client = paramiko.SSHClient()
         self.__client.set_missing_host_key_policy(paramiko.MissingHostKeyPolicy())
         self.__transport = None
         self.__outage_start_time = None
-        self.outage_timeout = datetime.timedelta(seconds=outage_timeout)
+        self.__channels = threading.BoundedSemaphore(self.max_channels)
+        self.__connect_lock = threading.Lock()
+        self.__sftp_idle = []
+        self.__sftp_lock = threading.Lock()
 
     @property
     def client(self):
         return self.get_client()
 
+    @property
+    def is_healthy(self):
+        """Return True when the established transport is usable."""
+        return bool(self.__transport and self.__transport.is_active())
+
     def get_client(self):
-        if not (self.__transport and self.__transport.is_active()):
-            self.__connect()
-            self.__transport = self.__client.get_transport()
+        if not self.is_healthy:
+            # Concurrent callers must not connect the shared client more than once.
+            with self.__connect_lock:
+                if not self.is_healthy:
+                    self.__connect()
+                    self.__transport = self.__client.get_transport()
+                    self.__transport.set_keepalive(self.KEEPALIVE_INTERVAL)
 
         return self.__client
 
@@ -1331,12 +1602,199 @@ class SSHConnectionManager(object):
         self.__transport = self.client.get_transport()
         return self.__transport
 
+    @contextmanager
+    def open_channel(self, timeout=None):
+        """Open a session channel once an in-flight slot is available.
+
+        The number of channels open at a time on the connection is limited to
+        max_channels, callers beyond the limit wait for a slot to be released.
+
+        Args:
+          timeout: seconds to wait for the session to be opened.
+
+        Yields:
+          paramiko.Channel opened on the shared transport.
+        """
+        _queued = time()
+        self.__channels.acquire()
+        _started = time()
+        self.metrics.queue_wait += _started - _queued
+        self.metrics.max_queue_wait = max(
+            self.metrics.max_queue_wait, _started - _queued
+        )
+
+        channel = None
+        self.metrics.in_flight += 1
+        try:
+            try:
+                channel = self.get_transport().open_session(timeout=timeout)
+            except Exception:
+                self.metrics.failures += 1
+                raise
+
+            _opened = time()
+            self.metrics.channels += 1
+            self.metrics.open_time += _opened - _started
+            yield channel
+            self.metrics.command_time += time() - _opened
+        finally:
+            if channel:
+                channel.close()
+
+            self.metrics.in_flight -= 1
+            self.__channels.release()
+
+    @contextmanager
+    def sftp(self):
+        """Yield a SFTP client of the connection, reusing an idle one.
+
+        Opening a SFTP session costs a channel and the subsystem negotiation,
+        so up to SFTP_IDLE_SESSIONS clients are kept open once released. The
+        sessions count towards max_channels for as long as they are open.
+
+        Yields:
+          paramiko.SFTPClient opened on the shared transport.
+        """
+        client = self.__idle_sftp()
+        if client:
+            self.metrics.sftp_reuses += 1
+        else:
+            self.__channels.acquire()
+            try:
+                client = paramiko.SFTPClient.from_transport(self.get_transport())
+            except Exception:
+                self.metrics.failures += 1
+                self.__channels.release()
+                raise
+
+            self.metrics.sftp_sessions += 1
+
+        try:
+            yield client
+        finally:
+            self.__release_sftp(client)
+
+    def __sftp_usable(self, client):
+        channel = client.get_channel()
+        return not channel.closed and channel.get_transport() is self.__transport
+
+    def __idle_sftp(self):
+        with self.__sftp_lock:
+            while self.__sftp_idle:
+                client = self.__sftp_idle.pop()
+                if self.__sftp_usable(client):
+                    return client
+
+                self.__close_sftp(client)
+
+        return None
+
+    def __release_sftp(self, client):
+        with self.__sftp_lock:
+            if len(self.__sftp_idle) < self.SFTP_IDLE_SESSIONS and self.__sftp_usable(
+                client
+            ):
+                self.__sftp_idle.append(client)
+                return
+
+        self.__close_sftp(client)
+
+    def __close_sftp(self, client):
+        try:
+            client.close()
+        finally:
+            self.__channels.release()
+
+    def close(self):
+        """Close the underlying connection."""
+        with self.__sftp_lock:
+            while self.__sftp_idle:
+                self.__close_sftp(self.__sftp_idle.pop())
+
+        self.__client.close()
+        self.__transport = None
+
     def __getstate__(self):
         pickle_dict = self.__dict__.copy()
         del pickle_dict["_SSHConnectionManager__transport"]
         del pickle_dict["_SSHConnectionManager__client"]
+        del pickle_dict["_SSHConnectionManager__channels"]
+        del pickle_dict["_SSHConnectionManager__connect_lock"]
+        del pickle_dict["_SSHConnectionManager__sftp_idle"]
+        del pickle_dict["_SSHConnectionManager__sftp_lock"]
         return pickle_dict
 
+    def __setstate__(self, pickle_dict):
+        self.__dict__.update(pickle_dict)
+        self.__init_session()
+
+
+class SSHSessionPool(object):
+    """Process wide pool of SSH connections shared per node and user.
+
+    All consumers connecting to the same node as the same user are handed the
+    same SSHConnectionManager, so the warmed transport is reused and the limit
+    on in-flight channels is enforced across all of them.
+    """
+
+    _connections = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, ip_address, username, password, **kw):
+        """Return the pooled connection for the given node and user.
+
+        Args:
+          ip_address: IP address or hostname of the node.
+          username: user to be connected as.
+          password: password of the user.
+          kw: additional SSHConnectionManager arguments used on creation.
+
+        Returns:
+          SSHConnectionManager
+        """
+        key = (ip_address, username)
+        with cls._lock:
+            connection = cls._connections.get(key)
+            if not connection or connection.password != password:
+                connection = SSHConnectionManager(ip_address, username, password, **kw)
+                cls._connections[key] = connection
+
+        return connection
+
+    @classmethod
+    def metrics(cls):
+        """Return the channel metrics of every pooled connection."""
+        return {
+            f"{username}@{ip_address}": connection.metrics.as_dict()
+            for (ip_address, username), connection in cls._connections.items()
+        }
+
+    @classmethod
+    def log_metrics(cls):
+        """Log the channel usage summary of the pooled connections."""
+        for name, metrics in cls.metrics().items():
+            if not metrics["channels"]:
+                continue
+
+            logger.info(
+                f"SSH {name}: channels={metrics['channels']} "
+                f"failures={metrics['failures']} "
+                f"avg_queue_wait={metrics['avg_queue_wait']:.3f}s "
+                f"max_queue_wait={metrics['max_queue_wait']:.3f}s "
+                f"avg_open_time={metrics['avg_open_time']:.3f}s "
+                f"avg_command_time={metrics['avg_command_time']:.3f}s"
+            )
+
+    @classmethod
+    def close_all(cls):
+        """Close and forget all the pooled connections."""
+        with cls._lock:
+            for connection in cls._connections.values():
+                connection.close()
+
+            cls._connections.clear()
+
 
 class CephNode(object):
     class LvmConfig(object):
@@ -1347,6 +1805,11 @@ class CephNode(object):
         db_lv = "db-lv%s"
         wal_lv = "wal-lv%s"
 
+    # Seconds after which the cached node facts are gathered again
+    FACTS_TTL = 3600
+    _facts = None
+    _facts_time = 0
+
     def __init__(self, **kw):
         """
         Initialize a CephNode in a libcloud environment
@@ -1398,14 +1861,14 @@ class CephNode(object):
                 CephObjectFactory(self).create_ceph_object("osd")
             )
 
-        self.root_connection = SSHConnectionManager(
+        self.root_connection = SSHSessionPool.get(
             self.ip_address,
             "root",
             self.root_passwd,
             look_for_keys=self.look_for_key,
             private_key_file_path=self.private_key_path,
         )
-        self.connection = SSHConnectionManager(
+        self.connection = SSHSessionPool.get(
             self.ip_address,
             self.username,
             self.password,
@@ -1420,14 +1883,37 @@ class CephNode(object):
 
     @property
     def distro_info(self):
-        out, err = self.exec_command(cmd="cat /etc/os-release")
-        info = out.split("\n")
-        info = filter(None, info)
-        info_dict = {}
-        for each in info:
-            key, value = each.rstrip().split("=")
-            info_dict[key] = value.strip('"')
-        return info_dict
+        return dict(self.facts["distro_info"])
+
+    @property
+    def facts(self):
+        """
+        Facts of the node gathered when connecting, refer parse_node_facts
+
+        The facts are gathered again once older than FACTS_TTL seconds or
+        after expire_facts.
+        """
+        if not self._facts or time() - self._facts_time > self.FACTS_TTL:
+            self.refresh_facts()
+
+        return self._facts
+
+    def refresh_facts(self):
+        """Gather the facts of the node in a single round trip."""
+        out, _ = self.exec_command(
+            sudo=True,
+            cmd="bash -s",
+            stdin=NODE_FACTS_SCRIPT.format(marker=NODE_FACT_MARKER),
+        )
+        self._set_facts(out)
+
+    def expire_facts(self):
+        """Gather the facts again on their next use, e.g. after a reboot."""
+        self._facts_time = 0
+
+    def _set_facts(self, output):
+        self._facts = parse_node_facts(output)
+        self._facts_time = time()
 
     @property
     def role(self):
@@ -1463,53 +1949,92 @@ class CephNode(object):
             if isinstance(ceph_demon, CephDemon) and ceph_demon.is_active
         ]
 
-    def connect(self):
+    def wait_for_ssh(self, timeout=600, interval=SSH_READY_INTERVAL):
+        """
+        Wait till the SSH daemon of the node answers with its banner.
+
+        Args:
+            timeout: seconds to wait for the daemon
+            interval: seconds between the attempts
+
+        Raises:
+            AssertionError: when the daemon does not answer within the timeout
+        """
+        end_time = datetime.datetime.now() + datetime.timedelta(seconds=timeout)
+        while end_time > datetime.datetime.now():
+            try:
+                with socket.create_connection(
+                    (self.ip_address, SSH_PORT), timeout=interval
+                ) as sock:
+                    if sock.recv(4) == b"SSH-":
+                        return
+            except OSError as err:
+                logger.debug(f"SSH on {self.ip_address} is not ready yet: {err}")
+
+            sleep(interval)
+
+        raise AssertionError(f"SSH on {self.ip_address} not ready in {timeout}s")
+
+    def connect(self, timeout=600):
         """
         connect to ceph instance using paramiko ssh protocol
         eg: self.connect()
+        - wait for the ssh daemon of the node to be ready
         - setup tcp keepalive to max retries for active connection
         - set up hostname and shortname as attributes for tests to query
+
+        The setup is sent as a single script over the root connection and the
+        node facts are parsed from the lines of its output carrying the
+        NODE_FACT_MARKER.
+
+        Args:
+            timeout: seconds to wait for the node to be reachable
         """
         logger.info(
             "Connecting {host_name} / {ip_address}".format(
                 host_name=self.vmname, ip_address=self.ip_address
             )
         )
-
-        self.rssh().exec_command("dmesg")
-        self.rssh_transport().set_keepalive(15)
-        _, stdout, stderr = self.rssh().exec_command(
-            f"echo '{self.username}:{self.password}' | chpasswd"
-        )
-        logger.info(stdout.readlines())
-        _, stdout, stderr = self.rssh().exec_command(
-            f"echo 'root:{self.root_passwd}' | chpasswd"
+        self.wait_for_ssh(timeout=timeout)
+
+        script = NODE_SETUP_SCRIPT.format(
+            username=self.username,
+            password=self.password,
+            root_password=self.root_passwd,
+            marker=NODE_FACT_MARKER,
+            hostname_cmd=(
+                "hostname -s" if self.vm_node.node_type == "baremetal" else "hostname"
+            ),
         )
-        logger.info(stdout.readlines())
-        self.rssh().exec_command("echo 120 > /proc/sys/net/ipv4/tcp_keepalive_time")
-        self.rssh().exec_command("echo 60 > /proc/sys/net/ipv4/tcp_keepalive_intvl")
-        self.rssh().exec_command("echo 20 > /proc/sys/net/ipv4/tcp_keepalive_probes")
-        self.exec_command(cmd="ls / ; uptime ; date")
-        self.ssh_transport().set_keepalive(15)
-        if self.vm_node.node_type == "baremetal":
-            out, err = self.exec_command(cmd="hostname -s")
-        else:
-            out, err = self.exec_command(cmd="hostname")
-        self.hostname = out.strip()
-
-        shortname = self.hostname.split(".")
-        self.shortname = shortname[0]
+        script += NODE_FACTS_SCRIPT.format(marker=NODE_FACT_MARKER)
+        end_time = datetime.datetime.now() + datetime.timedelta(seconds=timeout)
+        with self.root_connection.open_channel(timeout=timeout) as channel:
+            channel.settimeout(timeout)
+            # The script is fed through stdin to keep the passwords off the logs.
+            channel.exec_command("bash -s")
+            channel.sendall(script)
+            channel.shutdown_write()
+            out, err = read_channel(channel, end_time, timeout, log=False)
+            self.exit_status = channel.recv_exit_status()
+
+        facts = dict()
+        for line in out.splitlines():
+            if line.startswith(f"{NODE_FACT_MARKER} "):
+                key, _, value = line[len(NODE_FACT_MARKER) :].strip().partition("=")
+                facts[key] = value.strip()
+        logger.debug(f"Node setup of {self.ip_address} returned {facts}, {err}")
+
+        if not facts.get("hostname"):
+            raise CommandFailed(f"Failed to setup {self.ip_address}: {err}")
+
+        self.hostname = facts["hostname"]
+        self.shortname = self.hostname.split(".")[0]
         logger.info(
             "hostname and shortname set to %s and %s", self.hostname, self.shortname
         )
-        self.set_internal_ip()
-        self.exec_command(cmd="echo 'TMOUT=600' >> ~/.bashrc")
-        self.exec_command(cmd="[ -f /etc/redhat-release ]", check_ec=False)
-
-        if self.exit_status == 0:
-            self.pkg_type = "rpm"
-        else:
-            self.pkg_type = "deb"
+        self.internal_ip = facts.get("internal_ip", "")
+        self.pkg_type = facts.get("pkg_type", "deb")
+        self._set_facts(out)
 
         logger.info("finished connect")
         self.run_once = True
@@ -1533,15 +2058,13 @@ class CephNode(object):
         """
         generate id_rsa key files for the new vm node
         """
-        # remove any old files
-        self.exec_command(
-            cmd="test -f ~/.ssh/id_rsa.pub && rm -f ~/.ssh/id*", check_ec=False
+        # remove any old files, generate the key and set the short hostname
+        self.id_rsa_pub, _ = self.exec_command(
+            cmd="rm -f ~/.ssh/id* ; "
+            "ssh-keygen -b 2048 -f ~/.ssh/id_rsa -t rsa -q -N '' && "
+            "sudo hostnamectl set-hostname $(hostname -s) && "
+            "cat ~/.ssh/id_rsa.pub"
         )
-        self.exec_command(cmd="ssh-keygen -b 2048 -f ~/.ssh/id_rsa -t rsa -q -N ''")
-        self.id_rsa_pub, _ = self.exec_command(cmd="cat ~/.ssh/id_rsa.pub")
-        out, rc = self.exec_command(cmd="sudo hostname")
-        logger.info(out)
-        self.exec_command(cmd="sudo hostnamectl set-hostname $(hostname -s)")
 
     def long_running(self, **kw):
         """Method to execute long-running command.
@@ -1555,7 +2078,7 @@ class CephNode(object):
         cmd = kw["cmd"]
         _end_time = None
         _verbose = kw.get("verbose", False)
-        ssh = self.rssh if kw.get("sudo") else self.ssh
+        connection = self.root_connection if kw.get("sudo") else self.connection
         long_running = kw.get("long_running", False)
         if "timeout" in kw:
             timeout = None if kw["timeout"] == "notimeout" else kw["timeout"]
@@ -1564,64 +2087,41 @@ class CephNode(object):
             timeout = 3600 if kw.get("long_running", False) else 300
 
         try:
-            channel = ssh().get_transport().open_session(timeout=timeout)
-            channel.settimeout(timeout)
-
-            logger.info(f"Execute {cmd} on {self.ip_address}")
-            _exec_start_time = datetime.datetime.now()
-            channel.exec_command(cmd)
-
-            if timeout:
-                _end_time = datetime.datetime.now() + datetime.timedelta(
-                    seconds=timeout
-                )
-
-            _out = ""
-            _err = ""
-            while not channel.exit_status_ready():
-                # Prevent high resource consumption
-                sleep(1)
+            with connection.open_channel(timeout=timeout) as channel:
+                channel.settimeout(timeout)
+
+                logger.info(f"Execute {cmd} on {self.ip_address}")
+                _exec_start_time = datetime.datetime.now()
+                channel.exec_command(cmd)
+                if kw.get("stdin") is not None:
+                    channel.sendall(kw["stdin"])
+                    channel.shutdown_write()
+
+                if timeout:
+                    _end_time = datetime.datetime.now() + datetime.timedelta(
+                        seconds=timeout
+                    )
 
                 # Check the streams for data and log in debug mode only if it
                 # is a long running command else don't log.
                 # Fixme: logging must happen in debug irrespective of type.
                 _verbose = True if long_running else _verbose
-                if channel.recv_ready():
-                    _out += read_stream(channel, _end_time, timeout, log=_verbose)
-
-                if channel.recv_stderr_ready():
-                    _err += read_stream(
-                        channel, _end_time, timeout, stderr=True, log=_verbose
-                    )
-
-                check_timeout(_end_time, timeout)
-
-            _time = (datetime.datetime.now() - _exec_start_time).total_seconds()
-            logger.info(
-                f"Execution of {cmd} on {self.ip_address} took {_time} seconds."
-            )
+                _out, _err = read_channel(
+                    channel, _end_time, timeout, log=_verbose, stream=kw.get("stream")
+                )
 
-            # Check for data residues in the channel streams. This is required for the following reasons
-            #   - exit_ready and first line is blank causing data to be None
-            #   - race condition between data read and exit ready
-            try:
-                _new_timeout = datetime.datetime.now() + datetime.timedelta(seconds=10)
-                _out += read_stream(channel, _new_timeout, timeout=True)
-                _err += read_stream(channel, _new_timeout, timeout=True, stderr=True)
-            except CommandFailed:
-                logger.debug("Encountered a timeout during read post execution.")
-            except BaseException as be:
-                logger.debug(
-                    f"Encountered an unknown exception during last read.\n {be}"
+                _time = (datetime.datetime.now() - _exec_start_time).total_seconds()
+                logger.info(
+                    f"Execution of {cmd} on {self.ip_address} took {_time} seconds."
                 )
 
-            _exit = channel.recv_exit_status()
+                _exit = channel.recv_exit_status()
+
             return _out, _err, _exit, _time
         except socket.timeout as terr:
             logger.error(f"{cmd} failed to execute within {timeout} seconds.")
             raise SocketTimeoutException(terr)
         except TimeoutException as tex:
-            channel.close()
             logger.error(f"{cmd} failed to execute within {timeout}s.")
             raise CommandFailed(tex)
         except BaseException as be:  # noqa
@@ -1638,6 +2138,10 @@ class CephNode(object):
           timeout: Max time to wait for command to complete. Default is 600 seconds.
           pretty_print: Bool flag to indicate if the output should be pretty printed.
           verbose: Bool flag to indicate if the command output should be printed.
+          stream: callable fed with the stdout data as it arrives, stdout is
+                  not collected when provided.
+          stdin: data sent to the standard input of the command, which is
+                 closed once the data is sent.
 
         Returns:
           Exit code when long_running is used
@@ -1653,10 +2157,6 @@ class CephNode(object):
           or
             self.exec_cmd(cmd='background_cmd', check_ec=False)
         """
-        if self.run_once:
-            self.ssh_transport().set_keepalive(15)
-            self.rssh_transport().set_keepalive(15)
-
         cmd = kw["cmd"]
         _out, _err, _exit, _time = self.long_running(**kw)
         self.exit_status = _exit
@@ -1714,6 +2214,8 @@ class CephNode(object):
     def reconnect(self):
         """Re-establish the connections."""
         logger.info(f"Re-establishing the connection to {self.ip_address}.")
+        # The node may have been rebooted or reimaged
+        self.expire_facts()
         self.root_connection.get_client()
         self.connection.get_client()
 
@@ -1731,14 +2233,14 @@ class CephNode(object):
 
     def __setstate__(self, pickle_dict):
         self.__dict__.update(pickle_dict)
-        self.root_connection = SSHConnectionManager(
+        self.root_connection = SSHSessionPool.get(
             self.ip_address,
             "root",
             self.root_passwd,
             look_for_keys=self.look_for_key,
             private_key_file_path=self.private_key_path,
         )
-        self.connection = SSHConnectionManager(
+        self.connection = SSHSessionPool.get(
             self.ip_address,
             self.username,
             self.password,
@@ -2176,9 +2678,10 @@ class CephNode(object):
             dir_path (str): Directory path to get direcotry list
             sudo (bool): Use root access
         """
-        client = self.rssh if sudo else self.ssh
+        connection = self.root_connection if sudo else self.connection
         try:
-            return client().open_sftp().listdir(dir_path)
+            with connection.sftp() as client:
+                return client.listdir(dir_path)
         except FileNotFoundError:
             logger.info(f"Dir path '{dir_path}' not present")
             return None
@@ -2192,9 +2695,10 @@ class CephNode(object):
             dir_path (str): Directory path to get direcotry attributes
             sudo (bool): Use root access
         """
-        client = self.rssh if sudo else self.ssh
+        connection = self.root_connection if sudo else self.connection
         try:
-            return client().open_sftp().listdir_attr(dir_path)
+            with connection.sftp() as client:
+                return client.listdir_attr(dir_path)
         except FileNotFoundError:
             logger.info(f"Dir path '{dir_path}' not present")
             return None
@@ -2208,9 +2712,12 @@ class CephNode(object):
             src (str): Source file location
             dst (str): File destination location
             sudo (bool): Use root access
+
+        Returns:
+            number of bytes transferred
         """
-        client = self.rssh if sudo else self.ssh
-        client().open_sftp().put(src, dst)
+        connection = self.root_connection if sudo else self.connection
+        return sftp.upload(connection, src, dst)
 
     def download_file(self, src, dst, sudo=False):
         """Get file from remote location
@@ -2219,9 +2726,29 @@ class CephNode(object):
             src (str): Source file remote location
             dst (str): File destination location
             sudo (bool): Use root access
+
+        Returns:
+            number of bytes transferred
         """
-        client = self.rssh if sudo else self.ssh
-        client().open_sftp().get(src, dst)
+        connection = self.root_connection if sudo else self.connection
+        return sftp.download(connection, src, dst)
+
+    def copy_file_to(self, node, src, dst=None, sudo=False):
+        """Copy file to another node without staging it locally
+
+        Args:
+            node (CephNode): Destination node
+            src (str): Source file location
+            dst (str): File destination location, same as src by default
+            sudo (bool): Use root access on both the nodes
+
+        Returns:
+            number of bytes transferred
+        """
+        if sudo:
+            return sftp.copy(self.root_connection, src, node.root_connection, dst)
+
+        return sftp.copy(self.connection, src, node.connection, dst)
 
     def create_dirs(self, dir_path, sudo=False):
         """Create directory on node
@@ -2229,9 +2756,10 @@ class CephNode(object):
             dir_path (str): Directory path to create
             sudo (bool): Use root access
         """
-        client = self.rssh if sudo else self.ssh
+        connection = self.root_connection if sudo else self.connection
         try:
-            client().open_sftp().mkdir(dir_path)
+            with connection.sftp() as client:
+                client.mkdir(dir_path)
         except Exception:
             # Error happens when the directory already exists
             logger.info("mkdir failed, retrying with -p param")
@@ -2244,9 +2772,10 @@ class CephNode(object):
             file_path (str): file path to delete
             sudo (bool): use root access
         """
-        client = self.rssh if sudo else self.ssh
+        connection = self.root_connection if sudo else self.connection
         try:
-            client().open_sftp().remove(file_path)
+            with connection.sftp() as client:
+                client.remove(file_path)
         except Exception:
             logger.info("rm failed, retrying with -rvf param")
             cmd = f"rm -rvf {file_path}"
@@ -2272,6 +2801,10 @@ class CephObject(object):
     def distro_info(self):
         return self.node.distro_info
 
+    @property
+    def facts(self):
+        return self.node.facts
+
     def exec_command(self, cmd, **kw):
         """
         Proxy to node's exec_command
@@ -2340,6 +2873,18 @@ class CephObject(object):
         """
         self.node.download_file(src=src, dst=dst, sudo=sudo)
 
+    def copy_file_to(self, node, src, dst=None, sudo=False):
+        """
+        Proxy to copy file to another node
+
+        Args:
+            node (CephNode): Destination node
+            src (str): Source file location
+            dst (str): File destination location, same as src by default
+            sudo (bool): Use root access on both the nodes
+        """
+        return self.node.copy_file_to(node=node, src=src, dst=dst, sudo=sudo)
+
 
 class CephDemon(CephObject):
     def __init__(self, role, node):
@@ -1,6 +1,7 @@
 """Cephadm orchestration host operations."""
 
 import json
+import shlex
 from copy import deepcopy
 
 from ceph.ceph import CephNode
@@ -65,6 +66,24 @@ class Host(MaintenanceMixin, Orch):
             with node will be considered if string "apply-all-labels"
 
         """
+        host = self._prepare_add(config)
+        if not host:
+            return
+
+        self.shell(args=host["cmd"])
+        self._verify_add(config, host, self.hosts_snapshot())
+
+    def _prepare_add(self, config):
+        """
+        Build the host add command of the node
+
+        Args:
+            config (Dict):  host addition configuration, refer add
+
+        Returns:
+            dict with the node, the command, attach_address and the labels,
+            None when the node is a client only
+        """
         cmd = ["ceph", "orch"]
         if config.get("base_cmd_args"):
             cmd.append(config_dict_to_string(config["base_cmd_args"]))
@@ -105,24 +124,40 @@ class Host(MaintenanceMixin, Orch):
             "Adding node %s, (attach_address: %s, labels: %s)"
             % (ceph_node.ip_address, attach_address, _labels)
         )
-        # Add host
-        self.shell(args=cmd)
+        return {
+            "node": ceph_node,
+            "cmd": cmd,
+            "attach_address": attach_address,
+            "labels": _labels,
+        }
+
+    def _verify_add(self, config, host, snapshot):
+        """
+        Validate the addition of the host
+
+        Args:
+            config (Dict): host addition configuration, refer add
+            host (Dict): host as returned by _prepare_add
+            snapshot (Dict): hosts as returned by hosts_snapshot
+        """
+        ceph_node = host["node"]
+        _labels = host["labels"]
 
         # validate host existence
-        if ceph_node.hostname not in self.fetch_host_names():
+        if ceph_node.hostname not in snapshot:
             raise HostOpFailure(
                 f"Hostname verify failure. Expected {ceph_node.hostname}"
             )
 
-        if attach_address:
-            if ceph_node.ip_address != self.get_addr_by_name(ceph_node.hostname):
+        if host["attach_address"]:
+            if ceph_node.ip_address != snapshot[ceph_node.hostname]["addr"]:
                 raise HostOpFailure(
                     f"IP address verify failed. Expected {ceph_node.ip_address}"
                 )
 
         if _labels:
             logger.info(
-                f"{sorted(self.fetch_labels_by_hostname(ceph_node.hostname))} :: {sorted(_labels)}"
+                f"{sorted(snapshot[ceph_node.hostname]['labels'])} :: {sorted(_labels)}"
             )
 
             if config.get("validate_admin_keyring") and "_admin" in _labels:
@@ -140,6 +175,8 @@ class Host(MaintenanceMixin, Orch):
           - add_label: host added with labels(roles assigned are considered)
           - attach_address: host added with ip address(host ip address used)
           - by default add_label and attach_address are set to True
+          - hosts are added in a single cephadm shell session and validated
+            against a single host listing
 
         Args:
             config (Dict): hosts configuration
@@ -162,11 +199,21 @@ class Host(MaintenanceMixin, Orch):
         if not nodes:
             nodes = [node.hostname for node in self.cluster.get_nodes()]
 
+        hosts = []
         for node in nodes:
             cfg = deepcopy(config)
             cfg["args"]["node"] = node
+            host = self._prepare_add(cfg)
+            if host:
+                hosts.append(host)
+
+        if not hosts:
+            return
 
-            self.add(cfg)
+        self.shell_session([host["cmd"] for host in hosts])
+        snapshot = self.hosts_snapshot()
+        for host in hosts:
+            self._verify_add(config, host, snapshot)
 
     def remove(self, config):
         """
@@ -283,11 +330,12 @@ class Host(MaintenanceMixin, Orch):
             raise ResourceNotFoundError("labels not found/provided")
 
         logger.info("Add label(s) %s on node %s" % (_labels, node.ip_address))
+        self.shell_session(
+            [cmd + ["host", "label", "add", node.hostname, label] for label in _labels]
+        )
+        labels = self.hosts_snapshot().get(node.hostname, {}).get("labels", [])
         for label in _labels:
-            _cmd = deepcopy(cmd)
-            _cmd.extend(["host", "label", "add", node.hostname, label])
-            self.shell(args=_cmd)
-            assert label in self.fetch_labels_by_hostname(node.hostname)
+            assert label in labels
 
             if config.get("validate_admin_keyring") and label == "_admin":
                 logger.info("Ceph keyring - default: %s" % DEFAULT_KEYRING_PATH)
@@ -342,12 +390,12 @@ class Host(MaintenanceMixin, Orch):
             raise ResourceNotFoundError("labels not found/provided")
 
         logger.info("Remove label(s) %s on node %s" % (_labels, node.ip_address))
-
+        self.shell_session(
+            [cmd + ["host", "label", "rm", node.hostname, label] for label in _labels]
+        )
+        labels = self.hosts_snapshot().get(node.hostname, {}).get("labels", [])
         for label in _labels:
-            _cmd = deepcopy(cmd)
-            _cmd.extend(["host", "label", "rm", node.hostname, label])
-            self.shell(args=_cmd)
-            assert label not in self.fetch_labels_by_hostname(node.hostname)
+            assert label not in labels
 
             if config.get("validate_admin_keyring") and label == "_admin":
                 logger.info("Ceph keyring - default: %s" % DEFAULT_KEYRING_PATH)
@@ -400,6 +448,35 @@ class Host(MaintenanceMixin, Orch):
         self.shell(args=cmd)
         assert node.ip_address in self.get_addr_by_name(node.hostname)
 
+    def shell_session(self, cmds, timeout_per_cmd=60):
+        """
+        Run the ceph commands one after the other in a single cephadm shell
+
+        The commands are stopped at the first failure.
+
+        Args:
+            cmds (List): commands, list of arguments each
+            timeout_per_cmd (Int): seconds allowed per command
+
+        Returns:
+            out (Str), err (Str) stdout and stderr response
+        """
+        script = " && ".join(" ".join(cmd) for cmd in cmds)
+        return self.shell(
+            args=["bash", "-c", shlex.quote(script)],
+            timeout=max(600, timeout_per_cmd * len(cmds)),
+        )
+
+    def hosts_snapshot(self):
+        """
+        Returns the hosts attached to the cluster from a single host listing
+
+        Returns:
+            hosts by host name (Dict)
+        """
+        out, _ = self.list()
+        return {host["hostname"]: host for host in json.loads(out)}
+
     def fetch_labels_by_hostname(self, node_name):
         """
         Fetch labels attach to a node by hostname
@@ -0,0 +1,306 @@
+"""Persistent and versioned state of the clusters participating in a run.
+
+The state file is made of JSON lines. The first line is a header describing the
+format, followed by a full snapshot of the clusters and then by records holding
+only the clusters and nodes that have changed since the previous record.
+
+    {"format": "cephci-cluster-state", "version": 1}
+    {"clusters": {"ceph": {"attrs": {...}, "order": [...], "nodes": {...}}}}
+    {"clusters": {"ceph": {"nodes": {"ceph-node1": {...}}}}}
+
+The snapshot is rewritten in full when clusters or nodes are added or removed,
+or when the number of records crosses MAX_RECORDS.
+
+Files created by the earlier pickle based implementation are still loaded.
+"""
+
+import json
+import os
+import pickle
+
+from ceph.ceph import (
+    Ceph,
+    CephClient,
+    CephDemon,
+    CephInstaller,
+    CephNode,
+    CephObject,
+    CephOsd,
+    NodeVolume,
+)
+from ceph.parallel import parallel
+from utility.log import Log
+
+log = Log(__name__)
+
+STATE_FORMAT = "cephci-cluster-state"
+STATE_VERSION = 1
+MAX_RECORDS = 50
+RECONNECT_WORKERS = 32
+
+CEPH_OBJECT_TYPES = {
+    _type.__name__: _type
+    for _type in (CephObject, CephDemon, CephOsd, CephClient, CephInstaller)
+}
+
+# Members recreated on load instead of being stored.
+NODE_EXCLUDES = [
+    "ceph_object_list",
+    "volume_list",
+    "vm_node",
+    "rssh",
+    "ssh",
+    "rssh_transport",
+    "ssh_transport",
+    "root_connection",
+    "connection",
+    # Gathered again from the node on first use
+    "_facts",
+    "_facts_time",
+]
+CLUSTER_EXCLUDES = ["node_list"]
+
+
+class ClusterStateError(Exception):
+    pass
+
+
+def _is_serializable(value):
+    """Return True if the value can be stored as JSON without loss."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return True
+
+    if isinstance(value, (list, tuple)):
+        return all(_is_serializable(v) for v in value)
+
+    if isinstance(value, dict):
+        return all(isinstance(k, str) and _is_serializable(v) for k, v in value.items())
+
+    return False
+
+
+def _attributes(obj, state, excludes=()):
+    """Return the serializable members of the given object state."""
+    attrs, skipped = {}, []
+    for key, value in state.items():
+        if key in excludes:
+            continue
+
+        if _is_serializable(value):
+            attrs[key] = value
+        else:
+            skipped.append(key)
+
+    if skipped:
+        log.debug(f"Not storing {skipped} of {type(obj).__name__}")
+
+    return attrs
+
+
+def node_key(node):
+    """Return the identifier of the node within the state file."""
+    return node.vmname
+
+
+def node_state(node):
+    """Return the serializable state of the given CephNode."""
+    state = _attributes(node, node.__dict__, NODE_EXCLUDES)
+    state["volumes"] = [[v.status, v.path] for v in node.volume_list]
+    state["objects"] = [
+        dict(
+            _attributes(obj, obj.__dict__, ["node"]),
+            type=type(obj).__name__,
+        )
+        for obj in node.ceph_object_list
+        if obj
+    ]
+
+    return state
+
+
+def cluster_state(cluster):
+    """Return the serializable state of the given Ceph cluster."""
+    return {
+        "attrs": _attributes(cluster, cluster.__dict__, CLUSTER_EXCLUDES),
+        "order": [node_key(node) for node in cluster],
+        "nodes": {node_key(node): node_state(node) for node in cluster},
+    }
+
+
+def build_node(state):
+    """Create a CephNode from the given state without connecting to it."""
+    state = dict(state)
+    volumes = state.pop("volumes", [])
+    objects = state.pop("objects", [])
+
+    node = CephNode.__new__(CephNode)
+    node.__setstate__(state)
+    node.volume_list = [NodeVolume(status, path) for status, path in volumes]
+    node.ceph_object_list = []
+    for attrs in objects:
+        attrs = dict(attrs)
+        _type = CEPH_OBJECT_TYPES.get(attrs.pop("type"), CephObject)
+        obj = _type.__new__(_type)
+        obj.__dict__.update(attrs)
+        obj.node = node
+        node.ceph_object_list.append(obj)
+
+    return node
+
+
+def build_cluster(state):
+    """Create a Ceph cluster object from the given state."""
+    cluster = Ceph.__new__(Ceph)
+    cluster.__dict__.update(state["attrs"])
+    cluster.node_list = [build_node(state["nodes"][key]) for key in state["order"]]
+
+    return cluster
+
+
+class ClusterStateStore(object):
+    """Stores the state of the clusters, writing only the changes after a snapshot."""
+
+    def __init__(self, path):
+        """
+        Initialize the store.
+
+        Args:
+            path (str): location of the state file
+        """
+        self.path = path
+        self._clusters = None
+        self._records = 0
+
+    def save(self, ceph_cluster_dict):
+        """
+        Record the state of the given clusters.
+
+        Args:
+            ceph_cluster_dict (dict): Ceph cluster objects keyed by cluster name
+        """
+        clusters = {
+            name: cluster_state(cluster) for name, cluster in ceph_cluster_dict.items()
+        }
+
+        if self._needs_snapshot(clusters):
+            self._write_snapshot(clusters)
+        else:
+            changes = self._changes(clusters)
+            if changes:
+                with open(self.path, "a", encoding="utf-8") as fd:
+                    fd.write(json.dumps({"clusters": changes}) + "\n")
+                self._records += 1
+
+        self._clusters = clusters
+        log.info(f"ceph_clusters_file {self.path}")
+
+    def _needs_snapshot(self, clusters):
+        if self._clusters is None or self._records >= MAX_RECORDS:
+            return True
+
+        if set(clusters) != set(self._clusters):
+            return True
+
+        return any(
+            clusters[name]["order"] != self._clusters[name]["order"]
+            for name in clusters
+        )
+
+    def _changes(self, clusters):
+        changes = {}
+        for name, state in clusters.items():
+            previous = self._clusters[name]
+            change = {}
+            if state["attrs"] != previous["attrs"]:
+                change["attrs"] = state["attrs"]
+
+            nodes = {
+                key: value
+                for key, value in state["nodes"].items()
+                if value != previous["nodes"][key]
+            }
+            if nodes:
+                change["nodes"] = nodes
+
+            if change:
+                changes[name] = change
+
+        return changes
+
+    def _write_snapshot(self, clusters):
+        _tmp = f"{self.path}.tmp"
+        with open(_tmp, "w", encoding="utf-8") as fd:
+            fd.write(json.dumps({"format": STATE_FORMAT, "version": STATE_VERSION}))
+            fd.write("\n" + json.dumps({"clusters": clusters}) + "\n")
+
+        os.replace(_tmp, self.path)
+        self._records = 0
+
+
+def read_cluster_state(path):
+    """
+    Read the state file and return the latest state of every cluster.
+
+    Args:
+        path (str): location of the state file
+
+    Returns:
+        dict of cluster states keyed by cluster name
+
+    Raises:
+        ClusterStateError: when the file format or version is not supported
+    """
+    with open(path, "r", encoding="utf-8") as fd:
+        header = json.loads(fd.readline())
+        if header.get("format") != STATE_FORMAT:
+            raise ClusterStateError(f"{path} is not a cluster state file")
+
+        if header.get("version") != STATE_VERSION:
+            raise ClusterStateError(
+                f"Unsupported cluster state version {header.get('version')}"
+            )
+
+        clusters = {}
+        for line in fd:
+            if not line.strip():
+                continue
+
+            for name, change in json.loads(line)["clusters"].items():
+                if "order" in change:
+                    clusters[name] = change
+                    continue
+
+                clusters[name]["attrs"] = change.get("attrs", clusters[name]["attrs"])
+                clusters[name]["nodes"].update(change.get("nodes", {}))
+
+    return clusters
+
+
+def load_cluster_state(path, reconnect=True):
+    """
+    Load the clusters stored at the given path and reconnect to their nodes.
+
+    Args:
+        path (str): location of the state file
+        reconnect (bool): re-establish the connections to all the nodes
+
+    Returns:
+        dict of Ceph cluster objects keyed by cluster name
+    """
+    try:
+        states = read_cluster_state(path)
+        ceph_cluster_dict = {
+            name: build_cluster(state) for name, state in states.items()
+        }
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        # State stored by the earlier pickle based implementation
+        with open(path, "rb") as fd:
+            ceph_cluster_dict = pickle.load(fd)
+
+    if reconnect:
+        with parallel(max_workers=RECONNECT_WORKERS) as p:
+            for cluster in ceph_cluster_dict.values():
+                for node in cluster:
+                    p.spawn_tagged(node.ip_address, node.reconnect)
+
+    return ceph_cluster_dict
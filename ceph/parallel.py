@@ -1,5 +1,8 @@
 import sys
+from time import time
 
+import gevent
+import gevent.lock
 import gevent.pool
 import gevent.queue
 
@@ -35,6 +38,30 @@ def resurrect_traceback(exc):
     raise exc_info[0](exc_info[1]).with_traceback(exc_info[2])
 
 
+class ParallelTask(object):
+    """Book keeping of a function spawned through parallel."""
+
+    def __init__(self, tag):
+        self.tag = tag
+        self.queued = time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.status = "queued"
+        self.greenlet = None
+
+    @property
+    def wait_time(self):
+        return (self.started or self.finished or time()) - self.queued
+
+    @property
+    def run_time(self):
+        if not self.started:
+            return 0.0
+
+        return (self.finished or time()) - self.started
+
+
 class parallel(object):
     """
     This class is a context manager for running functions in parallel.
@@ -59,26 +86,79 @@ class parallel(object):
     At the end of the with block, the main thread waits until all
     spawned functions have completed, or, if one exited with an exception,
     kills the rest and raises the exception.
+
+    The behaviour can be tuned with the below arguments::
+
+        with parallel(max_workers=10, fail_fast=True, timeout=600) as p:
+            for node in nodes:
+                p.spawn_tagged(node.hostname, quux, node)
+
+        results = p.results_by_tag()
+
+    Args:
+        max_workers: maximum number of functions running at a time.
+        fail_fast: kill the remaining functions once one of them fails.
+        timeout: maximum seconds allowed for each function to run.
+        ordered: iterate over the results in submission order.
     """
 
-    def __init__(self):
+    def __init__(self, max_workers=None, fail_fast=False, timeout=None, ordered=False):
         self.group = gevent.pool.Group()
         self.results = gevent.queue.Queue()
         self.count = 0
         self.any_spawned = False
         self.iteration_stopped = False
+        self.fail_fast = fail_fast
+        self.timeout = timeout
+        self.ordered = ordered
+        self.tasks = []
+        self.failed = False
+        self._next = 0
+        self._workers = (
+            gevent.lock.BoundedSemaphore(max_workers) if max_workers else None
+        )
 
     def spawn(self, func, *args, **kwargs):
+        tag = f"{getattr(func, '__name__', 'task')}-{len(self.tasks)}"
+        self.spawn_tagged(tag, func, *args, **kwargs)
+
+    def spawn_tagged(self, tag, func, *args, **kwargs):
+        """Spawn the function and identify its result using the given tag."""
         self.count += 1
         self.any_spawned = True
-        greenlet = self.group.spawn(capture_traceback, func, *args, **kwargs)
+        task = ParallelTask(tag)
+        self.tasks.append(task)
+        greenlet = self.group.spawn(self._run, task, func, *args, **kwargs)
+        greenlet.task = task
+        task.greenlet = greenlet
         greenlet.link(self._finish)
 
+    def _run(self, task, func, *args, **kwargs):
+        """Execute the function once a worker is available."""
+        if self._workers:
+            self._workers.acquire()
+
+        try:
+            task.started = time()
+            task.status = "running"
+            if not self.timeout:
+                return capture_traceback(func, *args, **kwargs)
+
+            with gevent.Timeout(
+                self.timeout,
+                TimeoutError(f"{task.tag} did not complete in {self.timeout}s"),
+            ):
+                return capture_traceback(func, *args, **kwargs)
+        finally:
+            if self._workers:
+                self._workers.release()
+
     def __enter__(self):
         return self
 
     def __exit__(self, type_, value, traceback):
         self.group.join()
+        self.log_summary()
 
         if value is not None:
             return False
@@ -100,7 +180,11 @@ class parallel(object):
     def __next__(self):
         if not self.any_spawned or self.iteration_stopped:
             raise StopIteration()
-        result = self.results.get()
+
+        if self.ordered:
+            result = self._next_in_order()
+        else:
+            result = self.results.get()
 
         try:
             resurrect_traceback(result)
@@ -110,11 +194,66 @@ class parallel(object):
 
         return result
 
+    def _next_in_order(self):
+        """Return the result of the next task in submission order."""
+        while self._next < len(self.tasks):
+            task = self.tasks[self._next]
+            self._next += 1
+            task.greenlet.join()
+            while task.finished is None:
+                # Links of the greenlet are yet to be run.
+                gevent.sleep(0)
+
+            if task.status != "cancelled":
+                return task.result
+
+        return StopIteration()
+
+    def results_by_tag(self):
+        """Wait for the spawned functions and return their results.
+
+        Returns:
+            dict of results keyed by tag, in submission order.
+
+        Raises:
+            the exception of the first failed function in submission order.
+        """
+        self.group.join()
+        for task in self.tasks:
+            resurrect_traceback(task.result)
+
+        return {task.tag: task.result for task in self.tasks if task.status == "done"}
+
+    def log_summary(self):
+        """Log the queued and running duration of every spawned function."""
+        if len(self.tasks) < 2:
+            return
+
+        for task in sorted(self.tasks, key=lambda t: t.run_time, reverse=True):
+            log.info(
+                f"Parallel task {task.tag}: {task.status}, "
+                f"queued {task.wait_time:.2f}s, ran {task.run_time:.2f}s"
+            )
+
     def _finish(self, greenlet):
-        if greenlet.successful():
-            self.results.put(greenlet.value)
+        task = greenlet.task
+        task.finished = time()
+        result = greenlet.value if greenlet.successful() else greenlet.exception
+
+        if isinstance(result, gevent.GreenletExit):
+            task.status = "cancelled"
+        elif isinstance(result, (ExceptionHolder, BaseException)):
+            task.status = "failed"
+            task.result = result
+            self.results.put(result)
+            if self.fail_fast and not self.failed:
+                self.failed = True
+                log.error(f"{task.tag} failed, cancelling the remaining tasks")
+                self.group.kill(block=False)
         else:
-            self.results.put(greenlet.exception)
+            task.status = "done"
+            task.result = result
+            self.results.put(result)
 
         self.count -= 1
         if self.count <= 0:
@@ -13,15 +13,43 @@ import datetime
 import json
 import math
 import re
+import shlex
 import time
 from collections import namedtuple
 
+import gevent.lock
+
 from ceph.ceph_admin import CephAdmin
 from ceph.parallel import parallel
+from ceph.rados.pg_stats import PG_STATS_FIELDS, PGStatsIndex
+from utility.json_stream import JSONArrayStream
 from utility.log import Log
 
 log = Log(__name__)
 
+ADMIN_KEYRING = "/etc/ceph/ceph.client.admin.keyring"
+QUERY_MARKER = "@@cephci-query"
+QUERY_OUTPUT = re.compile(
+    rf"^{QUERY_MARKER}-start:(\d+)\n(.*?)\n{QUERY_MARKER}-end:\1:(\d+)$",
+    re.MULTILINE | re.DOTALL,
+)
+# Snapshots are refetched on every call unless a TTL is configured or passed by a polling loop
+SNAPSHOT_TTL = 0
+# Seconds for which the polling loops reuse a snapshot, shared by the loops polling in parallel
+POLL_SNAPSHOT_TTL = 10
+# Read only ceph commands, matched in full. Any other command is treated as mutating.
+READ_ONLY_COMMAND = re.compile(
+    r"ceph (-s|status|df( detail)?|health( detail)?|versions|report|fsid|quorum_status"
+    r"|mon (dump|stat)|mgr (dump|services|module ls)|balancer status|time-sync-status"
+    r"|osd (tree|dump|df( tree)?|ls|stat|metadata( \S+)?|find \S+|map \S+ \S+"
+    r"|crush rule (ls|dump( \S+)?)|erasure-code-profile (ls|get \S+)"
+    r"|pool (ls( detail)?|stats( \S+)?|get \S+ \S+|get-quota \S+|autoscale-status))"
+    r"|pg (dump( \S+)?|stat|ls( \S+)*|ls-by-(osd|pool|primary)( \S+)+|map \S+|\S+ query"
+    r"|dump_json( \S+)?|dump_pools_json)"
+    r"|config (get|dump|show|log)( \S+)*|orch (ps|ls|host ls|device ls)( \S+)*"
+    r"|fs (ls|dump|status( \S+)?|get \S+))"
+)
+
 
 class RadosOrchestrator:
     """
@@ -39,6 +67,38 @@ class RadosOrchestrator:
         self.ceph_cluster = node.cluster
         self.client = node.cluster.get_nodes(role="client")[0]
         self.rhbuild = node.config.get("rhbuild")
+        self.direct_queries = node.config.get("direct_ceph_queries", True)
+        self._query_client = None
+        self.snapshot_ttl = node.config.get("snapshot_ttl", SNAPSHOT_TTL)
+        self.snapshot_stats = {"hits": 0, "misses": 0}
+        self._snapshots = {}
+        self._snapshot_locks = {}
+        self._snapshot_fetches = {}
+        self._snapshot_generation = 0
+        self._pg_stats_index = None
+
+    @property
+    def query_client(self):
+        """Client node able to run the ceph CLI without a cephadm shell.
+
+        The client qualifies when it holds the admin keyring and has the ceph CLI
+        installed. The check is done once per orchestrator.
+
+        Returns: CephNode object or None
+        """
+        if self._query_client is None:
+            self._query_client = False
+            if self.direct_queries:
+                cmd = f"test -f {ADMIN_KEYRING} && command -v ceph"
+                self.client.exec_command(cmd=cmd, sudo=True, check_ec=False)
+                if self.client.exit_status == 0:
+                    self._query_client = self.client
+
+            log.debug(
+                f"ceph queries run directly on client : {bool(self._query_client)}"
+            )
+
+        return self._query_client or None
 
     def change_recovery_flags(self, action, flags: list = None):
         """Sets and unsets the recovery flags on the cluster
@@ -66,6 +126,7 @@ class RadosOrchestrator:
         for flag in cluster_flags:
             cmd = f"ceph osd {action.lower()} {flag}"
             self.node.shell([cmd])
+        self.invalidate_snapshots()
 
     def check_pg_state(self, pgid: str) -> list:
         """Fetches and returns the state of PG given
@@ -79,11 +140,9 @@ class RadosOrchestrator:
         Returns: list of PG states for the PG
         """
         log.debug(f"Checking the PG state for PG ID : {pgid} ")
-        cmd = "ceph pg dump pgs"
-        pg_stats = self.run_ceph_command(cmd)
-        for pg in pg_stats["pg_stats"]:
-            if pg["pgid"] == pgid:
-                return pg["state"]
+        pg_stats = self.get_pg_stats_index()
+        if pgid in pg_stats:
+            return pg_stats.state(pgid)
         log.error(f"could not find the given pg : {pgid}")
         return []
 
@@ -150,23 +209,50 @@ class RadosOrchestrator:
         log.info("Email alerts configured on the cluster")
         return True
 
-    def run_ceph_command(self, cmd: str, timeout: int = 300, client_exec: bool = False):
+    def run_ceph_command(
+        self,
+        cmd: str,
+        timeout: int = 300,
+        client_exec: bool = False,
+        stream: JSONArrayStream = None,
+    ):
         """
         Runs ceph commands with json tag for the action specified otherwise treats action as command
         and returns formatted output
+
+        Commands are run with the ceph CLI of the client node when it holds the admin keyring,
+        avoiding the start of a cephadm shell container for every command.
+        Example:
+            stream = JSONArrayStream(path=["pg_stats"], fields=["pgid", "state"])
+            run_ceph_command(cmd="ceph pg ls", stream=stream)
         Args:
             cmd: Command that needs to be run
             timeout: Maximum time allowed for execution.
             client_exec: Selection if true, runs the command on the client node
-        Returns: dictionary of the output
+            stream: JSONArrayStream parsing the output as it is received, keeping only the required array
+        Returns: dictionary of the output, list of the collected elements when streamed
         """
 
+        if self.is_mutating(cmd):
+            self.invalidate_snapshots()
+
         cmd = f"{cmd} -f json"
         try:
-            if client_exec:
-                out, err = self.client.exec_command(cmd=cmd, sudo=True, timeout=timeout)
+            client = self.client if client_exec else self.query_client
+            if client:
+                out, err = client.exec_command(
+                    cmd=cmd,
+                    sudo=True,
+                    timeout=timeout,
+                    stream=stream.feed if stream else None,
+                )
             else:
                 out, err = self.node.shell([cmd], timeout=timeout, print_output=False)
+                if stream:
+                    stream.feed(out)
+
+            if stream:
+                return stream.close()
         except Exception as er:
             log.error(f"Exception hit while command execution. {er}")
             return None
@@ -175,6 +261,152 @@ class RadosOrchestrator:
         status = json.loads(out)
         return status
 
+    def run_ceph_commands(
+        self, cmds: list, timeout: int = 300, client_exec: bool = False
+    ) -> list:
+        """
+        Runs several ceph commands in a single round trip and returns the formatted output of each
+
+        The commands are executed one after the other by a single shell, either on the client node
+        or within one cephadm shell, and their outputs are separated using markers.
+        Example:
+            osd_tree, osd_dump = run_ceph_commands(["ceph osd df tree", "ceph osd dump"])
+        Args:
+            cmds: Commands that need to be run
+            timeout: Maximum time allowed for the execution of all the commands.
+            client_exec: Selection if true, runs the commands on the client node
+        Returns: list with the dictionary output of each command, None for the failed commands
+        """
+        if any(self.is_mutating(cmd) for cmd in cmds):
+            self.invalidate_snapshots()
+
+        script = "; ".join(
+            f"echo {QUERY_MARKER}-start:{idx}; {cmd} -f json; "
+            f"printf '\\n{QUERY_MARKER}-end:{idx}:%s\\n' $?"
+            for idx, cmd in enumerate(cmds)
+        )
+        try:
+            client = self.client if client_exec else self.query_client
+            if client:
+                out, err = client.exec_command(
+                    cmd=f"bash -c {shlex.quote(script)}",
+                    sudo=True,
+                    timeout=timeout,
+                    check_ec=False,
+                )
+            else:
+                out, err = self.node.shell(
+                    ["bash", "-c", shlex.quote(script)],
+                    timeout=timeout,
+                    check_status=False,
+                    print_output=False,
+                )
+        except Exception as er:
+            log.error(f"Exception hit while command execution. {er}")
+            return [None] * len(cmds)
+
+        results = [None] * len(cmds)
+        for idx, output, exit_code in QUERY_OUTPUT.findall(out):
+            idx = int(idx)
+            if int(exit_code) != 0:
+                log.error(f"{cmds[idx]} returned exit code {exit_code}")
+                continue
+
+            try:
+                results[idx] = json.loads(output) if output.strip() else {}
+            except json.JSONDecodeError as er:
+                log.error(f"Unable to parse the output of {cmds[idx]}. {er}")
+
+        return results
+
+    @staticmethod
+    def is_mutating(cmd: str) -> bool:
+        """
+        Checks if the given ceph command could change the state of the cluster
+        Args:
+            cmd: ceph command
+        Returns: True -> mutating command, False -> read only command
+        """
+        return not READ_ONLY_COMMAND.fullmatch(" ".join(cmd.split()))
+
+    def get_snapshot(
+        self,
+        cmd: str,
+        ttl: int = None,
+        client_exec: bool = False,
+        path: list = None,
+        fields: list = None,
+    ):
+        """
+        Returns the output of a read only ceph command, reusing the output fetched within the TTL
+
+        The TTL defaults to 0, i.e. the command is run on every call. Polling loops that tolerate
+        a slightly stale state pass a positive TTL, or set snapshot_ttl in the config.
+
+        Callers asking for a command that is being run wait for it and take its output, whatever
+        the TTL, instead of running the command again.
+        The snapshots are dropped whenever a mutating command is run through the orchestrator.
+        The returned output is shared between the callers and must not be modified.
+        Example:
+            get_snapshot(cmd="ceph pg dump pgs", path=["pg_stats"], fields=["pgid", "state"])
+        Args:
+            cmd: Command that needs to be run
+            ttl: seconds for which the output is reused. Defaults to snapshot_ttl, 0 when unset
+            client_exec: Selection if true, runs the command on the client node
+            path: keys leading to the array to be kept, the output is streamed when provided
+            fields: keys of the array elements to be kept
+        Returns: dictionary of the output, list of the array elements when path is provided
+        """
+        ttl = self.snapshot_ttl if ttl is None else ttl
+        key = (cmd, client_exec, tuple(path or ()), tuple(fields or ()))
+        lock = self._snapshot_locks.setdefault(key, gevent.lock.Semaphore())
+        # The output of the fetch in flight on arrival is as recent as the caller asked for
+        fetches = self._snapshot_fetches.get(key, 0)
+        wanted = fetches if lock.locked() else fetches + 1
+        with lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot and (snapshot[1] >= wanted or time.time() - snapshot[0] < ttl):
+                self.snapshot_stats["hits"] += 1
+                return snapshot[2]
+
+            self.snapshot_stats["misses"] += 1
+            fetch = self._snapshot_fetches[key] = self._snapshot_fetches.get(key, 0) + 1
+            generation, fetched = self._snapshot_generation, time.time()
+            stream = JSONArrayStream(path=path, fields=fields) if path else None
+            out = self.run_ceph_command(cmd=cmd, client_exec=client_exec, stream=stream)
+            if out is not None and generation == self._snapshot_generation:
+                self._snapshots[key] = (fetched, fetch, out)
+
+            return out
+
+    def get_pg_stats_index(self, ttl: int = None) -> PGStatsIndex:
+        """
+        Returns the PGStatsIndex of the "ceph pg dump pgs" snapshot
+        Example:
+            get_pg_stats_index().pgs_in_state("active", "clean", pool=3)
+        Args:
+            ttl: seconds for which the snapshot is reused. Defaults to snapshot_ttl
+        Returns: PGStatsIndex object
+        """
+        pg_stats = self.get_snapshot(
+            cmd="ceph pg dump pgs",
+            ttl=ttl,
+            path=["pg_stats"],
+            fields=PG_STATS_FIELDS,
+        )
+        if pg_stats is None:
+            raise Exception("Unable to fetch the PG statistics")
+
+        if not self._pg_stats_index or self._pg_stats_index[0] is not pg_stats:
+            self._pg_stats_index = (pg_stats, PGStatsIndex(pg_stats))
+
+        return self._pg_stats_index[1]
+
+    def invalidate_snapshots(self):
+        """Drops the cluster snapshots stored by get_snapshot"""
+        self._snapshots.clear()
+        self._snapshot_generation += 1
+
     def pool_inline_compression(self, pool_name: str, **kwargs) -> bool:
         """
         BlueStore supports inline compression using snappy, zlib, or lz4.
@@ -402,6 +634,7 @@ class RadosOrchestrator:
 
         cmd = f"ceph osd pool set {pool} {props} {value}"
         out, err = self.node.shell([cmd])
+        self.invalidate_snapshots()
         # sleeping for 2 seconds for the values to reflect
         time.sleep(2)
         log.info(f"property {props} set on pool {pool}")
@@ -539,6 +772,7 @@ class RadosOrchestrator:
             cmd = f"{cmd} --bulk"
         if kwargs.get("pg_num_min"):
             cmd = f"{cmd} --pg_num_min {kwargs['pg_num_min']}"
+        self.invalidate_snapshots()
         try:
             self.node.shell([cmd])
         except Exception as err:
@@ -691,6 +925,7 @@ class RadosOrchestrator:
             # scrubbing all the OSD's
             cmd = "ceph osd scrub all"
         self.client.exec_command(cmd=cmd, sudo=True)
+        self.invalidate_snapshots()
 
     def run_deep_scrub(self, **kwargs):
         """
@@ -715,6 +950,7 @@ class RadosOrchestrator:
             # scrubbing all the OSD's
             cmd = "ceph osd deep-scrub all"
         self.client.exec_command(cmd=cmd, sudo=True)
+        self.invalidate_snapshots()
 
     def collect_osd_daemon_ids(self, osd_node) -> list:
         """
@@ -1129,6 +1365,7 @@ class RadosOrchestrator:
         pool_details = self.get_pool_details(pool=pool)
         cmd = f"ceph osd pool delete {pool} {pool} --yes-i-really-really-mean-it"
         self.client.exec_command(cmd=cmd, sudo=True)
+        self.invalidate_snapshots()
 
         time.sleep(2)
         # Improving cleanup for EC pools
@@ -1420,6 +1657,7 @@ class RadosOrchestrator:
             f"Performing {action} on osd-{target} on host {host.hostname}. Command {cmd}"
         )
         host.exec_command(sudo=True, cmd=cmd)
+        self.invalidate_snapshots()
         # verifying the osd state
         if action in ["start", "stop"]:
             start_time = datetime.datetime.now()
@@ -2073,8 +2311,10 @@ class RadosOrchestrator:
             ) / replica_size
             return round(max_avail, 1)
 
-        data = self.run_ceph_command(cmd="ceph osd df tree")
-        full_ratio = self.run_ceph_command(cmd="ceph osd dump")["full_ratio"]
+        data, osd_dump = self.run_ceph_commands(
+            cmds=["ceph osd df tree", "ceph osd dump"]
+        )
+        full_ratio = osd_dump["full_ratio"]
         replica_size = default_replica_size
         total_osds = 0
         most_used_osd = None
@@ -2231,12 +2471,14 @@ class RadosOrchestrator:
         if states:
             cmd = f"{cmd} {states}"
 
-        pgid_dict = self.run_ceph_command(cmd=cmd, client_exec=True)
+        pg_stats = self.get_snapshot(
+            cmd=cmd, client_exec=True, path=["pg_stats"], fields=["pgid"]
+        )
 
-        if not pgid_dict["pg_stats"]:
+        if not pg_stats:
             return []
-        for pg_stats in pgid_dict["pg_stats"]:
-            pgid_list.append(pg_stats["pgid"])
+        for pg_stat in pg_stats:
+            pgid_list.append(pg_stat["pgid"])
 
         return pgid_list
 
@@ -2546,17 +2788,15 @@ EOF"""
         Returns: True-> Pass,  false -> Fail
         """
         log.debug(f"Checking for inactive PGs on pool : {pool_name}")
-        pool_pgids = self.get_pgid(pool_name=pool_name)
-        for pgid in pool_pgids:
+        cmd = f"ceph pg ls-by-pool {pool_name}"
+        pool_pgs = self.get_snapshot(
+            cmd=cmd, client_exec=True, path=["pg_stats"], fields=["pgid", "state"]
+        )
+        for pg in pool_pgs or []:
             # Checking the PG state. There Should not be inactive state
-            pg_state = self.get_pg_state(pg_id=pgid)
-            if pg_state:
-                if any("unknown" in key for key in pg_state.split("+")):
-                    log.error(f"PG: {pgid} in inactive state)")
-                    return False
-            else:
-                log.error(f"PG : {pgid} not present on cluster")
-                continue
+            if any("unknown" in key for key in pg["state"].split("+")):
+                log.error(f"PG: {pg['pgid']} in inactive state)")
+                return False
         log.info(
             f"Completed checking for inactive PGs on Pool : {pool_name}. No inactive PGs found"
         )
@@ -2802,21 +3042,22 @@ EOF"""
         log.debug(f"Stretch mode dump : {stretch_details}")
         return stretch_details
 
-    def get_ceph_pg_dump(self, pg_id: str) -> dict:
+    def get_ceph_pg_dump(self, pg_id: str, ttl: int = None) -> dict:
         """
         Fetches 'ceph pg dump' in json format and returns the data
         for input PG
         Args:
             pg_id: Placement Group ID for which pg dump has to be fetched
+            ttl: seconds for which the dump is reused. Defaults to snapshot_ttl
 
         Returns: dictionary output of ceph pg dump for input PG ID
         """
         _cmd = "ceph pg dump_json pgs"
-        dump_out_str, _ = self.client.exec_command(cmd=_cmd)
-        if dump_out_str.isspace():
+        pg_stats = self.get_snapshot(
+            cmd=_cmd, ttl=ttl, client_exec=True, path=["pg_map", "pg_stats"]
+        )
+        if pg_stats is None:
             return {}
-        dump_out = json.loads(dump_out_str)
-        pg_stats = dump_out["pg_map"]["pg_stats"]
         for pg_stat in pg_stats:
             if pg_stat["pgid"] == pg_id:
                 return pg_stat
@@ -2835,11 +3076,9 @@ EOF"""
         """
         # cmd if manual run : "ceph pg dump pools"
         _cmd = "ceph pg dump_pools_json"
-        pool_dump_str, _ = self.client.exec_command(cmd=_cmd)
-        if pool_dump_str.isspace():
+        pool_stats = self.get_snapshot(cmd=_cmd, client_exec=True, path=["pool_stats"])
+        if pool_stats is None:
             return {}
-        dump_json = json.loads(pool_dump_str)
-        pool_stats = dump_json["pool_stats"]
         for pool_stat in pool_stats:
             if pool_stat["poolid"] == pool_id:
                 return pool_stat
@@ -2931,21 +3170,19 @@ EOF"""
         """
         # fetching the pool ID
         cmd = "ceph df"
-        out = self.run_ceph_command(cmd=cmd)
+        out = self.get_snapshot(cmd=cmd)
         pool_names = [entry["name"] for entry in out.get("pools", [])]
         pool_id = out["pools"][pool_names.index(pool)]["id"]
 
-        cmd = f" ceph pg ls {pool_id}"
-        out = self.run_ceph_command(cmd=cmd)
-        for ele in out["pg_stats"]:
-            if any(key in disallowed_states for key in ele["state"].split("+")):
-                log.error(
-                    f"PG : {ele['pgid']} is in state : {ele['state']}. "
-                    "PG expected to be active+clean"
-                )
-                return False
-            else:
-                log.info(f"PG : {ele['pgid']} is in expected state : {ele['state']}. ")
+        pg_stats = self.get_pg_stats_index()
+        pgids = pg_stats.pgs_in_state(*disallowed_states, pool=pool_id, any_state=True)
+        for pgid in pgids:
+            log.error(
+                f"PG : {pgid} is in state : {pg_stats.state(pgid)}. "
+                "PG expected to be active+clean"
+            )
+        if pgids:
+            return False
         log.info("Completed checking PG states on all PGs of the pool. Pass")
         return True
 
@@ -3181,7 +3418,7 @@ EOF"""
         while datetime.datetime.now() <= start_time + datetime.timedelta(
             seconds=wait_time
         ):
-            pool_pg_dump = self.get_ceph_pg_dump(pg_id=pg_id)
+            pool_pg_dump = self.get_ceph_pg_dump(pg_id=pg_id, ttl=POLL_SNAPSHOT_TTL)
             current_scrub_stamp = datetime.datetime.strptime(
                 pool_pg_dump["last_scrub_stamp"], "%Y-%m-%dT%H:%M:%S.%f%z"
             )
@@ -3241,7 +3478,7 @@ EOF"""
         while datetime.datetime.now() <= start_time + datetime.timedelta(
             seconds=wait_time
         ):
-            pool_pg_dump = self.get_ceph_pg_dump(pg_id=pg_id)
+            pool_pg_dump = self.get_ceph_pg_dump(pg_id=pg_id, ttl=POLL_SNAPSHOT_TTL)
             # Parse the timestamp string into a datetime object
             current_scrub_stamp = datetime.datetime.strptime(
                 pool_pg_dump["last_deep_scrub_stamp"], "%Y-%m-%dT%H:%M:%S.%f%z"
@@ -0,0 +1,219 @@
+"""
+Module to query the PG statistics of a cluster snapshot.
+PGStatsIndex is built once from the pg_stats of "ceph pg dump pgs" and answers
+1. PGs mapped to an OSD
+2. PGs of a pool in the given states
+3. PGs scrubbed or deep-scrubbed after an earlier snapshot
+without walking the list of PG dictionaries for every query.
+"""
+
+import datetime
+from array import array
+from collections import defaultdict
+
+from utility.log import Log
+
+log = Log(__name__)
+
+PG_STATS_FIELDS = [
+    "pgid",
+    "state",
+    "up",
+    "acting",
+    "up_primary",
+    "acting_primary",
+    "last_scrub_stamp",
+    "last_deep_scrub_stamp",
+]
+STAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
+
+
+def _timestamp(stamp):
+    """Return the epoch seconds of a ceph timestamp, 0 when not available."""
+    try:
+        # fromisoformat is much faster, it accepts the +0000 offset from python 3.11
+        return datetime.datetime.fromisoformat(stamp).timestamp()
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        return datetime.datetime.strptime(stamp, STAMP_FORMAT).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class PGStatsIndex:
+    """
+    Columns of the PG statistics with inverted indexes on pool, state and OSD
+    Usage:
+        pg_stats = rados_obj.get_pg_stats_index()
+        pg_stats.pgs_in_state("active", "clean", pool=3)
+        pg_stats.pgs_by_osd(osd=5)
+    """
+
+    def __init__(self, pg_stats: list):
+        """
+        Builds the index
+        Args:
+            pg_stats: PG statistics as listed under pg_stats by "ceph pg dump pgs"
+        """
+        self.pgids = []
+        self.pools = array("l")
+        self.seqs = array("l")
+        self.states = array("Q")
+        self.state_names = []
+        self.up = []
+        self.acting = []
+        self.up_primary = array("l")
+        self.acting_primary = array("l")
+        self.scrub_stamps = array("d")
+        self.deep_scrub_stamps = array("d")
+        self.state_bits = {}
+
+        self._rows = {}
+        _names = {}
+        self._by_pool = defaultdict(set)
+        self._by_state = defaultdict(set)
+        self._by_up = defaultdict(set)
+        self._by_acting = defaultdict(set)
+
+        for row, pg in enumerate(pg_stats):
+            pool, seq = pg["pgid"].split(".")
+            self.pgids.append(pg["pgid"])
+            self.pools.append(int(pool))
+            self.seqs.append(int(seq, 16))
+            self.states.append(self._state_mask(pg["state"].split("+")))
+            self.state_names.append(_names.setdefault(pg["state"], pg["state"]))
+            self.up.append(tuple(pg.get("up") or ()))
+            self.acting.append(tuple(pg.get("acting") or ()))
+            self.up_primary.append(pg.get("up_primary", -1))
+            self.acting_primary.append(pg.get("acting_primary", -1))
+            self.scrub_stamps.append(_timestamp(pg.get("last_scrub_stamp")))
+            self.deep_scrub_stamps.append(_timestamp(pg.get("last_deep_scrub_stamp")))
+
+            self._rows[pg["pgid"]] = row
+            self._by_pool[int(pool)].add(row)
+            for state in pg["state"].split("+"):
+                self._by_state[state].add(row)
+            for osd in self.up[row]:
+                self._by_up[osd].add(row)
+            for osd in self.acting[row]:
+                self._by_acting[osd].add(row)
+
+        log.debug(f"Indexed {len(self.pgids)} PGs across {len(self._by_pool)} pools")
+
+    def __len__(self):
+        return len(self.pgids)
+
+    def __contains__(self, pgid):
+        return pgid in self._rows
+
+    def _state_mask(self, states):
+        mask = 0
+        for state in states:
+            if state not in self.state_bits:
+                self.state_bits[state] = 1 << len(self.state_bits)
+            mask |= self.state_bits[state]
+
+        return mask
+
+    def _pgids(self, rows):
+        return [self.pgids[row] for row in sorted(rows)]
+
+    def state(self, pgid: str) -> str:
+        """
+        Returns the state of the PG
+        Args:
+            pgid: PG ID
+        Returns: PG state, eg: active+clean
+        """
+        return self.state_names[self._rows[pgid]]
+
+    def acting_set(self, pgid: str) -> list:
+        """
+        Returns the acting set of the PG
+        Args:
+            pgid: PG ID
+        Returns: list of OSD IDs
+        """
+        return list(self.acting[self._rows[pgid]])
+
+    def pool_pgs(self, pool: int) -> list:
+        """
+        Returns the PGs of the pool
+        Args:
+            pool: pool ID
+        Returns: list of PG IDs
+        """
+        return self._pgids(self._by_pool.get(pool, ()))
+
+    def pgs_by_osd(self, osd: int, primary: bool = False, up: bool = False) -> list:
+        """
+        Returns the PGs mapped to the OSD
+        Args:
+            osd: OSD ID
+            primary: only the PGs where the OSD is the primary
+            up: use the up set instead of the acting set
+        Returns: list of PG IDs
+        """
+        rows = (self._by_up if up else self._by_acting).get(osd, set())
+        if primary:
+            primaries = self.up_primary if up else self.acting_primary
+            rows = {row for row in rows if primaries[row] == osd}
+
+        return self._pgids(rows)
+
+    def pgs_in_state(
+        self, *states: str, pool: int = None, any_state: bool = False
+    ) -> list:
+        """
+        Returns the PGs in the given states
+        Example:
+            pgs_in_state("active", "clean", pool=3)
+            pgs_in_state("degraded", "inconsistent", any_state=True)
+        Args:
+            states: PG states, the PGs should be in all of them
+            pool: pool ID, all the pools when not provided
+            any_state: the PGs should be in at least one of the states
+        Returns: list of PG IDs
+        """
+        matches = [self._by_state.get(state, set()) for state in states]
+        if any_state:
+            rows = set().union(*matches)
+        else:
+            rows = set.intersection(*matches) if matches else set(range(len(self)))
+
+        if pool is not None:
+            rows = rows & self._by_pool.get(pool, set())
+
+        return self._pgids(rows)
+
+    def pgs_not_in_state(self, *states: str, pool: int = None) -> list:
+        """
+        Returns the PGs missing at least one of the given states
+        Example:
+            pgs_not_in_state("active", "clean")
+        Args:
+            states: PG states
+            pool: pool ID, all the pools when not provided
+        Returns: list of PG IDs
+        """
+        rows = self._by_pool.get(pool, set()) if pool is not None else range(len(self))
+        mask = self._state_mask(states)
+        return self._pgids(row for row in rows if self.states[row] & mask != mask)
+
+    def scrubbed_since(self, snapshot: "PGStatsIndex", deep: bool = False) -> list:
+        """
+        Returns the PGs whose scrub stamp advanced since the given snapshot
+        Args:
+            snapshot: PGStatsIndex built earlier
+            deep: compare the deep-scrub stamps
+        Returns: list of PG IDs
+        """
+        current = self.deep_scrub_stamps if deep else self.scrub_stamps
+        previous = snapshot.deep_scrub_stamps if deep else snapshot.scrub_stamps
+        return [
+            pgid
+            for row, pgid in enumerate(self.pgids)
+            if pgid in snapshot._rows and current[row] > previous[snapshot._rows[pgid]]
+        ]
@@ -43,10 +43,7 @@ def copy_file(file_name, src, dest):
         src: Source CephNode object
         dest: Destination CephNode object
     """
-    contents, err = src.exec_command(sudo=True, cmd="cat {}".format(file_name))
-    key_file = dest.remote_file(sudo=True, file_name=file_name, file_mode="w")
-    key_file.write(contents)
-    key_file.flush()
+    src.copy_file_to(dest, file_name, sudo=True)
 
 
 def get_md5sum_rbd_image(**kw):
@@ -0,0 +1,222 @@
+"""File transfers over the pooled SSH connections of the nodes.
+
+The transfers run on the cached SFTP sessions of the connections. Files smaller
+than PARALLEL_THRESHOLD are sent with the pipelined put and the prefetching get
+of paramiko. Larger files are split into byte ranges that are transferred in
+parallel, each on its own SFTP session of the same connection::
+
+    upload(node.root_connection, "/tmp/fio.tar", "/root/fio.tar")
+    copy(src.root_connection, "/etc/ceph/ceph.conf", dst.root_connection)
+
+Copies between nodes are streamed through the runner without staging the file
+on the local disk.
+"""
+
+import os
+
+from ceph.parallel import parallel
+from utility.log import Log
+
+log = Log(__name__)
+
+# Largest read served in a single SFTP request by paramiko.
+BLOCK_SIZE = 32768
+CHUNK_SIZE = 16 * 1024 * 1024
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+MAX_WORKERS = 4
+
+
+def _ranges(size, chunk_size, start=0):
+    """Return the (offset, length) tuples covering size bytes from start."""
+    return [
+        (start + offset, min(chunk_size, size - offset))
+        for offset in range(0, size, chunk_size)
+    ]
+
+
+def _in_parallel(size, chunk_size, max_workers, func, *args):
+    log.debug(f"Transferring {size} bytes in chunks of {chunk_size} bytes")
+    with parallel(max_workers=max_workers) as p:
+        for offset, length in _ranges(size, chunk_size):
+            p.spawn(func, *args, offset, length)
+
+
+def _write_blocks(blocks, writer, length):
+    """Write the blocks to the file object, returns the bytes written."""
+    written = 0
+    for data in blocks:
+        writer.write(data)
+        written += len(data)
+
+    if written != length:
+        raise IOError(f"Expected {length} bytes, transferred {written}")
+
+    return written
+
+
+def _read_blocks(reader, length):
+    """Yield the blocks read from the current position of the file object."""
+    while length > 0:
+        data = reader.read(min(BLOCK_SIZE, length))
+        if not data:
+            return
+
+        length -= len(data)
+        yield data
+
+
+def _prefetched_blocks(reader, offset, length):
+    """Yield the blocks of the range, requested ahead of being consumed."""
+    return reader.readv(_ranges(length, BLOCK_SIZE, start=offset))
+
+
+def upload(
+    connection,
+    src,
+    dst,
+    chunk_size=CHUNK_SIZE,
+    threshold=PARALLEL_THRESHOLD,
+    max_workers=MAX_WORKERS,
+):
+    """
+    Upload the local file to the node.
+
+    Args:
+        connection (SSHConnectionManager): connection to the node
+        src (str): local file path
+        dst (str): remote file path
+        chunk_size (int): bytes transferred by every parallel worker
+        threshold (int): files of this size or more are sent in parallel chunks
+        max_workers (int): number of chunks transferred at a time
+
+    Returns:
+        number of bytes transferred
+    """
+    size = os.path.getsize(src)
+    if size < threshold:
+        with connection.sftp() as sftp:
+            sftp.put(src, dst)
+        return size
+
+    with connection.sftp() as sftp:
+        sftp.open(dst, "wb").close()
+
+    _in_parallel(size, chunk_size, max_workers, _upload_range, connection, src, dst)
+    return size
+
+
+def _upload_range(connection, src, dst, offset, length):
+    with open(src, "rb") as reader, connection.sftp() as sftp:
+        with sftp.open(dst, "r+b") as writer:
+            writer.set_pipelined(True)
+            reader.seek(offset)
+            writer.seek(offset)
+            _write_blocks(_read_blocks(reader, length), writer, length)
+
+
+def download(
+    connection,
+    src,
+    dst,
+    chunk_size=CHUNK_SIZE,
+    threshold=PARALLEL_THRESHOLD,
+    max_workers=MAX_WORKERS,
+):
+    """
+    Download the file of the node.
+
+    Args:
+        connection (SSHConnectionManager): connection to the node
+        src (str): remote file path
+        dst (str): local file path
+        chunk_size (int): bytes transferred by every parallel worker
+        threshold (int): files of this size or more are fetched in parallel chunks
+        max_workers (int): number of chunks transferred at a time
+
+    Returns:
+        number of bytes transferred
+    """
+    with connection.sftp() as sftp:
+        size = sftp.stat(src).st_size
+        if size < threshold:
+            sftp.get(src, dst)
+            return size
+
+    with open(dst, "wb") as fp:
+        fp.truncate(size)
+
+    _in_parallel(size, chunk_size, max_workers, _download_range, connection, src, dst)
+    return size
+
+
+def _download_range(connection, src, dst, offset, length):
+    with connection.sftp() as sftp, sftp.open(src, "rb") as reader:
+        with open(dst, "r+b") as writer:
+            writer.seek(offset)
+            _write_blocks(_prefetched_blocks(reader, offset, length), writer, length)
+
+
+def copy(
+    src_connection,
+    src,
+    dst_connection,
+    dst=None,
+    chunk_size=CHUNK_SIZE,
+    threshold=PARALLEL_THRESHOLD,
+    max_workers=MAX_WORKERS,
+):
+    """
+    Copy the file from one node to another.
+
+    The reads are prefetched from the source and the writes are pipelined to
+    the destination, so the copy is not bound by the round trips to either.
+
+    Args:
+        src_connection (SSHConnectionManager): connection to the source node
+        src (str): file path on the source node
+        dst_connection (SSHConnectionManager): connection to the destination node
+        dst (str): file path on the destination node, same as src by default
+        chunk_size (int): bytes transferred by every parallel worker
+        threshold (int): files of this size or more are copied in parallel chunks
+        max_workers (int): number of chunks transferred at a time
+
+    Returns:
+        number of bytes transferred
+    """
+    dst = dst or src
+    if src_connection is dst_connection and src == dst:
+        raise ValueError(f"Cannot copy {src} onto itself")
+
+    with src_connection.sftp() as src_sftp:
+        size = src_sftp.stat(src).st_size
+
+    if size < threshold:
+        _copy_range(src_connection, src, dst_connection, dst, 0, size, truncate=True)
+        return size
+
+    with dst_connection.sftp() as dst_sftp:
+        dst_sftp.open(dst, "wb").close()
+
+    _in_parallel(
+        size,
+        chunk_size,
+        max_workers,
+        _copy_range,
+        src_connection,
+        src,
+        dst_connection,
+        dst,
+    )
+    return size
+
+
+def _copy_range(
+    src_connection, src, dst_connection, dst, offset, length, truncate=False
+):
+    with src_connection.sftp() as src_sftp, dst_connection.sftp() as dst_sftp:
+        with src_sftp.open(src, "rb") as reader:
+            with dst_sftp.open(dst, "wb" if truncate else "r+b") as writer:
+                writer.set_pipelined(True)
+                writer.seek(offset)
+                blocks = _prefetched_blocks(reader, offset, length) if length else []
+                _write_blocks(blocks, writer, length)
@@ -3,7 +3,6 @@ import json
 import os
 import re
 import time
-import traceback
 from json import loads
 from time import mktime
 
@@ -11,7 +10,6 @@ import requests
 import yaml
 from gevent import sleep
 from htmllistparse import fetch_listing
-from libcloud.common.exceptions import BaseHTTPError
 from libcloud.compute.providers import get_driver
 from libcloud.compute.types import Provider
 
@@ -19,7 +17,10 @@ from cli.utilities.configure import add_centos_epel_repo
 from compute.baremetal import CephBaremetalNode
 from compute.ibm_vpc import CephVMNodeIBM, get_ibm_service
 from compute.openstack import CephVMNodeV2, NetworkOpFailure, NodeError, VolumeOpFailure
+from compute.openstack import get_openstack_driver as get_osp_node_driver
+from compute.teardown import Teardown, openstack_teardown
 from utility.log import Log
+from utility.rate_limit import TokenBucket
 from utility.retry import retry
 from utility.utils import generate_node_name
 
@@ -30,6 +31,21 @@ log = Log(__name__)
 RETRY_EXCEPTIONS = (NodeError, VolumeOpFailure, NetworkOpFailure)
 DEFAULT_OSBS_SERVER = "http://file.corp.redhat.com/~kdreyer/osbs/"
 
+# Defaults for the number of nodes created at once and the rate at which the
+# creations are submitted to the cloud. Overridden using the provisioning
+# section of the cloud credentials globals.
+PROVISIONING_DEFAULTS = {"max-workers": 10, "rate": 0.5, "burst": 3}
+# Removals of IBM instances started per second, Cloudflare blacklists faster ones.
+IBM_REMOVAL_RATE = 1 / 3
+
+
+def get_provisioning_config(cloud_globals):
+    """Return the provisioning limits set in the cloud credentials."""
+    config = dict(PROVISIONING_DEFAULTS)
+    config.update(cloud_globals.get("provisioning") or {})
+
+    return config
+
 
 def cleanup_ibmc_ceph_nodes(ibm_cred, pattern):
     """
@@ -66,19 +82,20 @@ def cleanup_ibmc_ceph_nodes(ibm_cred, pattern):
         instances += instance_list
 
     # Throttling removal otherwise Cloudflare will blacklist us
-    counter = 0
-    with parallel() as p:
-        for instance in instances:
-            sleep(counter * 3)
-            vsi = CephVMNodeIBM(
-                access_key=ibmc["access-key"],
-                service_url=ibmc["service-url"],
-                node=instance,
-            )
-            p.spawn(vsi.delete, ibmc["zone_name"])
-            counter += 1
+    teardown = Teardown(rate_limit=TokenBucket(rate=IBM_REMOVAL_RATE))
+    for instance in instances:
+        vsi = CephVMNodeIBM(
+            access_key=ibmc["access-key"],
+            service_url=ibmc["service-url"],
+            node=instance,
+        )
+        teardown.add(
+            f"node/{instance['name']}/{instance['id']}", vsi.delete, ibmc["zone_name"]
+        )
 
+    summary = teardown.run()
     log.info(f"Done cleaning up nodes with pattern {pattern}")
+    return summary
 
 
 def create_baremetal_ceph_nodes(cluster_conf):
@@ -185,7 +202,9 @@ def create_ibmc_ceph_nodes(
         else:
             params["root-login"] = True
 
-        with parallel() as p:
+        provisioning = get_provisioning_config(ibm_glbs)
+        rate_limit = TokenBucket(provisioning["rate"], provisioning["burst"])
+        with parallel(max_workers=provisioning["max-workers"]) as p:
             for node in range(1, 100):
                 node = "node" + str(node)
                 if not ceph_cluster.get(node):
@@ -217,11 +236,15 @@ def create_ibmc_ceph_nodes(
                 if node_dict.get("cloud-data"):
                     node_params["cloud-data"] = node_dict.get("cloud-data")
 
-                # Throttling the spawning of VSI's to avoid hammering of provisioner
-                sleep(node_count * 5)
                 node_count += 1
-
-                p.spawn(setup_vm_node_ibm, node, ceph_nodes, **node_params)
+                p.spawn_tagged(
+                    node,
+                    setup_vm_node_ibm,
+                    node,
+                    ceph_nodes,
+                    rate_limit=rate_limit,
+                    **node_params,
+                )
 
     if len(ceph_nodes) != node_count:
         log.error(
@@ -235,14 +258,18 @@ def create_ibmc_ceph_nodes(
 
 
 @retry(RETRY_EXCEPTIONS, tries=3, delay=10)
-def setup_vm_node_ibm(node, ceph_nodes, **params):
+def setup_vm_node_ibm(node, ceph_nodes, rate_limit=None, **params):
     """
     Create the VM node using IBM API calls.
 
     The retry decorator will trigger a rerun when a soft error is encountered. The VM
     node is removed in exception scope before throwing raising the exception again.
+    Every attempt waits for a token of the given rate limit, if any.
     """
     vm = None
+    if rate_limit:
+        rate_limit.acquire()
+
     try:
         vm = CephVMNodeIBM(
             access_key=params["accesskey"], service_url=params["service_url"]
@@ -324,9 +351,25 @@ def create_ceph_nodes(
         else:
             params["root-login"] = True
 
-        with parallel() as p:
+        # All the nodes share one authenticated driver and the creations are
+        # submitted at a limited rate instead of being staggered.
+        driver = get_osp_node_driver(
+            username=params["username"],
+            password=params["password"],
+            auth_url=params["auth-url"],
+            auth_version=params["auth-version"],
+            tenant_name=params["tenant-name"],
+            tenant_domain_id=params["tenant-domain-id"],
+            service_region=params["service-region"],
+            domain_name=params["domain"],
+        )
+        # Authenticate once, before the creations share the connection.
+        driver.connection.get_service_catalog()
+
+        provisioning = get_provisioning_config(osp_glbs)
+        rate_limit = TokenBucket(provisioning["rate"], provisioning["burst"])
+        with parallel(max_workers=provisioning["max-workers"]) as p:
             for node in range(1, 100):
-                sleep(10 * node)
                 node = "node" + str(node)
                 if not ceph_cluster.get(node):
                     break
@@ -359,7 +402,15 @@ def create_ceph_nodes(
                 if node_dict.get("cloud-data"):
                     node_params["cloud-data"] = node_dict.get("cloud-data")
                 node_count += 1
-                p.spawn(setup_vm_node, node, ceph_nodes, **node_params)
+                p.spawn_tagged(
+                    node,
+                    setup_vm_node,
+                    node,
+                    ceph_nodes,
+                    driver=driver,
+                    rate_limit=rate_limit,
+                    **node_params,
+                )
 
     if len(ceph_nodes) != node_count:
         log.error(
@@ -373,14 +424,18 @@ def create_ceph_nodes(
 
 
 @retry(RETRY_EXCEPTIONS, tries=3, delay=10)
-def setup_vm_node(node, ceph_nodes, **params):
+def setup_vm_node(node, ceph_nodes, driver=None, rate_limit=None, **params):
     """
     Create the VM node using OpenStack API calls.
 
     The retry decorator will trigger a rerun when a soft error is encountered. The VM
     node is removed in exception scope before throwing raising the exception again.
+    Every attempt waits for a token of the given rate limit, if any.
     """
     vm = None
+    if rate_limit:
+        rate_limit.acquire()
+
     try:
         vm = CephVMNodeV2(
             username=params["username"],
@@ -391,6 +446,7 @@ def setup_vm_node(node, ceph_nodes, **params):
             tenant_domain_id=params["tenant-domain-id"],
             service_region=params["service-region"],
             domain_name=params["domain"],
+            driver=driver,
         )
 
         vm.create(
@@ -447,71 +503,44 @@ def get_openstack_driver(yaml):
 
 
 def cleanup_ceph_nodes(osp_cred, pattern=None, timeout=300):
+    """
+    Remove the OpenStack nodes and volumes whose names contain the pattern.
+
+    The volumes are detached before their servers are destroyed, the rest of
+    the removals run in parallel.
+
+    Args:
+        osp_cred: global configuration having the openstack credentials
+        pattern: pattern to match the resource names, default is -<user>-
+        timeout: seconds to wait for each resource to be removed
+
+    Returns:
+        TeardownSummary
+
+    Raises:
+        RuntimeError: when a node could not be removed
+    """
     log.info("Destroying existing osp instances..")
     user = os.getlogin()
     name = pattern if pattern else "-{user}-".format(user=user)
     driver = get_openstack_driver(osp_cred)
-    timeout = datetime.timedelta(seconds=timeout)
-    with parallel() as p:
-        for volume in driver.list_volumes():
-            if volume.name is None:
-                log.info("Volume has no name, skipping")
-            elif name in volume.name:
-                p.spawn(volume_cleanup, volume, osp_cred)
-                sleep(1)
-        sleep(30)
-        log.info("Done cleaning up volumes")
-        for node in driver.list_nodes():
-            if name in node.name:
-                starttime = datetime.datetime.now()
-                log.info(
-                    "Destroying node {node_name} with {timeout} timeout".format(
-                        node_name=node.name, timeout=timeout
-                    )
-                )
-                while True:
-                    try:
-                        node.destroy()
-                        break
-                    except AttributeError:
-                        if datetime.datetime.now() - starttime > timeout:
-                            raise RuntimeError(
-                                "Failed to destroy node {node_name} with {timeout} timeout:\n{stack_trace}".format(
-                                    node_name=node.name,
-                                    timeout=timeout,
-                                    stack_trace=traceback.format_exc(),
-                                )
-                            )
-                        else:
-                            sleep(1)
-                sleep(5)
-    log.info("Done cleaning up nodes")
+    volumes = list()
+    for volume in driver.list_volumes():
+        if volume.name is None:
+            log.info("Volume has no name, skipping")
+        elif name in volume.name:
+            volumes.append(volume)
 
+    nodes = [node for node in driver.list_nodes() if name in node.name]
+    summary = openstack_teardown(driver, nodes, volumes, timeout=timeout).run()
 
-def volume_cleanup(volume, osp_cred):
-    log.info("Removing volume %s", volume.name)
-    errors = {}
-    driver = get_openstack_driver(osp_cred)
-    sleep(10)
-    timeout = datetime.timedelta(seconds=200)
-    starttime = datetime.datetime.now()
-    while True:
-        try:
-            volobj = driver.ex_get_volume(volume.id)
-            driver.detach_volume(volobj)
-            sleep(30)
-            driver.destroy_volume(volobj)
-            break
-        except BaseHTTPError as e:
-            log.error(e, exc_info=True)
-            errors.update({volume.name: e.message})
-            if errors:
-                if datetime.datetime.now() - starttime > timeout:
-                    for vol, err in errors.items():
-                        log.error(
-                            "Error destroying {vol}: {err}".format(vol=vol, err=err)
-                        )
-                    return 1
+    failed = [task for task in summary.failed if task.startswith("node/")]
+    failed += [task for task in summary.skipped if task.startswith("node/")]
+    if failed:
+        raise RuntimeError(f"Failed to destroy nodes {failed} with {timeout}s timeout")
+
+    log.info("Done cleaning up nodes")
+    return summary
 
 
 def keep_alive(ceph_nodes):
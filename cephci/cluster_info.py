@@ -1,11 +1,11 @@
 import json
 import os
-import pickle
 import re
 
 import yaml
 from docopt import docopt
 
+from ceph.cluster_state import load_cluster_state
 from cli.cephadm.cephadm import CephAdm
 from cli.utilities.packages import Rpm, SubscriptionManager
 from cli.utilities.utils import (
@@ -17,11 +17,10 @@ from cli.utilities.utils import (
     get_running_containers,
 )
 from utility.log import Log
+from utility.log_collector import LogCollector
 
 log = Log(__name__)
 
-CEPH_VAR_LOG_DIR = "/var/log/ceph"
-
 doc = """
 Utility to gather cluster information
 
@@ -42,13 +41,7 @@ Utility to gather cluster information
 
 def _load_cluster_config(config):
     """Load cluster configration from Ceph CI object"""
-    cluster = None
-    with open(config, "rb") as f:
-        cluster = pickle.load(f)
-
-    [n.reconnect() for _, c in cluster.items() for n in c]
-
-    return cluster
+    return load_cluster_state(config)
 
 
 def get_node_details(node):
@@ -165,18 +158,7 @@ def get_ceph_var_logs(cluster, log_dir):
     This method is to download and store
     ceph cluster var logs into log directory.
     """
-    download_dir = os.path.join(log_dir, "ceph_logs")
-    os.makedirs(download_dir, exist_ok=True)
-    for node in cluster.get_nodes():
-        tar_file = f"{node.hostname}-cephlog.tar"
-        node.exec_command(cmd=f"tar -cvzf {tar_file} {CEPH_VAR_LOG_DIR}", sudo=True)
-
-        node.download_file(
-            src=tar_file,
-            dst=os.path.join(download_dir, tar_file),
-            sudo=True,
-        )
-        log.info(f"Downloading {tar_file} from {node.hostname} to {download_dir}")
+    LogCollector(log_dir).collect(cluster, sosreport=False)
 
 
 def write_output(data, output):
@@ -1,8 +1,8 @@
-import pickle
 import re
 
 from docopt import docopt
 
+from ceph.cluster_state import load_cluster_state
 from cephci.utils.configs import (
     get_configs,
     get_packages,
@@ -76,13 +76,7 @@ Utility to configure prerequisites for deployed cluster
 
 def _load_cluster_config(config):
     """Load cluster configration from Ceph CI object"""
-    cluster = None
-    with open(config, "rb") as f:
-        cluster = pickle.load(f)
-
-    [n.reconnect() for _, c in cluster.items() for n in c]
-
-    return cluster
+    return load_cluster_state(config)
 
 
 def setup_subscription_manager(node, server):
@@ -1,7 +1,8 @@
+import datetime
 import socket
+from contextlib import ExitStack
 
-import paramiko
-
+from ceph.ceph import SSHSessionPool, read_channel
 from cli.exceptions import RemoteConnectionError, UnexpectedStateError
 from cli.utilities.waiter import WaitUntil
 from utility.log import Log
@@ -25,7 +26,7 @@ class Remote:
         self._host = host
 
         # Connect to teuthology node
-        self._client = self._connect(host, ssh_key, username, password)
+        self._connection = self._connect(host, ssh_key, username, password)
 
     def _connect(self, host, ssh_key=None, username=None, password=None):
         """Connect to host
@@ -36,25 +37,24 @@ class Remote:
             username (str): Name of user to be connected
             password (str): Password of user
         """
-        client = None
+        connection = None
         try:
-            # Set client object
-            client = paramiko.SSHClient()
-
-            # Set missing host key polict
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
-            # Connect to host
+            # Reuse the pooled connection to host
             LOG.debug(f"Connecting to host {host}")
-            client.connect(
-                hostname=host, pkey=ssh_key, username=username, password=password
+            connection = SSHSessionPool.get(
+                host,
+                username,
+                password,
+                look_for_keys=bool(ssh_key),
+                private_key_file_path=ssh_key,
             )
+            connection.get_client()
         except Exception as e:
             LOG.error(f"Failed to connect to host '{host}' with error -\n{str(e)}")
             raise RemoteConnectionError(str(e))
 
         LOG.info(f"Connected to host '{host}' successfully")
-        return client
+        return connection
 
     def run(self, cmd, timeout=600):
         """Execute command on host
@@ -68,12 +68,16 @@ class Remote:
             # DEBUG.
             LOG.info(f"[{self._host}] Executing command - {cmd}")
 
-            # Execuet command on node
-            _, stdout, stderr = self._client.exec_command(command=cmd, timeout=timeout)
+            # Execute command on node
+            with self._connection.open_channel(timeout=timeout) as channel:
+                channel.settimeout(timeout)
+                channel.exec_command(cmd)
+                end_time = datetime.datetime.now() + datetime.timedelta(seconds=timeout)
+                stdout, stderr = read_channel(channel, end_time, timeout, log=False)
 
             # Format command output
-            stdout = "\n".join(map(lambda x: x.strip(), stdout.readlines()))
-            stderr = "\n".join(map(lambda x: x.strip(), stderr.readlines()))
+            stdout = "\n".join(map(lambda x: x.strip(), stdout.splitlines()))
+            stderr = "\n".join(map(lambda x: x.strip(), stderr.splitlines()))
         except Exception as e:
             LOG.error(f"Command '{cmd}' execution failed with error -\n{e}")
             raise RemoteConnectionError(e)
@@ -94,56 +98,59 @@ class Remote:
         # DEBUG.
         LOG.info(f"[{self._host}] Executing command in background - {cmd}")
 
+        stack = ExitStack()
         try:
-            # Get transport channel and set configs
-            channel = self._client.get_transport().open_session()
+            # Get channel from the pooled connection and set configs
+            channel = stack.enter_context(self._connection.open_channel())
             channel.setblocking(0)
 
             # Execute command on node
             channel.exec_command(command=cmd)
         except Exception as e:
+            stack.close()
             LOG.error(f"Command '{cmd}' execution failed with error -\n{e}")
             raise RemoteConnectionError(e)
 
-        # Wait for command execution and read output
-        for w in WaitUntil(timeout=timeout, interval=interval):
-            # Check for command status
-            if channel.exit_status_ready():
-                LOG.info(f"Command completed successfully within {timeout} sec")
-                break
+        with stack:
+            # Wait for command execution and read output
+            for w in WaitUntil(timeout=timeout, interval=interval):
+                # Check for command status
+                if channel.exit_status_ready():
+                    LOG.info(f"Command completed successfully within {timeout} sec")
+                    break
+
+                # Check command output
+                while True:
+                    try:
+                        # Get 1kb of output
+                        out = channel.recv(1024)
+                        if not out:
+                            break
+
+                        # Convert bytes to string
+                        stdout += out.decode()
+                    except socket.timeout:
+                        break
+
+                LOG.info(f"Command still in progress, waiting for {interval} sec")
 
-            # Check command output
+            # Raise exception in case command still in progress
+            if w.expired:
+                raise UnexpectedStateError(
+                    f"Failed to complete command within {timeout} sec"
+                )
+
+            # Read command error
             while True:
                 try:
-                    # Get 1kb of output
-                    out = channel.recv(1024)
-                    if not out:
+                    # Get 1kb of error
+                    err = channel.recv_stderr(1024)
+                    if not err:
                         break
 
                     # Convert bytes to string
-                    stdout += out.decode()
+                    stderr += err.decode()
                 except socket.timeout:
                     break
 
-            LOG.info(f"Command still in progress, waiting for {interval} sec")
-
-        # Raise exception in case command still in progress
-        if w.expired:
-            raise UnexpectedStateError(
-                f"Failed to complete command within {timeout} sec"
-            )
-
-        # Read command error
-        while True:
-            try:
-                # Get 1kb of error
-                err = channel.recv_stderr(1024)
-                if not err:
-                    break
-
-                # Convert bytes to string
-                stderr += err.decode()
-            except socket.timeout:
-                break
-
         return stdout, stderr
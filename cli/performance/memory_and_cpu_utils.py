@@ -1,19 +1,23 @@
 import os
-from threading import Thread
 
+from ceph.parallel import parallel
 from cli.utilities.configs import get_cephci_config
 from utility.log import Log
 
 log = Log(__name__)
 
 
-SCRIPT = "memory_and_cpu_logger.py"
+SCRIPT = "proc_sampler.py"
 SCRIPT_PATH = "cli/performance/utilities/"
 SCRIPT_DST_PATH = "/home/"
+SAMPLES_DIR = "/var/tmp/cephci-perf"
+# Seconds to wait for the sampler to write out its samples and exit
+STOP_TIMEOUT = 10
+MAX_WORKERS = 8
 
 
 def upload_mem_and_cpu_logger_script(cluster):
-    """Check and upload memory_and_cpu_logger.py to servers if not present
+    """Check and upload proc_sampler.py to servers if not present
 
     Args:
      cluster(ceph): List of all nodes where script has to be uploaded
@@ -42,103 +46,93 @@ def upload_mem_and_cpu_logger_script(cluster):
 
 def start_logging_processes(ceph_cluster, test_name):
     """
-    Start logging processes on all nodes for a given process
+    Start one sampler per node, sampling all the processes to be monitored
     Args:
         ceph_cluster(ceph): Ceph cluster object
         test_name(str): Name of the test
-        interval(int): Interval of monitoring
-    """
 
-    logging_process = []
-    tracker = {}
+    Returns:
+        list of nodes on which the sampler is running and the dictionary of
+        the node to the path of its samples, without the extension
+    """
     proc_mon_details = _get_process_list_to_monitor()
+    processes = ",".join(p.strip() for p in proc_mon_details["process_list"])
     interval = proc_mon_details["interval"]
-    for ceph_process in proc_mon_details["process_list"]:
-        role = ceph_process.replace("ceph-", "").strip()
-        nodes = ceph_cluster.get_nodes(role)
-        if not nodes:
-            log.info(
-                f"No nodes found specific to given process {ceph_process}, running on all nodes"
-            )
-            nodes = ceph_cluster.get_nodes()
-        for node in nodes:
-            log.info(f"Triggering monitoring for {ceph_process} on {node.hostname}")
-            if node not in tracker.keys():
-                tracker[node] = []
-            node_specific_test_name = f"{node.hostname}-{test_name}"
-            logger_cmd = (
-                f"/usr/bin/env python {SCRIPT_DST_PATH}{SCRIPT} -p {ceph_process.strip()} "
-                f"-t {node_specific_test_name} -i {interval}"
-            )
-            # Set the stop_flag as 0 before starting the test
-            cmd = f"echo '0' > {SCRIPT_DST_PATH}status"
-            node.exec_command(cmd=cmd, sudo=True)
-            th = Thread(
-                target=lambda: node.exec_command(
-                    cmd=logger_cmd, sudo=True, long_running=True
-                ),
-                args=(),
-            )
-            logging_process.append(th)
-            th.start()
-            tracker[node].append(f"{ceph_process.strip()}-{node_specific_test_name}")
-    return logging_process, tracker
+
+    tracker = {}
+    with parallel(max_workers=MAX_WORKERS) as p:
+        for node in ceph_cluster.get_nodes():
+            samples = f"{SAMPLES_DIR}/{test_name}"
+            tracker[node] = samples
+            p.spawn(_start_sampler, node, processes, interval, samples)
+
+    return list(tracker), tracker
+
+
+def _start_sampler(node, processes, interval, samples):
+    log.info(f"Triggering monitoring of {processes} on {node.hostname}")
+    # The sampler is detached from the channel, it is stopped with SIGTERM
+    cmd = (
+        f"mkdir -p {SAMPLES_DIR} && rm -f {samples}.csv && "
+        f"setsid nohup python3 {SCRIPT_DST_PATH}{SCRIPT} -p {processes} "
+        f"-i {interval} -o {samples}.csv -P {samples}.pid "
+        f"> {samples}.log 2>&1 < /dev/null &"
+    )
+    node.exec_command(cmd=cmd, sudo=True)
 
 
 def stop_logging_process(ceph_cluster, logging_process, download_path, tracker):
     """
-    Stops the logging process
+    Stops the samplers and downloads the samples
     Args:
         ceph_cluster(ceph): Ceph cluster object
-        logging_process(dict): Dictionary of all the active logging processes
+        logging_process(list): Nodes on which the sampler is running
         download_path(str): Path to where the data has to be downloaded
-        tracker(dict): Dict keeping track of each mon job
+        tracker(dict): Dict of the node to the path of its samples
     """
-    nodes = ceph_cluster.get_nodes()
-    for node in nodes:
-        # Set the stop_flag as 1 to stop the script running on the node
-        cmd = f"echo '1' > {SCRIPT_DST_PATH}status"
-        node.exec_command(cmd=cmd, sudo=True)
-
-    # Wait for all the process to complete
-    wait_for_logging_processes_to_stop(logging_process)
-
-    # Collect the mem logs from all the nodes
     download_logger_data_from_nodes(download_path, tracker)
 
 
-def wait_for_logging_processes_to_stop(logging_process):
-    """Wait for all given logging processes to stop
-    Args:
-     logging_process(list): List of all the active logging processes
-    """
-    for th in logging_process:
-        th.join()
-
-
 def download_logger_data_from_nodes(download_path, tracker):
     """
-    Downloads the logger data from all the nodes to the given path. The data will be collected and stored under folders
-    specific to each test case
+    Stops the samplers and downloads the samples from all the nodes to the given path. The samples will be stored
+    under folders specific to each test case
     Args:
         download_path(str): Path where the logs are to be downloaded
-        tracker(dict): Tracker Dictionary containing nodes and files to be copied for each node
+        tracker(dict): Tracker Dictionary containing nodes and the path of the samples of each node
     """
+    with parallel(max_workers=MAX_WORKERS) as p:
+        for node, samples in tracker.items():
+            p.spawn(_collect_samples, node, samples, download_path)
+
+    log.info("All files downloaded from all the nodes")
+
+
+def _collect_samples(node, samples, download_path):
+    test_name = os.path.basename(samples)
+    download_dir = f"{download_path}/performance-metrics/{test_name}"
+    os.makedirs(download_dir, exist_ok=True)
+    dst = f"{download_dir}/{node.hostname}.csv"
+
+    # Stopping the sampler and reading its samples share one channel
+    cmd = (
+        f"pid=$(cat {samples}.pid 2>/dev/null) && kill -TERM $pid; "
+        f"for i in $(seq {STOP_TIMEOUT * 5}); do "
+        f'[ -f {samples}.pid ] && [ "$pid" ] || break; sleep 0.2; done; '
+        f"cat {samples}.csv && rm -f {samples}.csv {samples}.log"
+    )
     try:
-        for node, files in tracker.items():
-            for file in files:
-                src_file = f"/root/{file}.csv"
-                download_dir = (
-                    f"{download_path}/performance-metrics/{file.split('-')[-1]}"
-                )
-                os.makedirs(download_dir, exist_ok=True)
-                node.download_file(
-                    src=src_file, dst=f"{download_dir}/{file}.csv", sudo=True
-                )
-                log.info(f"Downloading {file} from {node.hostname} to {download_dir}")
-        log.info("All files downloaded from all the nodes")
-    except Exception:
-        log.error(f"Failed to download {file} from {node.hostname}")
+        with open(dst, "wb") as fp:
+            node.exec_command(cmd=cmd, sudo=True, stream=fp.write, check_ec=False)
+
+        if node.exit_status:
+            raise Exception(f"Samples not found, exit code {node.exit_status}")
+
+        log.info(f"Downloaded {samples}.csv from {node.hostname} to {download_dir}")
+    except Exception as e:
+        log.error(f"Failed to download {samples}.csv from {node.hostname}: {e}")
+        if os.path.exists(dst):
+            os.remove(dst)
 
 
 def _get_process_list_to_monitor():
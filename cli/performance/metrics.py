@@ -0,0 +1,269 @@
+"""
+Module to aggregate the samples collected with --monitor-performance.
+The samples of every test are loaded from performance-metrics/<test>/<host>.csv
+into columns and summarised per daemon and per process
+1. p50, p95 and max CPU usage
+2. p50, p95 and max RSS
+3. RSS growth in MB per hour, to spot memory leaks
+The summary is compared against the summary of an earlier run, the baseline,
+to flag the regressions.
+Usage:
+    summary = analyze(run_dir, baseline="/ceph/run-1/performance-metrics/summary.json")
+"""
+
+import json
+import os
+from array import array
+from collections import defaultdict
+from csv import DictReader
+from datetime import datetime, timezone
+
+from utility.log import Log
+
+log = Log(__name__)
+
+METRICS_DIR = "performance-metrics"
+SUMMARY = "summary.json"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# A metric regresses when it grows by more than the ratio and the absolute margin
+REGRESSION_RATIO = 0.2
+CPU_MARGIN = 5.0
+RSS_MARGIN_MB = 64.0
+# RSS growth in MB per hour above which a process is considered to be leaking
+LEAK_SLOPE_MB_PER_HOUR = 32.0
+# Samples needed to estimate the RSS growth
+MIN_SLOPE_SAMPLES = 10
+
+
+class Series:
+    """Columns of the samples of a daemon."""
+
+    def __init__(self):
+        self.times = array("d")
+        self.cpu = array("d")
+        self.rss = array("d")
+
+    def __len__(self):
+        return len(self.times)
+
+    def add(self, row):
+        # Parse the whole row first, so that a malformed one leaves the columns aligned
+        sampled = (
+            datetime.strptime(row["timestamp"], TIMESTAMP_FORMAT)
+            .replace(tzinfo=timezone.utc)
+            .timestamp()
+        )
+        cpu, rss = float(row["cpu_percent"]), float(row["rss_mb"])
+        self.times.append(sampled)
+        self.cpu.append(cpu)
+        self.rss.append(rss)
+
+    def extend(self, other):
+        self.times.extend(other.times)
+        self.cpu.extend(other.cpu)
+        self.rss.extend(other.rss)
+
+
+def percentile(values, q):
+    """Return the q-th percentile of the values, linearly interpolated."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def slope(times, values):
+    """Return the least squares slope of the values per hour."""
+    if len(times) < MIN_SLOPE_SAMPLES:
+        return 0.0
+
+    hours = [(t - times[0]) / 3600 for t in times]
+    mean_x = sum(hours) / len(hours)
+    mean_y = sum(values) / len(values)
+    var_x = sum((x - mean_x) ** 2 for x in hours)
+    if not var_x:
+        return 0.0
+
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(hours, values))
+    return cov / var_x
+
+
+def summarize_series(series):
+    """Return the statistics of the samples."""
+    return {
+        "samples": len(series),
+        "cpu_p50": round(percentile(series.cpu, 50), 2),
+        "cpu_p95": round(percentile(series.cpu, 95), 2),
+        "cpu_max": round(max(series.cpu, default=0.0), 2),
+        "rss_p50": round(percentile(series.rss, 50), 2),
+        "rss_p95": round(percentile(series.rss, 95), 2),
+        "rss_max": round(max(series.rss, default=0.0), 2),
+        "rss_slope": round(slope(series.times, series.rss), 2),
+    }
+
+
+def load_samples(directory):
+    """
+    Load the samples of every test
+    Args:
+        directory (str): performance-metrics directory of the run
+    Returns:
+        dict of test to the dict of (host, process, daemon) to its Series
+    """
+    samples = dict()
+    for test in sorted(os.listdir(directory)):
+        test_dir = os.path.join(directory, test)
+        if not os.path.isdir(test_dir):
+            continue
+
+        series = defaultdict(Series)
+        for name in sorted(os.listdir(test_dir)):
+            if not name.endswith(".csv"):
+                continue
+
+            host = name[: -len(".csv")]
+            with open(os.path.join(test_dir, name), newline="") as fp:
+                for row in DictReader(fp):
+                    try:
+                        series[(host, row["process"], row["daemon"])].add(row)
+                    except (KeyError, TypeError, ValueError):
+                        log.debug(f"Skipping malformed sample in {test}/{name}")
+
+        samples[test] = dict(series)
+
+    return samples
+
+
+def summarize(samples):
+    """
+    Summarise the samples of every test per daemon and per process
+    Args:
+        samples (dict): samples as returned by load_samples
+    Returns:
+        dict of test to the statistics of its daemons and processes
+    """
+    summary = dict()
+    for test, series in samples.items():
+        daemons = dict()
+        processes = defaultdict(Series)
+        slopes = defaultdict(float)
+        for (host, process, daemon), columns in sorted(series.items()):
+            daemons[f"{host}/{daemon}"] = dict(
+                summarize_series(columns), process=process
+            )
+            processes[process].extend(columns)
+            slopes[process] = max(
+                slopes[process], daemons[f"{host}/{daemon}"]["rss_slope"]
+            )
+
+        summary[test] = {
+            "daemons": daemons,
+            # Process statistics are comparable across runs, unlike the host names
+            "processes": {
+                process: dict(summarize_series(columns), rss_slope=slopes[process])
+                for process, columns in sorted(processes.items())
+            },
+        }
+
+    return summary
+
+
+def _exceeds(current, previous, margin):
+    return current > previous * (1 + REGRESSION_RATIO) and current - previous > margin
+
+
+def compare(summary, baseline):
+    """
+    Compare the process statistics of the tests with the baseline
+    Args:
+        summary (dict): summary as returned by summarize
+        baseline (dict): summary of an earlier run
+    Returns:
+        list of the regressions
+    """
+    checks = [
+        ("cpu_p95", CPU_MARGIN),
+        ("cpu_max", CPU_MARGIN),
+        ("rss_p95", RSS_MARGIN_MB),
+        ("rss_max", RSS_MARGIN_MB),
+    ]
+    regressions = []
+    for test, stats in sorted(summary.items()):
+        for process, current in sorted(stats["processes"].items()):
+            previous = baseline.get(test, {}).get("processes", {}).get(process)
+            leaking = current["rss_slope"] > LEAK_SLOPE_MB_PER_HOUR
+            if leaking and (
+                not previous or previous["rss_slope"] <= LEAK_SLOPE_MB_PER_HOUR
+            ):
+                regressions.append(
+                    {
+                        "test": test,
+                        "process": process,
+                        "metric": "rss_slope",
+                        "baseline": previous["rss_slope"] if previous else None,
+                        "current": current["rss_slope"],
+                    }
+                )
+
+            if not previous:
+                continue
+
+            for metric, margin in checks:
+                if _exceeds(current[metric], previous[metric], margin):
+                    regressions.append(
+                        {
+                            "test": test,
+                            "process": process,
+                            "metric": metric,
+                            "baseline": previous[metric],
+                            "current": current[metric],
+                        }
+                    )
+
+    return regressions
+
+
+def analyze(run_dir, baseline=None):
+    """
+    Summarise the samples of the run and compare them with the baseline
+    The summary is written to performance-metrics/summary.json of the run.
+    Args:
+        run_dir (str): directory to which the samples were downloaded
+        baseline (str): summary.json of an earlier run
+    Returns:
+        dict with the summary of the tests and the regressions,
+        None when there are no samples
+    """
+    directory = os.path.join(run_dir, METRICS_DIR)
+    if not os.path.isdir(directory):
+        log.warning(f"No performance samples found in {directory}")
+        return None
+
+    result = {"tests": summarize(load_samples(directory))}
+    previous = dict()
+    if baseline:
+        try:
+            with open(baseline) as fp:
+                previous = json.load(fp)["tests"]
+            result["baseline"] = baseline
+        except (OSError, ValueError, KeyError) as e:
+            log.error(f"Unable to compare with the baseline {baseline}: {e}")
+
+    # Memory growth is flagged even without a baseline
+    result["regressions"] = compare(result["tests"], previous)
+
+    for regression in result["regressions"]:
+        log.warning(
+            f"Performance regression in {regression['test']}: {regression['process']} "
+            f"{regression['metric']} {regression['baseline']} -> {regression['current']}"
+        )
+
+    with open(os.path.join(directory, SUMMARY), "w") as fp:
+        json.dump(result, fp, indent=2, sort_keys=True)
+
+    return result
@@ -0,0 +1,299 @@
+"""
+A tool to sample the resource usage of the ceph daemons of a node.
+
+The counters of every process matching the given names are read straight from
+/proc/<pid>/stat, status and io once every interval and written to a CSV file
+in batches. The sampler runs till it receives SIGTERM or SIGINT and writes out
+the pending samples before exiting. SIGUSR1 writes out the pending samples
+without stopping the sampler.
+
+Usage:
+    proc_sampler.py --processes <comma separated process names>
+                    --interval <interval in seconds>
+                    --output <CSV file>
+    e.g: python3 proc_sampler.py -p ceph-mon,ceph-osd -i 10 -o /var/tmp/test.csv
+"""
+
+import argparse
+import csv
+import os
+import signal
+from datetime import datetime, timezone
+from time import monotonic
+
+PROC = "/proc"
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+# The kernel truncates the command names in /proc/<pid>/comm to 15 characters.
+COMM_LENGTH = 15
+FIELDS = [
+    "timestamp",
+    "process",
+    "daemon",
+    "pid",
+    "cpu_percent",
+    "rss_mb",
+    "threads",
+    "read_bytes",
+    "write_bytes",
+    "voluntary_ctxt_switches",
+    "nonvoluntary_ctxt_switches",
+]
+STOP_SIGNALS = {signal.SIGTERM, signal.SIGINT}
+# SIGUSR1 writes out the pending samples
+SIGNALS = STOP_SIGNALS | {signal.SIGUSR1}
+
+
+def read_file(path):
+    with open(path) as fp:
+        return fp.read()
+
+
+def daemon_name(process, cmdline):
+    """
+    Return the name of the ceph daemon from its command line arguments
+    e.g: osd.3 for "ceph-osd -n osd.3" and "ceph-osd --id 3"
+    """
+    for idx, arg in enumerate(cmdline[:-1]):
+        if arg in ("-n", "--name"):
+            return cmdline[idx + 1]
+        if arg in ("-i", "--id"):
+            return f"{process.replace('ceph-', '')}.{cmdline[idx + 1]}"
+
+    return process
+
+
+def find_processes(names, proc=PROC):
+    """
+    Find the processes with the given names
+    Returns:
+        dict of pid to the (process name, daemon name)
+    """
+    names = {name[:COMM_LENGTH]: name for name in names}
+    found = dict()
+    for entry in os.listdir(proc):
+        if not entry.isdigit():
+            continue
+
+        try:
+            comm = read_file(f"{proc}/{entry}/comm").strip()
+            if comm not in names:
+                continue
+
+            cmdline = read_file(f"{proc}/{entry}/cmdline").split("\0")
+        except OSError:
+            # The process exited while being looked at
+            continue
+
+        found[int(entry)] = (names[comm], daemon_name(names[comm], cmdline))
+
+    return found
+
+
+def read_counters(pid, proc=PROC):
+    """
+    Read the counters of the process
+    Returns:
+        dict with cpu_ticks, start_ticks, rss_kb, threads, the I/O bytes and
+        the context switches of the process
+    """
+    stat = read_file(f"{proc}/{pid}/stat")
+    # The command name may contain spaces, the fields from state follow the last ")"
+    fields = stat[stat.rindex(")") + 2 :].split()
+    counters = {
+        "cpu_ticks": int(fields[11]) + int(fields[12]),
+        "threads": int(fields[17]),
+        "start_ticks": int(fields[19]),
+        "read_bytes": "",
+        "write_bytes": "",
+    }
+
+    for line in read_file(f"{proc}/{pid}/status").splitlines():
+        key, _, value = line.partition(":")
+        if key == "VmRSS":
+            counters["rss_kb"] = int(value.split()[0])
+        elif key.endswith("ctxt_switches"):
+            counters[key] = int(value)
+
+    try:
+        for line in read_file(f"{proc}/{pid}/io").splitlines():
+            key, _, value = line.partition(":")
+            if key in ("read_bytes", "write_bytes"):
+                counters[key] = int(value)
+    except OSError:
+        # io is readable only by the owner of the process and root
+        pass
+
+    return counters
+
+
+class Sampler:
+    """Samples the counters of the processes with the given names."""
+
+    def __init__(self, names, proc=PROC, rescan=6):
+        """
+        Initialize the sampler
+        Args:
+            names (list): process names, e.g: ["ceph-mon", "ceph-osd"]
+            proc (str): mount point of procfs
+            rescan (int): look for new processes every rescan samples
+        """
+        self.names = names
+        self.proc = proc
+        self.rescan = rescan
+        self.processes = dict()
+        self.previous = dict()
+        self.count = 0
+
+    def uptime(self):
+        return float(read_file(f"{self.proc}/uptime").split()[0])
+
+    def sample(self):
+        """Return the CSV rows of the current sample of all the processes."""
+        if self.count % self.rescan == 0:
+            self.processes = find_processes(self.names, self.proc)
+        self.count += 1
+
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        now = self.uptime()
+        rows = []
+        for pid, (process, daemon) in list(self.processes.items()):
+            try:
+                counters = read_counters(pid, self.proc)
+            except (OSError, ValueError, IndexError):
+                # The process exited, a restarted daemon is found on the next rescan
+                del self.processes[pid]
+                self.previous.pop(pid, None)
+                continue
+
+            # Usage since the last sample, or since the start of the process
+            ticks, since = self.previous.get(
+                pid, (0, counters["start_ticks"] / CLK_TCK)
+            )
+            self.previous[pid] = (counters["cpu_ticks"], now)
+            elapsed = max(now - since, 1 / CLK_TCK)
+            cpu = (counters["cpu_ticks"] - ticks) / CLK_TCK / elapsed * 100
+
+            rows.append(
+                [
+                    timestamp,
+                    process,
+                    daemon,
+                    pid,
+                    round(cpu, 2),
+                    round(counters.get("rss_kb", 0) / 1024, 2),
+                    counters["threads"],
+                    counters["read_bytes"],
+                    counters["write_bytes"],
+                    counters.get("voluntary_ctxt_switches", ""),
+                    counters.get("nonvoluntary_ctxt_switches", ""),
+                ]
+            )
+
+        return rows
+
+
+def run(sampler, output, interval, flush_interval):
+    """
+    Sample at a fixed cadence till SIGTERM or SIGINT is received
+    Args:
+        sampler (Sampler): sampler of the processes
+        output (str): CSV file to which the samples are appended
+        interval (int): seconds between the samples
+        flush_interval (int): seconds between the writes of the samples
+    """
+    # The signals are received by sigtimedwait between the samples
+    mask = signal.pthread_sigmask(signal.SIG_BLOCK, SIGNALS)
+    try:
+        _run(sampler, output, interval, flush_interval)
+    finally:
+        signal.pthread_sigmask(signal.SIG_SETMASK, mask)
+
+
+def _run(sampler, output, interval, flush_interval):
+    with open(output, "a", newline="") as fp:
+        writer = csv.writer(fp)
+        if not fp.tell():
+            writer.writerow(FIELDS)
+
+        rows = []
+        start = monotonic()
+        flushed = start
+        tick = 0
+        while True:
+            rows.extend(sampler.sample())
+
+            # Samples missed while the node was busy are skipped, not bunched up
+            tick = max(tick + 1, int((monotonic() - start) / interval) + 1)
+            received = signal.sigtimedwait(
+                SIGNALS, max(start + tick * interval - monotonic(), 0)
+            )
+
+            if received or monotonic() - flushed >= flush_interval:
+                writer.writerows(rows)
+                fp.flush()
+                rows = []
+                flushed = monotonic()
+
+            if received and received.si_signo in STOP_SIGNALS:
+                return
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="A tool to sample the resource usage of processes"
+    )
+    parser.add_argument(
+        "-p",
+        "--processes",
+        type=str,
+        dest="processes",
+        required=True,
+        help="Comma separated names of the processes to be sampled",
+    )
+    parser.add_argument(
+        "-i",
+        "--interval",
+        type=int,
+        dest="interval",
+        default=60,
+        help="Time interval between consecutive samples(Default:60)",
+    )
+    parser.add_argument(
+        "-f",
+        "--flush-interval",
+        type=int,
+        dest="flush_interval",
+        default=60,
+        help="Time interval between writes of the samples(Default:60)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        dest="output",
+        required=True,
+        help="CSV file to which the samples are appended",
+    )
+    parser.add_argument(
+        "-P",
+        "--pidfile",
+        type=str,
+        dest="pidfile",
+        help="File to which the process ID of the sampler is written",
+    )
+    args = parser.parse_args()
+
+    if args.pidfile:
+        with open(args.pidfile, "w") as fp:
+            fp.write(str(os.getpid()))
+
+    try:
+        sampler = Sampler([p.strip() for p in args.processes.split(",") if p.strip()])
+        run(sampler, args.output, args.interval, args.flush_interval)
+    finally:
+        if args.pidfile and os.path.exists(args.pidfile):
+            os.remove(args.pidfile)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+A tool to run batches of file operations on a node.
+
+The operations are read from stdin as JSON lines and run with a pool of threads.
+The result of every operation is written to stdout as a JSON line once it
+completes, [index, error, value], where index is the position of the operation
+in the batch and error is null when the operation succeeded.
+
+Operations:
+    {"op": "create", "path": p, "size": 1}          file of random bytes
+    {"op": "create", "path": p, "data": "text"}     file with the text
+    {"op": "mkdir", "path": p}
+    {"op": "stat", "path": p}
+    {"op": "walk", "path": p}                       stats the tree, like ls -laR
+    {"op": "listdir", "path": p}
+    {"op": "rename", "path": p, "dst": q}
+    {"op": "chown", "path": p, "owner": "user:group"}
+    {"op": "chmod", "path": p, "mode": "644"}       or a symbolic mode, u+x
+    {"op": "remove", "path": p}                     like rm -rf
+    {"op": "checksum", "path": p, "algorithm": "md5"}
+    {"op": "manifest", "path": p, "algorithm": "md5"}
+
+create accepts "parents": true to create the missing parent directories.
+
+manifest hashes the regular files under the path in parallel and returns the
+entries [relative path, size, mtime in ns, digest] sorted by path. It accepts
+"recursive": false to hash the files of the directory only, and the entries of
+an earlier manifest as "previous" to reuse the digests of the files whose size
+and mtime did not change.
+
+The algorithms are the ones of hashlib, like md5 and blake2b, and the ones of
+the xxhash module, like xxh64 and xxh3_128, when it is installed on the node.
+
+Usage:
+    python3 file-ops-agent.py --workers <number of threads> < ops.jsonl
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import stat as stat_module
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+BLOCK_SIZE = 1024 * 1024
+
+
+def create(path, size=None, data=None, parents=False):
+    if parents:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "wb") as fp:
+        fp.write(data.encode() if data is not None else os.urandom(size or 0))
+
+
+def mkdir(path):
+    os.makedirs(path, exist_ok=True)
+
+
+def stat(path):
+    st = os.lstat(path)
+    return {
+        "size": st.st_size,
+        "mode": oct(st.st_mode & 0o7777),
+        "uid": st.st_uid,
+        "gid": st.st_gid,
+        "mtime": st.st_mtime,
+    }
+
+
+def _raise(error):
+    raise error
+
+
+def walk(path):
+    """Stat every entry under the path, returns the number of entries."""
+    entries = 0
+    for root, dirs, files in os.walk(path, onerror=_raise):
+        for name in dirs + files:
+            os.lstat(os.path.join(root, name))
+            entries += 1
+
+    return entries
+
+
+def listdir(path):
+    return sorted(os.listdir(path))
+
+
+def rename(path, dst):
+    os.rename(path, dst)
+
+
+def _id(value):
+    return int(value) if value.isdigit() else value or None
+
+
+def chown(path, owner):
+    user, _, group = owner.partition(":")
+    shutil.chown(path, _id(user), _id(group))
+
+
+def chmod(path, mode):
+    if re.fullmatch(r"[0-7]{3,4}", mode):
+        os.chmod(path, int(mode, 8))
+        return
+
+    proc = subprocess.run(
+        ["chmod", mode, path], stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    if proc.returncode:
+        raise OSError(proc.stderr.decode().strip())
+
+
+def remove(path):
+    try:
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        else:
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def new_digest(algorithm):
+    if algorithm.startswith("xxh"):
+        import xxhash
+
+        return getattr(xxhash, algorithm)()
+
+    try:
+        return hashlib.new(algorithm, usedforsecurity=False)
+    except TypeError:
+        # usedforsecurity is available from python 3.9
+        return hashlib.new(algorithm)
+
+
+def checksum(path, algorithm="md5"):
+    digest = new_digest(algorithm)
+    with open(path, "rb") as fp:
+        for block in iter(lambda: fp.read(BLOCK_SIZE), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def _files(path, recursive):
+    """Yield the relative path and the stat of the regular files."""
+    for root, dirs, files in os.walk(path, onerror=_raise):
+        for name in files:
+            st = os.lstat(os.path.join(root, name))
+            if stat_module.S_ISREG(st.st_mode):
+                yield os.path.relpath(os.path.join(root, name), path), st
+
+        if not recursive:
+            break
+
+
+def manifest(path, algorithm="md5", recursive=True, previous=None, workers=8):
+    # Fail early on an unknown algorithm rather than once per file
+    new_digest(algorithm)
+    known = {entry[0]: entry for entry in previous or []}
+    entries = []
+    pending = []
+    for name, st in _files(path, recursive):
+        entry = known.get(name)
+        if entry and entry[1:3] == [st.st_size, st.st_mtime_ns]:
+            entries.append(entry)
+        else:
+            pending.append((name, st))
+
+    def _hash(item):
+        name, st = item
+        digest = checksum(os.path.join(path, name), algorithm)
+        return [name, st.st_size, st.st_mtime_ns, digest]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        entries.extend(executor.map(_hash, pending))
+
+    return sorted(entries)
+
+
+OPERATIONS = {
+    "create": create,
+    "mkdir": mkdir,
+    "stat": stat,
+    "walk": walk,
+    "listdir": listdir,
+    "rename": rename,
+    "chown": chown,
+    "chmod": chmod,
+    "remove": remove,
+    "checksum": checksum,
+    "manifest": manifest,
+}
+
+
+def run_op(op):
+    """Run the operation, returns the error and the value."""
+    args = dict(op)
+    try:
+        return None, OPERATIONS[args.pop("op")](**args)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}", None
+
+
+def run(ops, output, workers):
+    """
+    Run the operations and write their results as they complete
+    Args:
+        ops (list): operations
+        output (file): stream to which the results are written
+        workers (int): number of operations run at a time
+    """
+    lock = threading.Lock()
+
+    def _run(index, op):
+        error, value = run_op(op)
+        line = json.dumps([index, error, value], separators=(",", ":"))
+        with lock:
+            output.write(line + "\n")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for index, op in enumerate(ops):
+            executor.submit(_run, index, op)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="A tool to run batches of file operations"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        dest="workers",
+        default=16,
+        help="Number of operations run at a time(Default:16)",
+    )
+    args = parser.parse_args()
+
+    ops = [json.loads(line) for line in sys.stdin if line.strip()]
+    run(ops, sys.stdout, args.workers)
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
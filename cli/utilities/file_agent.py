@@ -0,0 +1,91 @@
+import json
+import os
+from threading import Lock
+
+from cli.exceptions import OperationFailedError
+from utility.log import Log
+
+log = Log(__name__)
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "file-ops-agent.py")
+REMOTE_SCRIPT = "/var/tmp/cephci-file-ops-agent.py"
+
+# Exit code of the command when the agent is missing on the node
+AGENT_MISSING = 100
+
+
+class FileAgent:
+    """
+    Runs batches of file operations on a node with file-ops-agent.py.
+
+    The agent is uploaded to the node once per run and every batch is sent over
+    a single channel, instead of running one command per file. Refer to
+    file-ops-agent.py for the supported operations.
+
+    Usage:
+        agent = FileAgent(client)
+        results = agent.run([{"op": "stat", "path": "/mnt/cephfs/file1"}])
+    """
+
+    _installed = set()
+    _lock = Lock()
+
+    def __init__(self, node, workers=16):
+        """
+        Args:
+            node (ceph): node on which the operations are run
+            workers (int): number of operations run at a time on the node
+        """
+        self.node = node
+        self.workers = workers
+
+    def install(self, force=False):
+        """Upload the agent to the node unless it was uploaded by this run."""
+        with self._lock:
+            if not force and self.node.hostname in self._installed:
+                return
+
+            self.node.upload_file(src=SCRIPT, dst=REMOTE_SCRIPT, sudo=True)
+            self._installed.add(self.node.hostname)
+
+    def run(self, ops, timeout=600):
+        """
+        Run the operations on the node
+        Args:
+            ops (list): operations, dicts with the op and its arguments
+            timeout (int): seconds to wait for all the operations
+        Returns:
+            list of (error, value) of the operations, in order. error is None
+            when the operation succeeded
+        """
+        if not ops:
+            return []
+
+        self.install()
+        cmd = (
+            f"[ -f {REMOTE_SCRIPT} ] || exit {AGENT_MISSING}; "
+            f"python3 {REMOTE_SCRIPT} --workers {self.workers}"
+        )
+        stdin = "".join(json.dumps(op) + "\n" for op in ops)
+        out, err = self.node.exec_command(
+            sudo=True, cmd=cmd, stdin=stdin, timeout=timeout, check_ec=False
+        )
+        if self.node.exit_status == AGENT_MISSING:
+            log.info(f"File agent missing on {self.node.hostname}, uploading again")
+            self.install(force=True)
+            out, err = self.node.exec_command(
+                sudo=True, cmd=cmd, stdin=stdin, timeout=timeout, check_ec=False
+            )
+
+        results = [("no result from the agent", None)] * len(ops)
+        for line in out.splitlines():
+            index, error, value = json.loads(line)
+            results[index] = (error, value)
+
+        if self.node.exit_status:
+            raise OperationFailedError(
+                f"File agent failed on {self.node.hostname} with code "
+                f"{self.node.exit_status}: {err}"
+            )
+
+        return results
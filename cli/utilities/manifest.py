@@ -0,0 +1,88 @@
+from collections import namedtuple
+
+from cli.exceptions import OperationFailedError
+from cli.utilities.file_agent import FileAgent
+from utility.log import Log
+
+log = Log(__name__)
+
+# mtime is in nanoseconds, as reported by the node
+Entry = namedtuple("Entry", ["path", "size", "mtime", "digest"])
+
+
+def get_manifest(
+    node, path, algorithm="md5", recursive=True, previous=None, timeout=3600
+):
+    """
+    Checksum the files under the path on the node, in parallel on the node
+    Args:
+        node (ceph): node on which the path is mounted
+        path (str): directory to checksum
+        algorithm (str): md5 for compatibility with md5sum, blake2b or xxh3_128
+                         (needs python3-xxhash on the node) for speed
+        recursive (bool): include the files of the sub directories
+        previous (list): manifest of the path taken earlier with the same
+                         algorithm, the digests of the files with the same size
+                         and mtime are reused instead of reading the files again
+        timeout (int): seconds to wait for the checksums
+    Returns:
+        list of the Entry of the regular files sorted by their path relative to
+        the directory
+    """
+    op = {
+        "op": "manifest",
+        "path": path,
+        "algorithm": algorithm,
+        "recursive": recursive,
+    }
+    if previous:
+        op["previous"] = [list(entry) for entry in previous]
+
+    [(error, entries)] = FileAgent(node).run([op], timeout=timeout)
+    if error:
+        raise OperationFailedError(
+            f"failed to checksum {path} on {node.hostname}: {error}"
+        )
+
+    return [Entry(*entry) for entry in entries]
+
+
+def diff_manifests(first, second):
+    """
+    Compare two manifests, like the ones of a snapshot on the primary and
+    the secondary cluster. The manifests are sorted, so are merged in one pass.
+    Args:
+        first (list): manifest as returned by get_manifest
+        second (list): manifest as returned by get_manifest
+    Returns:
+        dict with the paths missing from the second manifest, the paths added
+        to it and the paths whose size or digest differ
+    """
+    diff = {"missing": [], "added": [], "changed": []}
+    i = j = 0
+    while i < len(first) and j < len(second):
+        if first[i].path < second[j].path:
+            diff["missing"].append(first[i].path)
+            i += 1
+        elif first[i].path > second[j].path:
+            diff["added"].append(second[j].path)
+            j += 1
+        else:
+            if (first[i].size, first[i].digest) != (second[j].size, second[j].digest):
+                diff["changed"].append(first[i].path)
+            i += 1
+            j += 1
+
+    diff["missing"].extend(entry.path for entry in first[i:])
+    diff["added"].extend(entry.path for entry in second[j:])
+    return diff
+
+
+def manifests_match(first, second):
+    """Return True when the manifests have the same files with the same data."""
+    diff = diff_manifests(first, second)
+    for kind, paths in diff.items():
+        if paths:
+            log.error(f"{len(paths)} files {kind}, e.g. {paths[:5]}")
+
+    return not any(diff.values())
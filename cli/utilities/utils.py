@@ -14,6 +14,7 @@ import yaml
 from ceph.waiter import WaitUntil
 from cli.exceptions import ConfigError, OperationFailedError
 from cli.utilities.containers import Container
+from cli.utilities.file_agent import FileAgent
 from utility.log import Log
 
 log = Log(__name__)
@@ -34,6 +35,8 @@ def get_disk_list(node, expr=None, **kw):
         expr (str): expression to filter disks
         kw (dict): execute command parameters
     """
+    # Not read from the node facts, the disks change as the devices are
+    # attached and the OSDs deployed
     cmd = "lsblk -ln -o name"
     if expr:
         cmd += f" | grep {expr}"
@@ -139,9 +142,7 @@ def os_major_version(node, **kw):
     Args:
         node (ceph): Ceph node object
     """
-    cmd = r"cat /etc/os-release | tr -dc '0-9.'| cut -d \. -f1"
-    version, _ = node.exec_command(cmd=cmd, **kw)
-    return version.strip()
+    return node.distro_info["VERSION_ID"].split(".")[0]
 
 
 def get_release_info(node, **kw):
@@ -151,6 +152,10 @@ def get_release_info(node, **kw):
         node (ceph): ceph node object
         kw (dict): execute command parameters
     """
+    release = node.facts["release"]
+    if release:
+        return f"{release}\n", ""
+
     cmd = "cat /etc/redhat-release"
     return node.exec_command(cmd=cmd, **kw)
 
@@ -162,6 +167,10 @@ def get_kernel_version(node, **kw):
         node (ceph): ceph node object
         kw (dict): execute command parameters
     """
+    uname = node.facts["uname"]
+    if uname:
+        return f"{uname}\n", ""
+
     cmd = "uname -a"
     return node.exec_command(cmd=cmd, **kw)
 
@@ -654,23 +663,47 @@ def create_files(client, mount_point, file_count, windows_client=False):
         mount_point (str): mount path
         file_count (int): total file count
     """
+    if not windows_client:
+        ops = [
+            {"op": "create", "path": f"{mount_point}/file{i}", "size": 1}
+            for i in range(1, file_count + 1)
+        ]
+        _run_file_ops(client, ops, "failed to create file file{}")
+        return
+
     for i in range(1, file_count + 1):
         try:
-            if windows_client:
-                cmd = f"type nul > {mount_point}\\win_file{i}"
-                client.exec_command(
-                    cmd=cmd,
-                )
-            else:
-                cmd = f"dd if=/dev/urandom of={mount_point}/file{i} bs=1 count=1"
-                client.exec_command(
-                    sudo=True,
-                    cmd=cmd,
-                )
+            cmd = f"type nul > {mount_point}\\win_file{i}"
+            client.exec_command(
+                cmd=cmd,
+            )
         except Exception:
             raise OperationFailedError(f"failed to create file file{i}")
 
 
+def _run_file_ops(client, ops, message):
+    """
+    Run the file operations in a batch on the client
+    Args:
+        client (ceph): Client node
+        ops (list): operations on the files file1..fileN, in order
+        message (str): error message formatted with the number of the first
+                       file whose operation failed
+    """
+    try:
+        results = FileAgent(client).run(ops)
+    except Exception as e:
+        raise OperationFailedError(
+            f"failed to run the batch of {len(ops)} file operations on "
+            f"{client.hostname}: {e}"
+        ) from e
+
+    for i, (error, _) in enumerate(results, 1):
+        if error:
+            log.error(f"{ops[i - 1]['op']} of {ops[i - 1]['path']} failed: {error}")
+            raise OperationFailedError(message.format(i))
+
+
 def perform_lookups(client, mount_point, num_files, windows_client=False):
     """
     Perform lookups
@@ -679,21 +712,30 @@ def perform_lookups(client, mount_point, num_files, windows_client=False):
         mount_point (str): mount path
         num_files (int): total file count
     """
-    for _ in range(num_files):
+    if not windows_client:
         try:
-            if windows_client:
-                log.info(
-                    client.exec_command(
-                        cmd=f"dir {mount_point}",
-                    )
-                )
+            results = FileAgent(client).run(
+                [{"op": "walk", "path": f"{mount_point}/"}] * num_files
+            )
+        except Exception as e:
+            raise OperationFailedError(f"failed to perform lookups: {e}") from e
+
+        for error, entries in results:
+            if not error:
+                log.info(f"Looked up {entries} entries in {mount_point}")
+            elif error.startswith("FileNotFoundError"):
+                log.warning(f"Ignoring error: {error}")
             else:
-                log.info(
-                    client.exec_command(
-                        sudo=True,
-                        cmd=f"ls -laRt {mount_point}/",
-                    )
+                raise OperationFailedError(f"failed to perform lookups: {error}")
+        return
+
+    for _ in range(num_files):
+        try:
+            log.info(
+                client.exec_command(
+                    cmd=f"dir {mount_point}",
                 )
+            )
         except FileNotFoundError as e:
             error_message = str(e)
             if "No such file or directory" not in error_message:
@@ -712,14 +754,11 @@ def change_ownership(client, mount_point, file_count, user):
         num_files (int): total file count
         user (str): user name
     """
-    for i in range(1, file_count + 1):
-        try:
-            client.exec_command(
-                sudo=True,
-                cmd=f"chown {user} {mount_point}/file{i}",
-            )
-        except Exception:
-            raise OperationFailedError(f"failed to change ownership for file{i}")
+    ops = [
+        {"op": "chown", "path": f"{mount_point}/file{i}", "owner": user}
+        for i in range(1, file_count + 1)
+    ]
+    _run_file_ops(client, ops, "failed to change ownership for file{}")
 
 
 def change_permission(client, mount_point, file_count, permissions):
@@ -731,14 +770,11 @@ def change_permission(client, mount_point, file_count, permissions):
         num_files (int): total file count
         permissions (str): file permissions
     """
-    for i in range(1, file_count + 1):
-        try:
-            client.exec_command(
-                sudo=True,
-                cmd=f"chmod {permissions} {mount_point}/file{i}",
-            )
-        except Exception:
-            raise OperationFailedError(f"failed to change permission for file{i}")
+    ops = [
+        {"op": "chmod", "path": f"{mount_point}/file{i}", "mode": permissions}
+        for i in range(1, file_count + 1)
+    ]
+    _run_file_ops(client, ops, "failed to change permission for file{}")
 
 
 def generate_random_string(**kw):
@@ -818,18 +854,20 @@ def remove_files(client, mount_point, file_count, windows_client=False):
         mount_point (str): mount path
         file_count (int): total file count
     """
+    if not windows_client:
+        ops = [
+            {"op": "remove", "path": f"{mount_point}/file{i}"}
+            for i in range(1, file_count + 1)
+        ]
+        _run_file_ops(client, ops, "failed to remove file{}")
+        return
+
     for i in range(1, file_count + 1):
         try:
-            if windows_client:
-                cmd = f"del {mount_point}\\win_file{i}"
-                client.exec_command(
-                    cmd=cmd,
-                )
-            else:
-                client.exec_command(
-                    sudo=True,
-                    cmd=f"rm -rf {mount_point}/file{i}",
-                )
+            cmd = f"del {mount_point}\\win_file{i}"
+            client.exec_command(
+                cmd=cmd,
+            )
         except Exception:
             raise OperationFailedError(f"failed to remove file{i}")
 
@@ -944,19 +982,24 @@ def rename_file(client, mount_point, file_count, windows_client=False):
         file_count (int): total file count
         windows_client (bool): true for windows client
     """
+    if not windows_client:
+        ops = [
+            {
+                "op": "rename",
+                "path": f"{mount_point}/file{i}",
+                "dst": f"{mount_point}/new_file{i}",
+            }
+            for i in range(1, file_count + 1)
+        ]
+        _run_file_ops(client, ops, "failed to rename file file{}")
+        return
+
     for i in range(1, file_count + 1):
         try:
-            if windows_client:
-                cmd = f'ren "{mount_point}\\win_file{i}" "new_win_file{i}"'
-                client.exec_command(
-                    cmd=cmd,
-                )
-            else:
-                cmd = f"mv {mount_point}/file{i} {mount_point}/new_file{i}"
-                client.exec_command(
-                    sudo=True,
-                    cmd=cmd,
-                )
+            cmd = f'ren "{mount_point}\\win_file{i}" "new_win_file{i}"'
+            client.exec_command(
+                cmd=cmd,
+            )
         except Exception:
             raise OperationFailedError(f"failed to rename file file{i}")
 
@@ -982,15 +1025,12 @@ def create_trusted_ca_key(installer, nodes, copy_to_other_nodes=False):
         cmd = "systemctl restart sshd"
         installer.exec_command(cmd=cmd, sudo=True)
 
-        # Get the copy of the pub file to be copied to other nodes
-        src = "/etc/ssh/ca-key.pub"
-        dst = "/tmp/ca-key.pub"
-        installer.download_file(sudo=True, src=src, dst=dst)
         # Copy the key to all other nodes
+        src = "/etc/ssh/ca-key.pub"
         if copy_to_other_nodes:
             for ceph_node in nodes[1:]:
                 if not ceph_node == installer:
-                    ceph_node.upload_file(sudo=True, src=dst, dst=src)
+                    installer.copy_file_to(ceph_node, src, sudo=True)
 
                     # Restart sshd on the copied node
                     cmd = "systemctl restart sshd"
@@ -4,7 +4,7 @@ from copy import deepcopy
 from os.path import expanduser
 from typing import List, Optional
 
-from ceph.ceph import SSHConnectionManager
+from ceph.ceph import SSHSessionPool
 from utility.log import Log
 
 LOG = Log(__name__)
@@ -40,7 +40,7 @@ class CephBaremetalNode:
         self.private_key = params.get("root_private_key")
         if self.private_key:
             self.private_key = expanduser(self.private_key)
-            self.root_connection = SSHConnectionManager(
+            self.root_connection = SSHSessionPool.get(
                 self.params.get("ip"),
                 "root",
                 self.params.get("root_password"),
@@ -48,7 +48,7 @@ class CephBaremetalNode:
                 private_key_file_path=self.private_key,
             )
         else:
-            self.root_connection = SSHConnectionManager(
+            self.root_connection = SSHSessionPool.get(
                 self.params.get("ip"),
                 "root",
                 self.params.get("root_password"),
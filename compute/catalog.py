@@ -0,0 +1,157 @@
+"""Process wide cache of the cloud resources looked up while creating nodes.
+
+Images, flavors, networks and the like are fetched once per cloud account and
+shared by all the node creations of the run::
+
+    image = CATALOG.get(scope, "image", name, lambda: fetch_image(name))
+
+The free IP addresses of a network are tracked along with the addresses
+reserved by the creations in progress, so parallel creations spread across the
+subnets instead of all picking the first one with a few addresses left.
+"""
+
+import threading
+from time import monotonic
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from utility.log import Log
+
+LOG = Log(__name__)
+
+# Seconds for which the cached resources are valid.
+CATALOG_TTL = 900
+# Seconds for which the IP availability of a network is reused.
+IP_AVAILABILITY_TTL = 60
+# Seconds after which a reservation is expected to be reflected in the used
+# addresses reported by the cloud.
+IP_RESERVATION_TTL = 600
+
+
+class CloudCatalog:
+    """Cache of cloud resources keyed by account scope, resource kind and name."""
+
+    def __init__(self, ttl: int = CATALOG_TTL) -> None:
+        """
+        Initialize the catalog.
+
+        Args:
+            ttl:    Seconds for which a fetched resource is reused.
+        """
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[tuple, tuple] = dict()
+        self._locks: Dict[tuple, threading.Lock] = dict()
+        self._reservations: Dict[tuple, Dict] = dict()
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key: tuple) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(
+        self,
+        scope: Hashable,
+        kind: str,
+        name: Hashable,
+        fetch: Callable[[], Any],
+        ttl: Optional[int] = None,
+    ) -> Any:
+        """
+        Return the resource from the cache or fetch it.
+
+        Concurrent lookups of the same resource wait for a single fetch.
+
+        Args:
+            scope:  Identifies the cloud account, region or project.
+            kind:   The type of resource, example: image, flavor or network.
+            name:   The name of the resource.
+            fetch:  Callable returning the resource when it is not cached.
+            ttl:    Seconds for which the resource is reused, default is self.ttl.
+        """
+        key = (scope, kind, name)
+        ttl = self.ttl if ttl is None else ttl
+        with self._key_lock(key):
+            entry = self._entries.get(key)
+            if entry and entry[0] > monotonic():
+                self.hits += 1
+                return entry[1]
+
+            self.misses += 1
+            value = fetch()
+            self._entries[key] = (monotonic() + ttl, value)
+
+        return value
+
+    def invalidate(
+        self,
+        scope: Optional[Hashable] = None,
+        kind: Optional[str] = None,
+        name: Optional[Hashable] = None,
+    ) -> None:
+        """
+        Drop the cached resources matching the given scope, kind and name.
+
+        Args:
+            scope:  Drop the resources of this scope, all the scopes when not set.
+            kind:   Drop the resources of this type, all types when not set.
+            name:   Drop the resources with this name, all names when not set.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if all(
+                    value is None or value == key[idx]
+                    for idx, value in enumerate([scope, kind, name])
+                ):
+                    del self._entries[key]
+
+    def reserve_ip(
+        self,
+        scope: Hashable,
+        network: Hashable,
+        fetch: Callable[[], List[Dict]],
+        buffer: int = 3,
+    ) -> Optional[str]:
+        """
+        Reserve a free IP address in one of the subnets of the network.
+
+        The availability is fetched at most once every IP_AVAILABILITY_TTL seconds
+        and the addresses reserved in the meantime are deducted from it.
+
+        Args:
+            scope:      Identifies the cloud account, region or project.
+            network:    The ID of the network.
+            fetch:      Callable returning the subnets as a list of dictionaries
+                        having cidr, total_ips and used_ips.
+            buffer:     Number of addresses to be left free in the subnet.
+
+        Returns:
+            CIDR of the subnet in which the address is reserved, None if the
+            network does not have free addresses.
+        """
+        subnets = self.get(
+            scope, "ip-availability", network, fetch, ttl=IP_AVAILABILITY_TTL
+        )
+        key = (scope, network)
+        with self._key_lock(key):
+            now = monotonic()
+            held = self._reservations.setdefault(key, dict())
+            for subnet in subnets:
+                cidr = subnet["cidr"]
+                reservations, used = held.get(cidr, ([], subnet["used_ips"]))
+
+                # Addresses allocated since the last look are no longer reserved.
+                allocated = max(subnet["used_ips"] - used, 0)
+                reservations = [r for r in reservations[allocated:] if r > now]
+                held[cidr] = (reservations, subnet["used_ips"])
+
+                free_ips = subnet["total_ips"] - subnet["used_ips"] - len(reservations)
+                if free_ips > buffer:
+                    reservations.append(now + IP_RESERVATION_TTL)
+                    return cidr
+
+        LOG.debug(f"No free IP addresses left in network {network}")
+        return None
+
+
+CATALOG = CloudCatalog()
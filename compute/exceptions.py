@@ -23,3 +23,7 @@ class NodeError(Exception):
 
 class NodeDeleteFailure(Exception):
     pass
+
+
+class WaitTimeout(Exception):
+    pass
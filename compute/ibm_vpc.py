@@ -17,6 +17,7 @@ from ibm_cloud_sdk_core.authenticators import IAMAuthenticator
 from ibm_vpc import VpcV1  # noqa
 from requests.exceptions import ReadTimeout
 
+from compute.catalog import CATALOG
 from utility.log import Log
 from utility.retry import retry
 
@@ -162,6 +163,7 @@ class CephVMNodeIBM:
         self._subnet: str = ""
         self._roles: list = list()
         self.node = None
+        self._catalog_scope = (service_url, access_key)
 
         self.service = get_ibm_service(access_key=access_key, service_url=service_url)
         self.dns_service = get_dns_service(access_key=access_key)
@@ -306,19 +308,38 @@ class CephVMNodeIBM:
         """
         LOG.info(f"Starting to create VM with name {node_name}")
         try:
+            # The account resources are looked up once and shared by all the nodes
+            scope = self._catalog_scope
+
             # Construct a dict representation of a VPCIdentityById model
-            vpcs = self.service.list_vpcs()
-            vpc_id = get_resource_id(vpc_name, vpcs.get_result())
+            vpc_id = CATALOG.get(
+                scope,
+                "vpc",
+                vpc_name,
+                lambda: get_resource_id(
+                    vpc_name, self.service.list_vpcs().get_result()
+                ),
+            )
             vpc_identity_model = dict({"id": vpc_id})
 
-            subnets = self.service.list_subnets()
-            subnet = get_resource_details(network_name, subnets.get_result())
+            subnet = CATALOG.get(
+                scope,
+                "subnet",
+                network_name,
+                lambda: get_resource_details(
+                    network_name, self.service.list_subnets().get_result()
+                ),
+            )
             subnet_identity_model = dict({"id": subnet["id"]})
             self._subnet = subnet["ipv4_cidr_block"]
 
-            security_group = self.service.list_security_groups()
-            security_group_id = get_resource_id(
-                group_access, security_group.get_result()
+            security_group_id = CATALOG.get(
+                scope,
+                "security-group",
+                group_access,
+                lambda: get_resource_id(
+                    group_access, self.service.list_security_groups().get_result()
+                ),
             )
             security_group_identity_model = dict({"id": security_group_id})
 
@@ -332,13 +353,25 @@ class CephVMNodeIBM:
             )
 
             # Construct a dict representation of a ImageIdentityById model
-            images = self.service.list_images(name=image_name)
-            image_id = get_resource_id(image_name, images.get_result())
+            image_id = CATALOG.get(
+                scope,
+                "image",
+                image_name,
+                lambda: get_resource_id(
+                    image_name, self.service.list_images(name=image_name).get_result()
+                ),
+            )
             image_identity_model = dict({"id": image_id})
 
             # Construct a dict representation of a KeyIdentityById model
-            keys = self.service.list_keys()
-            key_id = get_resource_id(private_key, keys.get_result())
+            key_id = CATALOG.get(
+                scope,
+                "key",
+                private_key,
+                lambda: get_resource_id(
+                    private_key, self.service.list_keys().get_result()
+                ),
+            )
 
             key_identity_model = dict({"id": key_id})
             key_identity_shared = {
@@ -409,10 +442,17 @@ class CephVMNodeIBM:
 
             # DNS record creation phase
             LOG.debug(f"Adding DNS records for {node_name}")
-            dns_zone = self.dns_service.list_dnszones(
-                "b7efc2ce-ebf7-4dca-b7cf-b328171229a5"
+            dns_zone_id = CATALOG.get(
+                scope,
+                "dns-zone",
+                zone_name,
+                lambda: get_dns_zone_id(
+                    zone_name,
+                    self.dns_service.list_dnszones(
+                        "b7efc2ce-ebf7-4dca-b7cf-b328171229a5"
+                    ).get_result(),
+                ),
             )
-            dns_zone_id = get_dns_zone_id(zone_name, dns_zone.get_result())
 
             resource = self.dns_service.list_resource_records(
                 instance_id="b7efc2ce-ebf7-4dca-b7cf-b328171229a5",
@@ -464,6 +504,8 @@ class CephVMNodeIBM:
             raise
         except BaseException as be:  # noqa
             LOG.error(be, exc_info=True)
+            # The cached cloud resources could be stale, look them up again on retry.
+            CATALOG.invalidate(scope=self._catalog_scope)
             raise NodeError(f"Unknown error. Failed to create VM with name {node_name}")
 
     def delete(self, zone_name: Optional[str] = None) -> None:
@@ -15,6 +15,8 @@ from libcloud.compute.drivers.openstack import (
 from libcloud.compute.providers import get_driver
 from libcloud.compute.types import Provider
 
+from ceph.parallel import parallel
+from compute.catalog import CATALOG
 from utility.log import Log
 
 from .exceptions import (
@@ -24,10 +26,16 @@ from .exceptions import (
     NodeError,
     ResourceNotFound,
     VolumeOpFailure,
+    WaitTimeout,
 )
+from .teardown import openstack_teardown
+from .waiter import ResourceWatcher
 
 LOG = Log(__name__)
 
+# Volumes of a node created and attached at a time.
+MAX_VOLUME_WORKERS = 8
+
 # libcloud does not have a timeout enabled for Openstack calls to
 # ``create_node``, and it uses the default timeout value from socket which is
 # ``None`` (meaning: it will wait forever). This setting will set the default
@@ -111,6 +119,7 @@ class CephVMNodeV2:
         service_region: str,
         domain_name: str,
         node_name: Optional[str] = None,
+        driver: Optional[NodeDriver] = None,
     ) -> None:
         """
         Initialize the instance using the provided information.
@@ -127,8 +136,9 @@ class CephVMNodeV2:
             service_region: The realm to be used.
             domain_name:    The authentication domain to be used.
             node_name:      The name of the node to be retrieved.
+            driver:         An authenticated driver to be shared with other nodes.
         """
-        self.driver = get_openstack_driver(
+        self.driver = driver or get_openstack_driver(
             username=username,
             password=password,
             auth_url=auth_url,
@@ -139,6 +149,8 @@ class CephVMNodeV2:
             domain_name=domain_name,
         )
         self.node: Optional[Node] = None
+        self.volume_metrics: List[dict] = list()
+        self._catalog_scope = (auth_url, domain_name, tenant_name, service_region)
 
         # CephVM attributes
         self._subnet: list = list()
@@ -209,6 +221,8 @@ class CephVMNodeV2:
             raise
         except BaseException as be:  # noqa
             LOG.error(be, exc_info=True)
+            # The cached cloud resources could be stale, look them up again on retry.
+            CATALOG.invalidate(scope=self._catalog_scope)
             raise NodeError(f"Unknown error. Failed to create VM with name {node_name}")
 
         # Ideally, we should be able to use HEAD to check if self.node is stale or not
@@ -293,6 +307,12 @@ class CephVMNodeV2:
             ExactMatchFailed - when the named image resource does not exist in the given
                                OpenStack cloud.
         """
+        return CATALOG.get(
+            self._catalog_scope, "image", name, lambda: self._fetch_image(name)
+        )
+
+    def _fetch_image(self, name: str) -> NodeImage:
+        """Retrieve the NodeImage using the provided name or ID from the cloud."""
         try:
             if UUID(hex=name):
                 return self.driver.get_image(name)
@@ -326,7 +346,10 @@ class CephVMNodeV2:
             ResourceNotFound - when the named vm size resource does not exist in the
                                given OpenStack Cloud.
         """
-        for flavor in self.driver.list_sizes():
+        flavors = CATALOG.get(
+            self._catalog_scope, "flavors", None, self.driver.list_sizes
+        )
+        for flavor in flavors:
             if flavor.name == name:
                 return flavor
 
@@ -346,6 +369,15 @@ class CephVMNodeV2:
             ResourceNotFound: when the named network resource does not exist in the
                               given OpenStack cloud
         """
+        return CATALOG.get(
+            self._catalog_scope,
+            "network",
+            name,
+            lambda: self._fetch_network_by_name(name),
+        )
+
+    def _fetch_network_by_name(self, name: str) -> OpenStackNetwork:
+        """Retrieve the OpenStackNetwork using the provided name from the cloud."""
         url = f"{self.driver._networks_url_prefix}?name={name}"
         object_ = self.driver.network_connection.request(url).object
         networks = self.driver._to_networks(object_)
@@ -364,7 +396,9 @@ class CephVMNodeV2:
         of the workflow.
 
         When a subnet with free IPs is identified then it's CIDR information is
-        assigned to self.subnet attribute on this object.
+        assigned to self.subnet attribute on this object. An IP address of the
+        subnet is reserved in the cloud catalog, so that the nodes created in
+        parallel account for each other.
 
         Arguments:
             net:    The OpenStackNetwork instance to be checked for IP availability.
@@ -372,16 +406,16 @@ class CephVMNodeV2:
         Returns:
             True on success else False
         """
-        url = f"/v2.0/network-ip-availabilities/{net.id}"
-        resp = self.driver.network_connection.request(url)
-        subnets = resp.object["network_ip_availability"]["subnet_ip_availability"]
 
-        for subnet in subnets:
-            free_ips = subnet["total_ips"] - subnet["used_ips"]
+        def ip_availability():
+            url = f"/v2.0/network-ip-availabilities/{net.id}"
+            resp = self.driver.network_connection.request(url)
+            return resp.object["network_ip_availability"]["subnet_ip_availability"]
 
-            if free_ips > 3:
-                self._subnet.append(subnet["cidr"])
-                return True
+        cidr = CATALOG.reserve_ip(self._catalog_scope, net.id, ip_availability)
+        if cidr:
+            self._subnet.append(cidr)
+            return True
 
         return False
 
@@ -436,40 +470,37 @@ class CephVMNodeV2:
     def _wait_until_vm_state_running(self):
         """Wait till the VM moves to running state."""
         start_time = datetime.now()
-        end_time = start_time + timedelta(seconds=1200)
-
-        node = None
-        while end_time > datetime.now():
-            sleep(5)
-            node = self.driver.ex_get_node_details(self.node.id)
-
-            if node.state == "running":
-                end_time = datetime.now()
-                duration = (end_time - start_time).total_seconds()
-                LOG.info(
-                    "%s moved to running state in %d seconds.",
-                    self.node.name,
-                    int(duration),
-                )
-                return
-
-            if node.state == "error":
-                msg = (
-                    "Unknown Error"
-                    if not node.extra
-                    else node.extra.get("fault", {}).get("message", "Unknown Error")
-                )
-                raise NodeError(msg)
+        try:
+            node = ResourceWatcher.for_driver(self.driver).wait(
+                "node",
+                self.node.id,
+                lambda n: n is not None and n.state in ["running", "error"],
+                timeout=1200,
+            )
+        except WaitTimeout as wt:
+            raise NodeError(f"{self.node.name} failed to move to running state. {wt}")
+
+        if node.state == "error":
+            msg = (
+                "Unknown Error"
+                if not node.extra
+                else node.extra.get("fault", {}).get("message", "Unknown Error")
+            )
+            raise NodeError(msg)
 
-        raise NodeError(f"{node.name} is in {node.state} state.")
+        duration = (datetime.now() - start_time).total_seconds()
+        LOG.info(
+            "%s moved to running state in %d seconds.", self.node.name, int(duration)
+        )
 
     def _create_attach_volumes(self, no_of_volumes: int, size_of_disk: int) -> None:
         """
         Create and attach the volumes.
 
-        This method creates the requested number of volumes and then checks if each
-        volume has moved to available state. Once the volume has moved to available,
-        then it is attached to the node.
+        The volumes are created concurrently and each of them is attached to the
+        node as soon as it moves to available state. When any of them fails, the
+        volumes created by this call are removed. The time taken by each volume
+        is recorded in volume_metrics.
 
         Args:
             no_of_volumes:  The number of volumes to be created.
@@ -481,59 +512,96 @@ class CephVMNodeV2:
             size_of_disk,
             self.node.name,
         )
-        volumes = list()
-
-        for item in range(0, no_of_volumes):
-            vol_name = f"{self.node.name}-vol-{item}"
-            volume = self.driver.create_volume(size_of_disk, vol_name)
+        created = dict()
 
-            if not volume:
-                raise VolumeOpFailure(f"Failed to create volume with name {vol_name}")
-
-            volumes.append(volume)
+        try:
+            with parallel(max_workers=MAX_VOLUME_WORKERS) as p:
+                for item in range(0, no_of_volumes):
+                    p.spawn(
+                        self._create_attach_volume,
+                        f"{self.node.name}-vol-{item}",
+                        size_of_disk,
+                        created,
+                    )
+        except BaseException:
+            self._remove_volumes(list(created.values()))
+            raise
 
-        for _vol in volumes:
-            if not self._wait_until_volume_available(_vol):
-                raise VolumeOpFailure(f"{_vol.name} failed to become available.")
+    def _create_attach_volume(self, name: str, size_of_disk: int, created: dict):
+        """Create the volume and attach it once available."""
+        start_time = datetime.now()
+        volume = self.driver.create_volume(size_of_disk, name)
+
+        if not volume:
+            raise VolumeOpFailure(f"Failed to create volume with name {name}")
+
+        created[name] = volume
+        created_time = datetime.now()
+
+        if not self._wait_until_volume_available(volume):
+            raise VolumeOpFailure(f"{name} failed to become available.")
+
+        available_time = datetime.now()
+        if not self.driver.attach_volume(self.node, volume):
+            raise VolumeOpFailure(f"Unable to attach volume {name}")
+
+        end_time = datetime.now()
+        metrics = {
+            "name": name,
+            "create": (created_time - start_time).total_seconds(),
+            "available": (available_time - created_time).total_seconds(),
+            "attach": (end_time - available_time).total_seconds(),
+            "total": (end_time - start_time).total_seconds(),
+        }
+        self.volume_metrics.append(metrics)
+        LOG.info("%s attached in %.1f seconds.", name, metrics["total"])
+
+    def _remove_volumes(self, volumes: List[StorageVolume]) -> None:
+        """Detach and destroy the given volumes of the node."""
+        LOG.info("Removing the volumes created for %s", self.node.name)
+        latest = list()
+        for volume in volumes:
+            try:
+                latest.append(self.driver.ex_get_volume(volume.id))
+            except BaseException as be:  # noqa
+                LOG.warning(f"Unable to get the details of {volume.name}: {be}")
+                latest.append(volume)
 
-        for _vol in volumes:
-            if not self.driver.attach_volume(self.node, _vol):
-                raise VolumeOpFailure("Unable to attach volume %s", _vol.name)
+        summary = openstack_teardown(self.driver, volumes=latest, timeout=120).run()
+        if not summary.ok:
+            LOG.warning(f"Failed to remove the volumes of {self.node.name}")
 
     def _wait_until_ip_is_known(self):
         """Retrieve the IP address of the VM node."""
-        end_time = datetime.now() + timedelta(seconds=120)
-
-        while end_time > datetime.now():
-            self.node = self.driver.ex_get_node_details(self.node.id)
-
-            if self.ip_address is not None:
-                break
-
-            sleep(5)
-
-        raise NetworkOpFailure("Unable to get IP for {}".format(self.node.name))
+        try:
+            self.node = ResourceWatcher.for_driver(self.driver).wait(
+                "node",
+                self.node.id,
+                lambda n: n is not None and bool(n.public_ips or n.private_ips),
+                timeout=120,
+            )
+        except WaitTimeout:
+            raise NetworkOpFailure("Unable to get IP for {}".format(self.node.name))
 
     def _wait_until_volume_available(self, volume: StorageVolume) -> bool:
         """Wait until the state of the StorageVolume is available."""
-        tries = 0
-        while True:
-            sleep(3)
-            tries += 1
-            volume = self.driver.ex_get_volume(volume.id)
-
-            if volume.state.lower() == "available":
-                return True
-
-            if "error" in volume.state.lower():
-                LOG.error("%s state is %s", volume.name, volume.state)
-                break
+        try:
+            volume = ResourceWatcher.for_driver(self.driver).wait(
+                "volume",
+                volume.id,
+                lambda v: v is not None
+                and (v.state.lower() == "available" or "error" in v.state.lower()),
+                timeout=60,
+            )
+        except WaitTimeout:
+            LOG.error("%s did not become available in time.", volume.name)
+            return False
 
-            if tries > 10:
-                LOG.error("Max retries for %s reached.", volume.name)
-                break
+        if "error" in volume.state.lower():
+            LOG.error("%s state is %s", volume.name, volume.state)
+            return False
 
-        return False
+        return True
 
     def _get_subnet_cidr(self, id_: str) -> str:
         """Return the CIDR information of the given subnet id."""
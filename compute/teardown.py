@@ -0,0 +1,306 @@
+"""Removal of cloud resources in the order of their dependencies.
+
+The resources to be removed are added as tasks along with the tasks that have
+to complete before them. The tasks are run in waves: every wave runs all the
+tasks whose dependencies have completed, in parallel and with bounded
+concurrency. When a task fails, the tasks depending on it are skipped. Tasks
+that only have to follow others run once those are done, even if they failed::
+
+    teardown = Teardown(max_workers=10)
+    teardown.add("detach/vol-1", detach, volume)
+    teardown.add("volume/vol-1", destroy, volume, after=["detach/vol-1"])
+    teardown.add("node/vm-1", destroy, node, follows=["detach/vol-1"])
+    summary = teardown.run()
+
+For OpenStack, openstack_teardown builds the tasks from the volume to server
+attachments. Every task confirms its state change by polling the cloud.
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional
+
+from ceph.parallel import parallel
+from utility.log import Log
+from utility.rate_limit import TokenBucket
+
+from .exceptions import NodeDeleteFailure, VolumeOpFailure
+from .waiter import ResourceWatcher
+
+LOG = Log(__name__)
+
+MAX_WORKERS = 10
+
+
+class TeardownSummary:
+    """Outcome of a teardown."""
+
+    def __init__(self) -> None:
+        self.removed: List[str] = list()
+        self.failed: Dict[str, str] = dict()
+        self.skipped: Dict[str, str] = dict()
+
+    @property
+    def ok(self) -> bool:
+        """Return True when all the tasks completed."""
+        return not (self.failed or self.skipped)
+
+    def as_dict(self) -> Dict:
+        return {
+            "removed": self.removed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+        }
+
+    def log(self) -> None:
+        """Log what was removed and what was not."""
+        LOG.info(
+            f"Teardown summary: {len(self.removed)} removed, "
+            f"{len(self.failed)} failed, {len(self.skipped)} skipped"
+        )
+        for name in self.removed:
+            LOG.debug(f"Removed {name}")
+
+        for name, reason in self.failed.items():
+            LOG.error(f"Failed to remove {name}: {reason}")
+
+        for name, reason in self.skipped.items():
+            LOG.warning(f"Skipped {name}: {reason}")
+
+
+class _Task:
+    def __init__(
+        self,
+        action: Callable,
+        args,
+        kwargs,
+        after: Iterable[str],
+        follows: Iterable[str],
+    ) -> None:
+        self.action = action
+        self.args = args
+        self.kwargs = kwargs
+        self.after = set(after)
+        self.follows = set(follows)
+
+
+class Teardown:
+    """Runs the removal tasks in dependency ordered parallel waves."""
+
+    def __init__(
+        self, max_workers: int = MAX_WORKERS, rate_limit: Optional[TokenBucket] = None
+    ) -> None:
+        """
+        Initialize the teardown.
+
+        Args:
+            max_workers:    Maximum number of tasks running at a time.
+            rate_limit:     TokenBucket limiting the rate at which tasks start.
+        """
+        self.max_workers = max_workers
+        self.rate_limit = rate_limit
+        self.tasks: Dict[str, _Task] = dict()
+
+    def add(
+        self,
+        name: str,
+        action: Callable,
+        *args,
+        after: Iterable[str] = (),
+        follows: Iterable[str] = (),
+        **kwargs,
+    ) -> str:
+        """
+        Add a task.
+
+        Args:
+            name:       Unique name of the task, used in the summary.
+            action:     Callable removing the resource, raises on failure.
+            args:       Positional arguments of the action.
+            after:      Names of the tasks to be completed before this one.
+                        Names of tasks that were not added are ignored.
+            follows:    Names of the tasks to be run before this one, this one
+                        runs even when they fail.
+            kwargs:     Keyword arguments of the action.
+
+        Returns:
+            The name of the task.
+        """
+        if name in self.tasks:
+            raise ValueError(f"Task {name} is already added")
+
+        self.tasks[name] = _Task(action, args, kwargs, after, follows)
+        return name
+
+    def run(self) -> TeardownSummary:
+        """Run the tasks and return the summary."""
+        summary = TeardownSummary()
+        pending = dict(self.tasks)
+        wave = 0
+
+        while pending:
+            self._skip_dependants(pending, summary)
+            ready = [
+                name
+                for name, task in pending.items()
+                if all(dep in summary.removed for dep in task.after & set(self.tasks))
+                and not task.follows & set(pending)
+            ]
+            if not ready:
+                for name in pending:
+                    summary.skipped[name] = "circular dependency"
+                break
+
+            wave += 1
+            LOG.info(f"Teardown wave {wave}: removing {len(ready)} resources")
+            with parallel(max_workers=self.max_workers) as p:
+                for name in ready:
+                    p.spawn_tagged(
+                        name, self._run_task, name, pending.pop(name), summary
+                    )
+
+        summary.log()
+        return summary
+
+    def _skip_dependants(self, pending: Dict[str, _Task], summary: TeardownSummary):
+        """Skip the pending tasks depending on the failed or skipped ones."""
+        changed = True
+        while changed:
+            changed = False
+            for name, task in list(pending.items()):
+                blocked = sorted(
+                    dep
+                    for dep in task.after
+                    if dep in summary.failed or dep in summary.skipped
+                )
+                if blocked:
+                    summary.skipped[name] = f"{blocked[0]} was not removed"
+                    del pending[name]
+                    changed = True
+
+    def _run_task(self, name: str, task: _Task, summary: TeardownSummary) -> None:
+        if self.rate_limit:
+            self.rate_limit.acquire()
+
+        try:
+            task.action(*task.args, **task.kwargs)
+            summary.removed.append(name)
+        except BaseException as be:  # noqa
+            LOG.warning(f"Failed to remove {name}: {be}")
+            summary.failed[name] = str(be) or type(be).__name__
+
+
+def task_name(kind: str, resource) -> str:
+    """Return the name of the task removing the resource."""
+    return f"{kind}/{resource.name}/{resource.id}"
+
+
+def _gone(resource) -> bool:
+    return resource is None or resource.state in ["deleted", "terminated"]
+
+
+def detach_volume(driver, volume, timeout: int = 300) -> None:
+    """Detach the volume from all the servers and wait till it is available."""
+    if not driver.detach_volume(volume):
+        raise VolumeOpFailure(f"Failed to detach {volume.name}")
+
+    ResourceWatcher.for_driver(driver).wait(
+        "volume",
+        volume.id,
+        lambda v: v is None or v.state == "available",
+        timeout=timeout,
+    )
+
+
+def destroy_volume(driver, volume, timeout: int = 300) -> None:
+    """Destroy the volume and wait till it is gone."""
+    if not driver.destroy_volume(volume):
+        raise VolumeOpFailure(f"Failed to destroy {volume.name}")
+
+    ResourceWatcher.for_driver(driver).wait("volume", volume.id, _gone, timeout=timeout)
+
+
+def destroy_node(driver, node, timeout: int = 300) -> None:
+    """Destroy the node and wait till it is gone."""
+    if not driver.destroy_node(node):
+        raise NodeDeleteFailure(f"Failed to destroy {node.name}")
+
+    ResourceWatcher.for_driver(driver).wait("node", node.id, _gone, timeout=timeout)
+
+
+def delete_node(driver, node, timeout: int = 300) -> None:
+    """Release the floating IPs of the VM and destroy it, like CephVMNodeV2.delete."""
+    node = driver.ex_get_node_details(node.id)
+    if node is None:
+        return
+
+    # BUILD & PENDING map to pending in libcloud, the deletion of such nodes fails.
+    if node.state == "pending":
+        raise NodeDeleteFailure(f"{node.name} cannot be deleted.")
+
+    for ip in node.public_ips:
+        driver.ex_detach_floating_ip_from_node(node, ip)
+
+    destroy_node(driver, node, timeout)
+
+
+def openstack_teardown(
+    driver,
+    nodes: Iterable = (),
+    volumes: Iterable = (),
+    timeout: int = 300,
+    max_workers: int = MAX_WORKERS,
+    node_action: Callable = destroy_node,
+) -> Teardown:
+    """
+    Plan the removal of the OpenStack nodes and volumes.
+
+    Attached volumes are detached before the servers they are attached to and
+    the volumes themselves are destroyed. The servers are destroyed even when
+    the detach fails, as Nova detaches the volumes of the deleted servers. The
+    rest are removed right away.
+
+    Args:
+        driver:         libcloud OpenStack driver.
+        nodes:          libcloud Nodes to be destroyed.
+        volumes:        libcloud StorageVolumes to be destroyed.
+        timeout:        Seconds to wait for each state change.
+        max_workers:    Maximum number of resources removed at a time.
+        node_action:    Removal of a node, destroy_node or delete_node.
+
+    Returns:
+        Teardown with the planned tasks, to be run by the caller.
+    """
+    teardown = Teardown(max_workers=max_workers)
+    detaches: Dict[str, List[str]] = dict()
+
+    for volume in volumes:
+        after = list()
+        attachments = volume.extra.get("attachments") or []
+        if attachments:
+            detach = teardown.add(
+                task_name("detach", volume), detach_volume, driver, volume, timeout
+            )
+            after.append(detach)
+            for attachment in attachments:
+                server = attachment.get("serverId") or attachment.get("server_id")
+                detaches.setdefault(server, list()).append(detach)
+
+        teardown.add(
+            task_name("volume", volume),
+            destroy_volume,
+            driver,
+            volume,
+            timeout,
+            after=after,
+        )
+
+    for node in nodes:
+        teardown.add(
+            task_name("node", node),
+            node_action,
+            driver,
+            node,
+            timeout,
+            follows=detaches.get(node.id, []),
+        )
+
+    return teardown
@@ -0,0 +1,194 @@
+"""Shared waiters for the state transitions of cloud resources.
+
+Instead of every VM or volume being polled on its own, the pending resources of
+a driver are watched by a single loop. The loop lists each kind of resource
+once per interval and wakes the waiters whose condition is met::
+
+    watcher = ResourceWatcher.for_driver(driver)
+    node = watcher.wait("node", node.id, lambda n: n and n.state == "running")
+
+The interval is reset to MIN_INTERVAL whenever a watched resource changes state
+and grows by BACKOFF up to MAX_INTERVAL while nothing changes.
+"""
+
+import threading
+import weakref
+from time import monotonic, sleep
+from typing import Any, Callable, Dict, List, Optional
+
+from utility.log import Log
+
+from .exceptions import WaitTimeout
+
+LOG = Log(__name__)
+
+MIN_INTERVAL = 2
+MAX_INTERVAL = 30
+BACKOFF = 1.5
+
+
+class _Waiter:
+    """A caller waiting for the condition of a resource to be met."""
+
+    def __init__(self, until: Callable[[Any], bool]) -> None:
+        self.until = until
+        self.event = threading.Event()
+        self.resource = None
+
+
+class ResourceWatcher:
+    """Wakes the callers waiting on the resources of a driver from one loop."""
+
+    _watchers = weakref.WeakKeyDictionary()
+    _registry_lock = threading.Lock()
+
+    def __init__(
+        self,
+        driver,
+        min_interval: float = MIN_INTERVAL,
+        max_interval: float = MAX_INTERVAL,
+        backoff: float = BACKOFF,
+    ) -> None:
+        """
+        Initialize the watcher.
+
+        Args:
+            driver:         libcloud driver used for listing the resources.
+            min_interval:   Seconds between the listings after a state change.
+            max_interval:   Maximum seconds between the listings.
+            backoff:        Factor by which the interval grows when idle.
+        """
+        self.driver = driver
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.polls = 0
+        self.listers: Dict[str, Callable[[], List]] = {
+            "node": driver.list_nodes,
+            "volume": driver.list_volumes,
+        }
+        self._waiters: Dict[tuple, List[_Waiter]] = dict()
+        self._states: Dict[tuple, Optional[str]] = dict()
+        self._lock = threading.Lock()
+        self._poller = None
+
+    @classmethod
+    def for_driver(cls, driver) -> "ResourceWatcher":
+        """Return the watcher shared by all the users of the driver."""
+        with cls._registry_lock:
+            watcher = cls._watchers.get(driver)
+            if watcher is None:
+                watcher = cls(driver)
+                cls._watchers[driver] = watcher
+
+        return watcher
+
+    def wait(
+        self,
+        kind: str,
+        id_: str,
+        until: Callable[[Any], bool],
+        timeout: float = 600,
+    ) -> Any:
+        """
+        Wait till the condition is met by the resource.
+
+        Args:
+            kind:       The type of resource, node or volume.
+            id_:        The ID of the resource.
+            until:      Callable returning True when the listed resource, None
+                        if the resource is not listed, is in the expected state.
+            timeout:    Maximum seconds to wait.
+
+        Returns:
+            The resource as listed when the condition was met.
+
+        Raises:
+            WaitTimeout: when the condition is not met within the timeout.
+        """
+        if kind not in self.listers:
+            raise ValueError(f"Unsupported resource kind {kind}")
+
+        waiter = _Waiter(until)
+        key = (kind, id_)
+        with self._lock:
+            self._waiters.setdefault(key, list()).append(waiter)
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll, daemon=True)
+                self._poller.start()
+
+        if waiter.event.wait(timeout):
+            return waiter.resource
+
+        with self._lock:
+            state = self._states.get(key)
+            if waiter in self._waiters.get(key, []):
+                self._waiters[key].remove(waiter)
+                if not self._waiters[key]:
+                    del self._waiters[key]
+                    self._states.pop(key, None)
+
+        if waiter.event.is_set():
+            return waiter.resource
+
+        raise WaitTimeout(f"{kind} {id_} is in {state} state.")
+
+    def _poll(self) -> None:
+        """List the pending resources till there are no more waiters."""
+        interval = self.min_interval
+        while True:
+            sleep(interval)
+            with self._lock:
+                kinds = {kind for kind, _ in self._waiters}
+                if not kinds:
+                    self._poller = None
+                    return
+
+            started = monotonic()
+            listed = dict()
+            for kind in kinds:
+                try:
+                    listed[kind] = {r.id: r for r in self.listers[kind]()}
+                except BaseException as be:  # noqa
+                    LOG.warning(f"Failed to list the {kind}s: {be}")
+            self.polls += 1
+
+            changed = False
+            with self._lock:
+                for key in list(self._waiters):
+                    kind, id_ = key
+                    if kind not in listed:
+                        continue
+
+                    resource = listed[kind].get(id_)
+                    state = getattr(resource, "state", None)
+                    if self._states.get(key, state) != state:
+                        changed = True
+                    self._states[key] = state
+
+                    for waiter in list(self._waiters[key]):
+                        if self._met(waiter, resource):
+                            waiter.resource = resource
+                            waiter.event.set()
+                            self._waiters[key].remove(waiter)
+
+                    if not self._waiters[key]:
+                        del self._waiters[key]
+                        del self._states[key]
+
+            LOG.debug(
+                f"Listed {sorted(kinds)} in {monotonic() - started:.2f}s, "
+                f"{len(self._waiters)} resources pending"
+            )
+            if changed:
+                interval = self.min_interval
+            else:
+                interval = min(interval * self.backoff, self.max_interval)
+
+    @staticmethod
+    def _met(waiter: _Waiter, resource: Any) -> bool:
+        try:
+            return bool(waiter.until(resource))
+        except BaseException as be:  # noqa
+            LOG.warning(f"Condition of the waiter failed with {be}")
+            return False
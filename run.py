@@ -9,10 +9,8 @@ import datetime
 import importlib
 import json
 import os
-import pickle
 import re
 import sys
-import time
 import traceback
 from copy import deepcopy
 from getpass import getuser
@@ -23,8 +21,10 @@ from docopt import docopt
 from libcloud.common.types import LibcloudError
 
 import init_suite
-from ceph.ceph import Ceph, CephNode
+from ceph.ceph import Ceph, CephNode, SSHSessionPool
 from ceph.clients import WinNode
+from ceph.cluster_state import ClusterStateStore, load_cluster_state
+from ceph.parallel import parallel
 from ceph.utils import (
     cleanup_ceph_nodes,
     cleanup_ibmc_ceph_nodes,
@@ -32,14 +32,14 @@ from ceph.utils import (
     create_ceph_nodes,
     create_ibmc_ceph_nodes,
 )
-from cephci.cluster_info import get_ceph_var_logs
 from cli.performance.memory_and_cpu_utils import (
     start_logging_processes,
     stop_logging_process,
     upload_mem_and_cpu_logger_script,
 )
-from utility import sosreport
-from utility.log import Log
+from cli.performance.metrics import analyze as analyze_performance
+from utility.log import Log, set_test_context
+from utility.log_collector import LogCollector
 from utility.polarion import post_to_polarion
 from utility.retry import retry
 from utility.utils import (  # ReportPortal,
@@ -50,7 +50,6 @@ from utility.utils import (  # ReportPortal,
     fetch_build_artifacts,
     generate_unique_id,
     magna_url,
-    setup_cluster_access,
     validate_conf,
     validate_image,
 )
@@ -97,6 +96,7 @@ A simple test suite wrapper that executes tests based on yaml test configuration
         [--skip-sos-report]
         [--skip-tc <items>]
         [--monitor-performance]
+        [--perf-baseline <file>]
         [--disable-console-log]
   run.py --cleanup=name --osp-cred <file> [--cloud <str>]
         [--log-level <LEVEL>]
@@ -161,6 +161,8 @@ Options:
   --skip-tc <items>                 skip test case provided in comma seperated fashion
   --monitor-performance             Monitor performance and CPU usage on all/required nodes
                                     for every test and collects data to specified dir
+  --perf-baseline <file>            summary.json of an earlier --monitor-performance run
+                                    to flag the performance regressions against
   --disable-console-log             To stopping logging to console
                                     [default: false]
 """
@@ -269,16 +271,11 @@ def create_nodes(
 
     # TODO: refactor cluster dict to cluster list
     log.info("Done creating osp instances")
-    log.info("Waiting for Floating IPs to be available")
-    log.info("Sleeping 15 Seconds")
-    time.sleep(15)
-
-    for cluster_name, cluster in ceph_cluster_dict.items():
-        for instance in cluster:
-            try:
-                instance.connect()
-            except BaseException:
-                raise
+    log.info("Waiting for the nodes to be reachable")
+    with parallel() as p:
+        for cluster in ceph_cluster_dict.values():
+            for instance in cluster:
+                p.spawn(instance.connect)
 
     return ceph_cluster_dict, clients
 
@@ -394,6 +391,7 @@ def run(args):
 
     # Get Perf and CPU mon param
     enable_perf_mon = args.get("--monitor-performance", False)
+    perf_baseline = args.get("--perf-baseline")
 
     # jenkin job url
     jenkin_job_url = os.environ.get("BUILD_URL")
@@ -653,17 +651,13 @@ def run(args):
             email_results(test_result=test_res)
             return 1
     else:
-        ceph_store_nodes = open(reuse, "rb")
-        ceph_cluster_dict = pickle.load(ceph_store_nodes)
-        ceph_store_nodes.close()
-        for cluster_name, cluster in ceph_cluster_dict.items():
-            for node in cluster:
-                node.reconnect()
+        ceph_cluster_dict = load_cluster_state(reuse)
     if store:
         ceph_clusters_file = f"rerun/{instances_name}-{run_id}"
         if not os.path.exists(os.path.dirname(ceph_clusters_file)):
             os.makedirs(os.path.dirname(ceph_clusters_file))
-        store_cluster_state(ceph_cluster_dict, ceph_clusters_file)
+        cluster_state_store = ClusterStateStore(ceph_clusters_file)
+        store_cluster_state(ceph_cluster_dict, cluster_state_store)
 
     sys.path.append(os.path.abspath("tests"))
     sys.path.append(os.path.abspath("tests/rados"))
@@ -696,8 +690,6 @@ def run(args):
     ceph_test_data["custom-config"] = custom_config
     ceph_test_data["custom-config-file"] = custom_config_file
 
-    # Initialize test return code
-    rc = 0
     run_config = {
         "log_dir": run_dir,
         "run_id": run_id,
@@ -705,188 +697,238 @@ def run(args):
     download_path = run_dir if not log_directory else log_directory
     cluster_info = []
 
-    for test in tests:
-        test = test.get("test")
-        tc = fetch_test_details(test)
+    def run_on_cluster(test, tc, test_mod, cluster_name, test_run_config):
+        """
+        Executes the test module against the given cluster.
+
+        :param test: the test collected from the suite file
+        :param tc: the test case details
+        :param test_mod: the imported test module
+        :param cluster_name: name of the cluster the test is executed on
+        :param test_run_config: run configuration passed to the test
+        :return: return code of the test module
+        """
+        nonlocal enable_perf_mon, skip_version_compare, _rhcs_version
         do_not_skip_test = test.get("do-not-skip-tc", False)
-        test_file = tc["file"]
-        unique_test_name = create_unique_test_name(tc["name"], test_names)
-        test_names.append(unique_test_name)
+        mod_file_name = os.path.splitext(tc["file"])[0]
+        rc = 0
+
+        # Add cluster names
+        if cluster_name not in cluster_info:
+            cluster_info.append(cluster_name)
+
+        # If Performance and CPU usage monitoring is enabled, perform pre-reqs
+        if enable_perf_mon:
+            if not upload_mem_and_cpu_logger_script(ceph_cluster_dict[cluster_name]):
+                log.error(
+                    "Failed to upload Memory and CPU monitoring scripts to nodes. "
+                    "The tests will proceed without monitoring"
+                )
+                enable_perf_mon = False
 
-        tc["log-link"] = log.configure_logger(
-            unique_test_name, run_dir, disable_console_log
+        if test.get("clusters"):
+            config = test.get("clusters").get(cluster_name).get("config", {})
+        else:
+            config = test.get("config", {})
+        parallel_tests = test.get("parallel", [])
+
+        if not config.get("base_url"):
+            config["base_url"] = base_url
+
+        config["rhbuild"] = f"{rhbuild}-{platform}"
+        config["cloud-type"] = cloud_type
+        config["ubuntu_repo"] = ubuntu_repo
+
+        if skip_setup is True:
+            config["skip_setup"] = True
+
+        if skip_subscription is True:
+            config["skip_subscription"] = True
+
+        if config.get("skip_version_compare"):
+            skip_version_compare = config.get("skip_version_compare")
+
+        if args.get("--add-repo"):
+            repo = args.get("--add-repo")
+            if repo.startswith("http"):
+                config["add-repo"] = repo
+
+        config["build_type"] = build
+        config["enable_eus"] = enable_eus
+        config["skip_enabling_rhel_rpms"] = skip_enabling_rhel_rpms
+        config["docker-insecure-registry"] = docker_insecure_registry
+        config["skip_version_compare"] = skip_version_compare
+        config["container_image"] = "%s/%s:%s" % (
+            docker_registry,
+            docker_image,
+            docker_tag,
         )
-        run_config.update({"test_name": unique_test_name, "log_link": tc["log-link"]})
-        mod_file_name = os.path.splitext(test_file)[0]
-        test_mod = importlib.import_module(mod_file_name)
-        print("\nRunning test: {test_name}".format(test_name=tc["name"]))
 
-        if tc.get("log-link"):
-            print("Test logfile location: {log_url}".format(log_url=tc["log-link"]))
+        if custom_config:
+            for _config in custom_config:
+                if "ibm-build=" in _config:
+                    config["ibm_build"] = bool(_config.split("=")[1])
 
-        log.info(f"Running test {test_file}")
-        start = datetime.datetime.now()
+                if "enable-fips-mode=" in _config:
+                    config["enable_fips_mode"] = bool(_config.split("=")[1])
 
-        for cluster_name in test.get("clusters", ceph_cluster_dict):
-            # Add cluster names
-            if cluster_name not in cluster_info:
-                cluster_info.append(cluster_name)
+        config["ceph_docker_registry"] = docker_registry
+        config["ceph_docker_image"] = docker_image
+        config["ceph_docker_image_tag"] = docker_tag
 
-            # If Performance and CPU usage monitoring is enabled, perform pre-reqs
-            if enable_perf_mon:
-                if not upload_mem_and_cpu_logger_script(
-                    ceph_cluster_dict[cluster_name]
-                ):
-                    log.error(
-                        "Failed to upload Memory and CPU monitoring scripts to nodes. "
-                        "The tests will proceed without monitoring"
-                    )
-                    enable_perf_mon = False
+        if filestore:
+            config["filestore"] = filestore
 
-            if test.get("clusters"):
-                config = test.get("clusters").get(cluster_name).get("config", {})
-            else:
-                config = test.get("config", {})
-            parallel = test.get("parallel", [])
-
-            if not config.get("base_url"):
-                config["base_url"] = base_url
-
-            config["rhbuild"] = f"{rhbuild}-{platform}"
-            config["cloud-type"] = cloud_type
-            if "ubuntu_repo" in locals():
-                config["ubuntu_repo"] = ubuntu_repo
-
-            if skip_setup is True:
-                config["skip_setup"] = True
-
-            if skip_subscription is True:
-                config["skip_subscription"] = True
-
-            if config.get("skip_version_compare"):
-                skip_version_compare = config.get("skip_version_compare")
-
-            if args.get("--add-repo"):
-                repo = args.get("--add-repo")
-                if repo.startswith("http"):
-                    config["add-repo"] = repo
-
-            config["build_type"] = build
-            config["enable_eus"] = enable_eus
-            config["skip_enabling_rhel_rpms"] = skip_enabling_rhel_rpms
-            config["docker-insecure-registry"] = docker_insecure_registry
-            config["skip_version_compare"] = skip_version_compare
-            config["container_image"] = "%s/%s:%s" % (
-                docker_registry,
-                docker_image,
-                docker_tag,
-            )
+        if ec_pool_vals:
+            config["ec-pool-k-m"] = ec_pool_vals
 
-            if custom_config:
-                for _config in custom_config:
-                    if "ibm-build=" in _config:
-                        config["ibm_build"] = bool(_config.split("=")[1])
+        if args.get("--hotfix-repo"):
+            hotfix_repo = args.get("--hotfix-repo")
+            if hotfix_repo.startswith("http"):
+                config["hotfix_repo"] = hotfix_repo
 
-                    if "enable-fips-mode=" in _config:
-                        config["enable_fips_mode"] = bool(_config.split("=")[1])
+        if kernel_repo is not None:
+            config["kernel-repo"] = kernel_repo
 
-            config["ceph_docker_registry"] = docker_registry
-            config["ceph_docker_image"] = docker_image
-            config["ceph_docker_image_tag"] = docker_tag
+        if osp_cred:
+            config["osp_cred"] = osp_cred
 
-            if filestore:
-                config["filestore"] = filestore
+        # if Kernel Repo is defined in ENV then set the value in config
+        if os.environ.get("KERNEL-REPO-URL") is not None:
+            config["kernel-repo"] = os.environ.get("KERNEL-REPO-URL")
 
-            if ec_pool_vals:
-                config["ec-pool-k-m"] = ec_pool_vals
+        # Start performance and Cpu usage monitoring
+        if enable_perf_mon:
+            logging_process, tracker = start_logging_processes(
+                ceph_cluster_dict[cluster_name], test_run_config["test_name"]
+            )
+        try:
+            if "build" in config.keys():
+                _rhcs_version = config["build"]
+
+            # Initialize the cluster with the expected rhcs_version
+            ceph_cluster_dict[cluster_name].rhcs_version = _rhcs_version
+            if mod_file_name not in skip_tc_list or do_not_skip_test:
+                rc = test_mod.run(
+                    ceph_cluster=ceph_cluster_dict[cluster_name],
+                    ceph_nodes=ceph_cluster_dict[cluster_name],
+                    config=config,
+                    parallel=parallel_tests,
+                    test_data=ceph_test_data,
+                    ceph_cluster_dict=ceph_cluster_dict,
+                    clients=clients,
+                    run_config=test_run_config,
+                )
 
-            if args.get("--hotfix-repo"):
-                hotfix_repo = args.get("--hotfix-repo")
-                if hotfix_repo.startswith("http"):
-                    config["hotfix_repo"] = hotfix_repo
+            else:
+                rc = -1
 
-            if kernel_repo is not None:
-                config["kernel-repo"] = kernel_repo
+        except BaseException as be:  # noqa
+            # Log exception to stdout
+            log.exception(be)
 
-            if osp_cred:
-                config["osp_cred"] = osp_cred
+            # Set failure details
+            tc["err_type"] = "exception"
+            tc["err_msg"] = str(be)
+            tc["err_text"] = traceback.format_exc()
 
-            # if Kernel Repo is defined in ENV then set the value in config
-            if os.environ.get("KERNEL-REPO-URL") is not None:
-                config["kernel-repo"] = os.environ.get("KERNEL-REPO-URL")
+            # Set return code to 1
+            rc = 1
 
-            # Start performance and Cpu usage monitoring
+        finally:
+            # Stop performance and Cpu usage monitoring
             if enable_perf_mon:
-                logging_process, tracker = start_logging_processes(
-                    ceph_cluster_dict[cluster_name], unique_test_name
+                stop_logging_process(
+                    ceph_cluster_dict[cluster_name],
+                    logging_process,
+                    download_path,
+                    tracker,
                 )
-            try:
-                if "build" in config.keys():
-                    _rhcs_version = config["build"]
-
-                # Initialize the cluster with the expected rhcs_version
-                ceph_cluster_dict[cluster_name].rhcs_version = _rhcs_version
-                if mod_file_name not in skip_tc_list or do_not_skip_test:
-                    rc = test_mod.run(
-                        ceph_cluster=ceph_cluster_dict[cluster_name],
-                        ceph_nodes=ceph_cluster_dict[cluster_name],
-                        config=config,
-                        parallel=parallel,
-                        test_data=ceph_test_data,
-                        ceph_cluster_dict=ceph_cluster_dict,
-                        clients=clients,
-                        run_config=run_config,
-                    )
+            collect_recipe(ceph_cluster_dict[cluster_name])
+            if store:
+                store_cluster_state(ceph_cluster_dict, cluster_state_store)
 
-                else:
-                    rc = -1
-
-            except BaseException as be:  # noqa
-                # Log exception to stdout
-                log.exception(be)
-
-                # Set failure details
-                tc["err_type"] = "exception"
-                tc["err_msg"] = str(be)
-                tc["err_text"] = traceback.format_exc()
-
-                # Set return code to 1
-                rc = 1
-
-            finally:
-                # Stop performance and Cpu usage monitoring
-                if enable_perf_mon:
-                    stop_logging_process(
-                        ceph_cluster_dict[cluster_name],
-                        logging_process,
-                        download_path,
-                        tracker,
+            # Artifacts from test appended to comments
+            if config.get("artifacts"):
+                tc["comments"] += f"\n{config['artifacts']}"
+
+        return rc
+
+    def run_test(test, concurrent=False):
+        """
+        Executes the given test on all of its clusters.
+
+        :param test: the test collected from the suite file
+        :param concurrent: the test is executed along with other independent tests
+        :return: tuple of the test case details and the return code
+        """
+        nonlocal jenkins_rc
+        tc = fetch_test_details(test)
+        test_file = tc["file"]
+        unique_test_name = create_unique_test_name(tc["name"], test_names)
+        test_names.append(unique_test_name)
+
+        if concurrent:
+            set_test_context(unique_test_name)
+
+        tc["log-link"] = log.configure_logger(
+            unique_test_name, run_dir, disable_console_log, test_context=concurrent
+        )
+        test_run_config = dict(
+            run_config, test_name=unique_test_name, log_link=tc["log-link"]
+        )
+        mod_file_name = os.path.splitext(test_file)[0]
+        test_mod = importlib.import_module(mod_file_name)
+        print("\nRunning test: {test_name}".format(test_name=tc["name"]))
+
+        if tc.get("log-link"):
+            print("Test logfile location: {log_url}".format(log_url=tc["log-link"]))
+
+        log.info(f"Running test {test_file}")
+        start = datetime.datetime.now()
+
+        clusters = list(test.get("clusters", ceph_cluster_dict))
+        rcs = []
+        if test.get("concurrent-clusters", False) and len(clusters) > 1:
+            # The per-cluster steps of the test are independent of each other.
+            with parallel() as p:
+                for cluster_name in clusters:
+                    p.spawn_tagged(
+                        cluster_name,
+                        run_on_cluster,
+                        test,
+                        tc,
+                        test_mod,
+                        cluster_name,
+                        test_run_config,
                     )
-                collect_recipe(ceph_cluster_dict[cluster_name])
-                if store:
-                    store_cluster_state(ceph_cluster_dict, ceph_clusters_file)
-
-                # Artifacts from test appended to comments
-                if config.get("artifacts"):
-                    tc["comments"] += f"\n{config['artifacts']}"
-
-            # Check for Log object
-            _objects, _object = vars(test_mod), None
-            for k in _objects.keys():
-                if type(_objects.get(k)) is Log:
-                    _object = _objects.get(k)
-                    break
 
-            if rc != 0:
-                # Check if err_type is set for exception
-                if _object and not (tc.get("err_type") == "exception"):
-                    tc["err_type"], tc["err_msg"] = "error", ""
+            rcs = list(p.results_by_tag().values())
+        else:
+            for cluster_name in clusters:
+                rcs.append(
+                    run_on_cluster(test, tc, test_mod, cluster_name, test_run_config)
+                )
+                if rcs[-1] != 0:
+                    break
 
-                    # Get error messages
-                    tc["err_msg"] = "\n".join(map(str, _object._log_errors))
+        rc = next((_rc for _rc in rcs if _rc != 0), 0)
 
+        # Check for Log object
+        _objects, _object = vars(test_mod), None
+        for k in _objects.keys():
+            if type(_objects.get(k)) is Log:
+                _object = _objects.get(k)
                 break
 
+        if rc != 0:
+            # Check if err_type is set for exception
+            if _object and not (tc.get("err_type") == "exception"):
+                tc["err_type"], tc["err_msg"] = "error", ""
+
+                # Get error messages
+                tc["err_msg"] = "\n".join(map(str, _object._log_errors))
+
         # Calculate test execution time
         elapsed = datetime.datetime.now() - start
         tc["duration"] = elapsed
@@ -923,11 +965,50 @@ def run(args):
             if post_results:
                 post_to_polarion(tc=tc)
 
-            if test.get("abort-on-fail", False):
-                log.info("Aborting on test failure")
-                tcs.append(tc)
-                break
+        return tc, rc
+
+    def is_independent(test):
+        """Return True if the test can be executed along with other tests."""
+        return (
+            test.get("independent", False)
+            and not test.get("destroy-cluster")
+            and not test.get("recreate-cluster")
+        )
 
+    index = 0
+    while index < len(tests):
+        batch = [tests[index].get("test")]
+        if is_independent(batch[0]):
+            while index + len(batch) < len(tests) and is_independent(
+                tests[index + len(batch)].get("test")
+            ):
+                batch.append(tests[index + len(batch)].get("test"))
+        index += len(batch)
+
+        if len(batch) == 1:
+            results = [run_test(batch[0])]
+        else:
+            # Consecutive independent tests are executed concurrently, each
+            # writing to its own log file.
+            log.info(f"Running {len(batch)} independent tests concurrently")
+            log.close_and_remove_filehandlers()
+            with parallel(ordered=True) as p:
+                for test in batch:
+                    p.spawn(run_test, test, concurrent=True)
+
+                results = list(p)
+
+        abort = False
+        for test, (tc, rc) in zip(batch, results):
+            tcs.append(tc)
+            if rc not in (0, -1) and test.get("abort-on-fail", False):
+                abort = True
+
+        if abort:
+            log.info("Aborting on test failure")
+            break
+
+        test = batch[-1]
         if test.get("destroy-cluster") is True:
             if cloud_type == "openstack":
                 cleanup_ceph_nodes(osp_cred, instances_name)
@@ -946,8 +1027,6 @@ def run(args):
                 enable_eus=enable_eus,
             )
 
-        tcs.append(tc)
-
     url_base = (
         magna_url + run_dir.split("/")[-1]
         if "/ceph/cephci-jenkins" in run_dir
@@ -1006,30 +1085,34 @@ def run(args):
         "prefix": instances_name,
     }
 
+    if enable_perf_mon:
+        test_res["performance"] = analyze_performance(download_path, perf_baseline)
+
     email_results(test_result=test_res)
 
     if jenkins_rc and not skip_sos_report:
         log.info(
             "\n\nGenerating sosreports for all the nodes due to failures in testcase"
         )
-        for cluster in ceph_cluster_dict.keys():
-            log.info(f"Installing Ceph-common on {cluster} nodes to gather Sos report")
-            for node in ceph_cluster_dict[cluster].get_nodes():
-                setup_cluster_access(ceph_cluster_dict[cluster], node)
-            installer = ceph_cluster_dict[cluster].get_nodes(role="installer")[0]
-            sosreport.run(installer.ip_address, "cephuser", "cephuser", run_dir)
-            # This can be Removed as sos report will have this details as well
-            get_ceph_var_logs(ceph_cluster_dict[cluster], run_dir)
+        LogCollector(run_dir).collect(*ceph_cluster_dict.values())
         log.info(f"Generated sosreports location : {url_base}/sosreports\n")
 
+    SSHSessionPool.log_metrics()
     return jenkins_rc
 
 
-def store_cluster_state(ceph_cluster_object, ceph_clusters_file_name):
-    cn = open(ceph_clusters_file_name, "w+b")
-    pickle.dump(ceph_cluster_object, cn)
-    cn.close()
-    log.info("ceph_clusters_file %s", ceph_clusters_file_name)
+def store_cluster_state(ceph_cluster_object, cluster_state_store):
+    """
+    Record the state of the clusters for reuse in a later run.
+
+    Only the first call writes a full snapshot, the later ones append the
+    changes made to the clusters since the previous call.
+
+    Args:
+        ceph_cluster_object: Ceph cluster objects keyed by cluster name
+        cluster_state_store: ClusterStateStore of the run
+    """
+    cluster_state_store.save(ceph_cluster_object)
 
 
 def collect_recipe(ceph_cluster):
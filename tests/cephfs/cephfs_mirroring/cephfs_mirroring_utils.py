@@ -9,6 +9,7 @@ import random
 import string
 
 from ceph.ceph import CommandFailed
+from cli.utilities.manifest import get_manifest, manifests_match
 from tests.cephfs.cephfs_utilsV1 import FsUtils
 from utility.log import Log
 from utility.retry import retry
@@ -37,6 +38,8 @@ class CephfsMirroringUtils(object):
         self.source_mirrors = source_ceph_cluster.get_ceph_objects("cephfs-mirror")
         self.fs_util_ceph1 = FsUtils(source_ceph_cluster)
         self.fs_util_ceph2 = FsUtils(target_ceph_cluster)
+        # Manifests of the verified paths, keyed on client, file system and path
+        self.manifests = dict()
 
     def enable_mirroring_module(self, client):
         """
@@ -765,6 +768,25 @@ class CephfsMirroringUtils(object):
         except Exception as e:
             return False, f"Error: {str(e)}"
 
+    def get_manifest(self, client, mount_path, path, fs_name):
+        """
+        Checksum the files under the path of the mount, the manifest is kept
+        to checksum only the files modified since on the next verification.
+        Args:
+            client: Ceph client on which the file system is mounted.
+            mount_path (str): The mount path of the file system on the client.
+            path (str): The path in the file system to checksum.
+            fs_name (str): The name identifying the file system.
+        Returns:
+            list: manifest of the files, refer cli.utilities.manifest
+        """
+        key = (client.hostname, fs_name, path)
+        manifest = get_manifest(
+            client, f"{mount_path}{path}", previous=self.manifests.get(key)
+        )
+        self.manifests[key] = manifest
+        return manifest
+
     def list_and_verify_remote_snapshots_and_data_checksum(
         self,
         target_clients,
@@ -805,38 +827,35 @@ class CephfsMirroringUtils(object):
             snapshots = snapshots.strip().split()
             log.info(f"Available Snapshots : {snapshots}")
 
-            out_target, rc = target_clients.exec_command(
-                sudo=True,
-                cmd=f"bash /root/md5sum_script.sh {target_mount_path}{source_path}",
+            out_target = self.get_manifest(
+                target_clients, target_mount_path, source_path, target_fs_name
             )
-            log.info(f"Checksums of the files in target cluster : \n {out_target}")
-            out_source, rc = source_client.exec_command(
-                sudo=True,
-                cmd=f"bash /root/md5sum_script.sh {source_mount_path}{source_path}",
+            log.info(f"Checksummed {len(out_target)} files in target cluster")
+            out_source = self.get_manifest(
+                source_client, source_mount_path, source_path, "source"
             )
-            log.info(f"Checksums of the files in source cluster : \n {out_source}")
-            if out_target == out_source:
-                log.info("Checksums are matching and all files synced")
-            out_source_snap, rc = target_clients.exec_command(
-                sudo=True,
-                cmd=f"bash /root/md5sum_script.sh {target_mount_path}{source_path}/.snap",
+            log.info(f"Checksummed {len(out_source)} files in source cluster")
+            out_target_snap = self.get_manifest(
+                target_clients,
+                target_mount_path,
+                f"{source_path}/.snap",
+                target_fs_name,
             )
             log.info(
-                f"Checksums of the files in source cluster snap dir : \n {out_source_snap}"
+                f"Checksummed {len(out_target_snap)} files in target cluster snap dir"
             )
-            out_target_snap, rc = source_client.exec_command(
-                sudo=True,
-                cmd=f"bash /root/md5sum_script.sh {source_mount_path}{source_path}/.snap",
+            out_source_snap = self.get_manifest(
+                source_client, source_mount_path, f"{source_path}/.snap", "source"
             )
             log.info(
-                f"Checksums of the files in target cluster snap dir : \n {out_target_snap}"
+                f"Checksummed {len(out_source_snap)} files in source cluster snap dir"
             )
-            if out_target_snap != out_source_snap:
+            if not manifests_match(out_source_snap, out_target_snap):
                 return False, "Checksums are not matching in snapshot folders"
 
             log.info("Checksums are matching and all files synced in snapshot folder")
 
-            if out_target != out_source:
+            if not manifests_match(out_source, out_target):
                 return False, "Checksums are not matching in subvolume folders"
             log.info("Checksums are matching and all files synced in Subvolume folder")
             return True, "All Files and checksums synced Properly"
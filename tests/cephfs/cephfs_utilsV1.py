@@ -26,6 +26,8 @@ from ceph.ceph import CommandFailed, SSHConnectionManager
 from ceph.parallel import parallel
 from ceph.utils import check_ceph_healthly
 from cli.cephadm.cephadm import CephAdm
+from cli.utilities.file_agent import FileAgent
+from cli.utilities.manifest import get_manifest
 from mita.v2 import get_openstack_driver
 from utility.log import Log
 from utility.retry import retry
@@ -2506,23 +2508,18 @@ os.system('sudo systemctl start  network')
             cmd=f"cd {directory};echo {data * random.randint(100, 500)} | tee {' '.join(files)}",
         )
 
-    def get_files_and_checksum(self, client, directory):
+    def get_files_and_checksum(self, client, directory, algorithm="md5"):
         """
         This will collect the filenames and their respective checksums and returns the dictionary
+        The files are hashed in parallel on the client, refer get_manifest to
+        compare whole trees or to skip the unchanged files.
         :param client:
         :param directory:
+        :param algorithm: md5, blake2b or xxh3_128
         :return:
         """
-        out, rc = client.exec_command(
-            sudo=True, cmd=f"cd {directory};ls -lrt |  awk {{'print $9'}}"
-        )
-        file_list = out.strip().split()
-        file_dict = {}
-        for file in file_list:
-            out, rc = client.exec_command(sudo=True, cmd=f"md5sum {directory}/{file}")
-            md5sum = out.strip().split()
-            file_dict[file] = md5sum[0]
-        return file_dict
+        manifest = get_manifest(client, directory, algorithm, recursive=False)
+        return {entry.path: entry.digest for entry in manifest}
 
     def set_xattrs(
         self,
@@ -4427,25 +4424,27 @@ os.system('sudo systemctl start  network')
             create_files_in_path(clients, '/mnt/test', 100, 10)
         """
         try:
-            log.info(f"Checking if path exists: {path}")
-            check_path_cmd = f"sudo test -d {path}"
-            _, rc = clients.exec_command(sudo=True, cmd=check_path_cmd, check_ec=False)
-
-            if rc != 0:
-                log.info(f"Path doesn't exist, creating path: {path}")
-                create_path_cmd = f"sudo mkdir -p {path}"
-                clients.exec_command(sudo=True, cmd=create_path_cmd)
+            agent = FileAgent(clients)
+            [(error, _)] = agent.run([{"op": "mkdir", "path": path}])
+            if error:
+                raise CommandFailed(f"Failed to create path {path}: {error}")
 
             log.info(f"Path exists or created successfully: {path}")
 
+            # Every batch is created in a single round trip by the file agent
             for i in range(0, num_of_files, batch_size):
                 batch_end = min(i + batch_size, num_of_files)
-                for j in range(i, batch_end):
-                    file_path = os.path.join(path, f"file_{j}.txt")
-                    create_file_cmd = (
-                        f"echo 'Created files {j}' | sudo tee {file_path} > /dev/null"
-                    )
-                    clients.exec_command(sudo=True, cmd=create_file_cmd)
+                ops = [
+                    {
+                        "op": "create",
+                        "path": os.path.join(path, f"file_{j}.txt"),
+                        "data": f"Created files {j}\n",
+                    }
+                    for j in range(i, batch_end)
+                ]
+                for op, (error, _) in zip(ops, agent.run(ops)):
+                    if error:
+                        raise CommandFailed(f"Failed to create {op['path']}: {error}")
                 log.info(f"Created files {i} to {batch_end - 1}")
             log.info(f"Successfully created {num_of_files} files in {path}")
         except Exception as e:
@@ -89,10 +89,7 @@ class RbdMirror:
             raise
 
     def copy_file(self, file_name, src, dest):
-        contents, err = src.exec_command(sudo=True, cmd="cat {}".format(file_name))
-        key_file = dest.remote_file(sudo=True, file_name=file_name, file_mode="w")
-        key_file.write(contents)
-        key_file.flush()
+        src.copy_file_to(dest, file_name, sudo=True)
 
     def value(self, key, dictionary):
         """Retrieve required details from json output."""
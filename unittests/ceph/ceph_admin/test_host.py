@@ -0,0 +1,110 @@
+import json
+import shlex
+
+import mock
+import pytest
+
+from ceph.ceph_admin.host import Host, HostOpFailure
+
+
+class MockHost(Host):
+    """Host operations against a fake orchestrator host listing."""
+
+    def __init__(self, nodes):
+        self.cluster = None
+        self.nodes = {node.hostname: node for node in nodes}
+        self.hosts = dict()
+        self.commands = []
+
+    def shell(self, args, **kw):
+        self.commands.append(args)
+        if args[:4] == ["ceph", "orch", "host", "ls"]:
+            return json.dumps(list(self.hosts.values())), ""
+
+        script = shlex.split(args[2])[0] if args[0] == "bash" else " ".join(args)
+        for cmd in script.split(" && "):
+            self.run(shlex.split(cmd))
+        return "", ""
+
+    def run(self, cmd):
+        if cmd[3] == "label":
+            op, hostname, label = cmd[4:7]
+            labels = self.hosts[hostname]["labels"]
+            labels.append(label) if op == "add" else labels.remove(label)
+            return
+
+        hostname = cmd[4]
+        addr = cmd[5] if len(cmd) > 5 else ""
+        self.hosts[hostname] = {
+            "hostname": hostname,
+            "addr": addr or f"{hostname}.lan",
+            "labels": cmd[6:],
+        }
+
+
+def node(hostname, roles):
+    return mock.Mock(
+        hostname=hostname,
+        ip_address=f"10.0.0.{hostname[-1]}",
+        role=mock.Mock(role_list=roles),
+    )
+
+
+class TestHost:
+    @pytest.fixture(autouse=True)
+    def setUp(self):
+        self.nodes = [
+            node("node1", ["mon", "mgr"]),
+            node("node2", ["osd"]),
+            node("node3", ["client"]),
+        ]
+        self.host = MockHost(self.nodes)
+        patcher = mock.patch(
+            "ceph.ceph_admin.host.get_node_by_id",
+            side_effect=lambda _, node_name: self.host.nodes[node_name],
+        )
+        patcher.start()
+        yield
+        patcher.stop()
+
+    def test_add_hosts(self):
+        config = {
+            "args": {
+                "nodes": ["node1", "node2", "node3"],
+                "attach_ip_address": True,
+                "labels": "apply-all-labels",
+            }
+        }
+
+        self.host.add_hosts(config)
+
+        # One shell session to add the hosts and one listing to verify them
+        assert len(self.host.commands) == 2
+        assert set(self.host.hosts) == {"node1", "node2"}
+        assert self.host.hosts["node1"]["addr"] == "10.0.0.1"
+        assert sorted(self.host.hosts["node1"]["labels"]) == ["mgr", "mon"]
+
+    def test_add_hosts_without_address(self):
+        config = {"args": {"nodes": ["node2"], "labels": ["osd", "_admin"]}}
+
+        self.host.add_hosts(config)
+
+        assert self.host.hosts["node2"]["addr"] == "node2.lan"
+        assert self.host.hosts["node2"]["labels"] == ["osd", "_admin"]
+
+    def test_add_verify_failure(self):
+        self.host.run = mock.Mock()
+
+        with pytest.raises(HostOpFailure, match="Hostname verify failure"):
+            self.host.add({"args": {"node": "node1"}})
+
+    def test_label_add_and_remove(self):
+        self.host.add({"args": {"node": "node1"}})
+        self.host.commands.clear()
+
+        self.host.label_add({"args": {"node": "node1", "labels": ["mon", "mgr"]}})
+        assert self.host.hosts["node1"]["labels"] == ["mon", "mgr"]
+
+        self.host.label_remove({"args": {"node": "node1", "labels": ["mon", "mgr"]}})
+        assert self.host.hosts["node1"]["labels"] == []
+        assert len(self.host.commands) == 4
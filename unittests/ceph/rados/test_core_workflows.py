@@ -0,0 +1,129 @@
+import json
+
+import gevent
+import mock
+import pytest
+
+from ceph.rados.core_workflows import RadosOrchestrator
+
+BATCH_OUTPUT = """@@cephci-query-start:0
+{"full_ratio": 0.95}
+
+@@cephci-query-end:0:0
+@@cephci-query-start:1
+
+@@cephci-query-end:1:2
+@@cephci-query-start:2
+
+@@cephci-query-end:2:0
+"""
+
+
+class TestRadosOrchestrator:
+    @pytest.fixture(autouse=True)
+    def setUp(self):
+        node = mock.Mock()
+        node.config = {"rhbuild": "7.1"}
+        self.client = mock.Mock()
+        self.client.exit_status = 0
+        node.cluster.get_nodes.return_value = [self.client]
+        self.node = node
+        self._rados = RadosOrchestrator(node)
+
+    def test_run_ceph_command_on_client(self):
+        self.client.exec_command.side_effect = [("/usr/bin/ceph", ""), ("{}", "")]
+        self._rados.run_ceph_command("ceph osd stat")
+        self._rados.run_ceph_command("ceph osd dump")
+
+        assert self.client.exec_command.call_count == 3
+        assert self.node.shell.call_count == 0
+
+    def test_run_ceph_command_without_keyring(self):
+        self.client.exit_status = 1
+        self.node.shell.return_value = ('{"epoch": 10}', "")
+
+        assert self._rados.run_ceph_command("ceph osd stat") == {"epoch": 10}
+        assert self._rados.run_ceph_command("ceph osd dump") == {"epoch": 10}
+        assert self.client.exec_command.call_count == 1
+        assert self.node.shell.call_count == 2
+
+    def test_run_ceph_commands(self):
+        self.client.exec_command.return_value = (BATCH_OUTPUT, "")
+        results = self._rados.run_ceph_commands(
+            ["ceph osd dump", "ceph pg 1.0 query", "ceph osd blocklist clear"],
+            client_exec=True,
+        )
+
+        assert results == [{"full_ratio": 0.95}, None, {}]
+        assert self.client.exec_command.call_count == 1
+
+    def test_get_snapshot(self):
+        self.client.exec_command.return_value = ('{"pg_stats": []}', "")
+        first = self._rados.get_snapshot("ceph pg ls 1", ttl=10, client_exec=True)
+        second = self._rados.get_snapshot("ceph pg ls 1", ttl=10, client_exec=True)
+
+        assert first is second
+        assert self._rados.snapshot_stats == {"hits": 1, "misses": 1}
+        assert self.client.exec_command.call_count == 1
+
+    def test_get_snapshot_default_ttl(self):
+        self.client.exec_command.return_value = ("{}", "")
+        self._rados.get_snapshot("ceph pg ls 1", client_exec=True)
+        self._rados.get_snapshot("ceph pg ls 1", client_exec=True)
+
+        assert self._rados.snapshot_stats == {"hits": 0, "misses": 2}
+        assert self.client.exec_command.call_count == 2
+
+    def test_get_snapshot_invalidation(self):
+        self.client.exec_command.return_value = ("{}", "")
+        self._rados.get_snapshot("ceph pg ls 1", ttl=10, client_exec=True)
+        self._rados.run_ceph_command("ceph osd set noout", client_exec=True)
+        self._rados.get_snapshot("ceph pg ls 1", ttl=10, client_exec=True)
+
+        assert self._rados.snapshot_stats == {"hits": 0, "misses": 2}
+        assert self.client.exec_command.call_count == 3
+
+    def test_get_snapshot_single_flight(self):
+        def exec_command(**kw):
+            gevent.sleep(0.01)
+            return "{}", ""
+
+        self.client.exec_command.side_effect = exec_command
+        greenlets = [
+            gevent.spawn(self._rados.get_snapshot, "ceph pg dump pgs", 0, True)
+            for _ in range(5)
+        ]
+        gevent.joinall(greenlets)
+
+        assert self.client.exec_command.call_count == 1
+        assert self._rados.snapshot_stats == {"hits": 4, "misses": 1}
+
+        # Callers arriving after the fetch completed run the command again
+        self._rados.get_snapshot("ceph pg dump pgs", 0, True)
+        assert self.client.exec_command.call_count == 2
+
+    def test_get_pg_stats_index_without_keyring(self):
+        self.client.exit_status = 1
+        pg = {
+            "pgid": "1.0",
+            "state": "active+clean",
+            "up": [0, 1],
+            "acting": [0, 1],
+            "up_primary": 0,
+            "acting_primary": 0,
+        }
+        self.node.shell.return_value = (json.dumps({"pg_stats": [pg]}), "")
+
+        index = self._rados.get_pg_stats_index()
+
+        assert index.state("1.0") == "active+clean"
+        assert self.node.shell.call_count == 1
+
+    def test_is_mutating(self):
+        assert not RadosOrchestrator.is_mutating("ceph osd pool ls detail")
+        assert not RadosOrchestrator.is_mutating("ceph pg 1.0 query")
+        assert RadosOrchestrator.is_mutating("ceph osd pool set test size 3")
+        assert RadosOrchestrator.is_mutating("ceph osd unset noout")
+        assert RadosOrchestrator.is_mutating("ceph health mute OSD_DOWN")
+        assert RadosOrchestrator.is_mutating("ceph osd pool set test get 1")
+        assert not RadosOrchestrator.is_mutating("ceph  osd pool get test size")
@@ -0,0 +1,61 @@
+import pytest
+
+from ceph.rados.pg_stats import PGStatsIndex
+
+STAMP = "2024-05-01T10:00:0{}.000000+0000"
+
+
+def pg_stat(pgid, state, acting, stamp=0):
+    return {
+        "pgid": pgid,
+        "state": state,
+        "up": acting,
+        "acting": acting,
+        "up_primary": acting[0],
+        "acting_primary": acting[0],
+        "last_scrub_stamp": STAMP.format(stamp),
+        "last_deep_scrub_stamp": STAMP.format(stamp),
+    }
+
+
+class TestPGStatsIndex:
+    @pytest.fixture(autouse=True)
+    def setUp(self):
+        self.pg_stats = [
+            pg_stat("1.0", "active+clean", [0, 1, 2]),
+            pg_stat("1.a", "active+clean+scrubbing", [1, 2, 0]),
+            pg_stat("2.0", "active+undersized+degraded", [2, 0]),
+            pg_stat("2.1", "active+clean", [1, 0, 2]),
+        ]
+        self.index = PGStatsIndex(self.pg_stats)
+
+    def test_columns(self):
+        assert len(self.index) == 4
+        assert list(self.index.pools) == [1, 1, 2, 2]
+        assert list(self.index.seqs) == [0, 10, 0, 1]
+        assert self.index.state("2.0") == "active+undersized+degraded"
+        assert self.index.acting_set("1.a") == [1, 2, 0]
+        assert "3.0" not in self.index
+
+    def test_pgs_by_osd(self):
+        assert self.index.pgs_by_osd(1) == ["1.0", "1.a", "2.1"]
+        assert self.index.pgs_by_osd(1, primary=True) == ["1.a", "2.1"]
+        assert self.index.pgs_by_osd(5) == []
+
+    def test_pgs_in_state(self):
+        assert self.index.pgs_in_state("active", "clean") == ["1.0", "1.a", "2.1"]
+        assert self.index.pgs_in_state("active", "clean", pool=2) == ["2.1"]
+        assert self.index.pgs_in_state("degraded", "scrubbing", any_state=True) == [
+            "1.a",
+            "2.0",
+        ]
+        assert self.index.pgs_not_in_state("active", "clean") == ["2.0"]
+        assert self.index.pool_pgs(1) == ["1.0", "1.a"]
+
+    def test_scrubbed_since(self):
+        self.pg_stats[1] = pg_stat("1.a", "active+clean", [1, 2, 0], stamp=5)
+        current = PGStatsIndex(self.pg_stats)
+
+        assert current.scrubbed_since(self.index) == ["1.a"]
+        assert current.scrubbed_since(self.index, deep=True) == ["1.a"]
+        assert self.index.scrubbed_since(current) == []
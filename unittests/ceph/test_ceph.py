@@ -0,0 +1,448 @@
+import datetime
+import os
+import subprocess
+from time import time
+
+import mock
+import pytest
+
+from ceph.ceph import (
+    NODE_FACT_MARKER,
+    Ceph,
+    CephNode,
+    SSHConnectionManager,
+    SSHSessionPool,
+    TimeoutException,
+    parse_node_facts,
+    read_channel,
+)
+from cli.utilities.utils import get_kernel_version, os_major_version
+
+
+class MockChannel:
+    """Channel replaying the given stdout / stderr chunks before exiting."""
+
+    def __init__(self, out=(), err=(), exit_after=0):
+        self.out = list(out)
+        self.err = list(err)
+        self.exit_after = exit_after
+        self.eof_received = False
+        self.status_event = mock.Mock()
+
+    def recv_ready(self):
+        return bool(self.out)
+
+    def recv(self, nbytes):
+        return self.out.pop(0)
+
+    def recv_stderr_ready(self):
+        return bool(self.err)
+
+    def recv_stderr(self, nbytes):
+        return self.err.pop(0)
+
+    def exit_status_ready(self):
+        if self.exit_after:
+            self.exit_after -= 1
+            return False
+        return True
+
+
+class TestReadChannel:
+    @pytest.fixture(autouse=True)
+    def setUp(self):
+        self.end_time = datetime.datetime.now() + datetime.timedelta(seconds=30)
+
+    @mock.patch("ceph.ceph.select.select")
+    def test_read_channel(self, select_mock):
+        channel = MockChannel(out=[b"line1\nli", b"ne2\n", b"line3"], err=[b"warn\n"])
+        out, err = read_channel(channel, self.end_time, 30)
+
+        assert out == "line1\nline2\nline3"
+        assert err == "warn\n"
+        assert select_mock.call_count == 0
+
+    @mock.patch("ceph.ceph.logger")
+    def test_read_channel_logs_complete_lines(self, logger_mock):
+        channel = MockChannel(out=[b"line1\nli", b"ne2\n"])
+        read_channel(channel, self.end_time, 30)
+
+        logged = [c.args[0] for c in logger_mock.debug.call_args_list]
+        assert logged == ["line1", "line2"]
+
+    def test_read_channel_stream(self):
+        chunks = []
+        channel = MockChannel(out=[b"chunk1", b"chunk2"])
+        out, _ = read_channel(channel, self.end_time, 30, stream=chunks.append)
+
+        assert out == ""
+        assert chunks == [b"chunk1", b"chunk2"]
+
+    @mock.patch("ceph.ceph.select.select")
+    def test_read_channel_waits_on_channel(self, select_mock):
+        channel = MockChannel(out=[b"data"], exit_after=3)
+        out, _ = read_channel(channel, self.end_time, 30, log=False)
+
+        assert out == "data"
+        assert select_mock.call_count == 2
+
+    @mock.patch("ceph.ceph.select.select")
+    def test_read_channel_output_with_exit_status(self, select_mock):
+        # The tail of the output and the exit status arrive at the same time
+        channel = MockChannel(exit_after=1)
+        tail = [(b"tail", b"warn")]
+        exit_status_ready = channel.exit_status_ready
+
+        def deliver():
+            ready = exit_status_ready()
+            if ready and tail:
+                out, err = tail.pop()
+                channel.out.append(out)
+                channel.err.append(err)
+            return ready
+
+        channel.exit_status_ready = deliver
+        out, err = read_channel(channel, self.end_time, 30, log=False)
+
+        assert (out, err) == ("tail", "warn")
+
+    def test_read_channel_waits_for_status_post_eof(self):
+        channel = MockChannel(exit_after=1)
+        channel.eof_received = True
+        read_channel(channel, self.end_time, 30, log=False)
+
+        assert channel.status_event.wait.call_count == 1
+
+    def test_read_channel_timeout(self):
+        channel = MockChannel(out=[b"data"], exit_after=1)
+        end_time = datetime.datetime.now() - datetime.timedelta(seconds=1)
+
+        with pytest.raises(TimeoutException):
+            read_channel(channel, end_time, 30, log=False)
+
+
+class TestSSHConnectionManager:
+    @pytest.fixture(autouse=True)
+    def setUp(self):
+        with mock.patch("ceph.ceph.paramiko.SSHClient") as client_mock:
+            self.transport = client_mock.return_value.get_transport.return_value
+            self.transport.is_active.return_value = True
+            self._connection = SSHConnectionManager(
+                "10.0.0.1", "cephuser", "pass", max_channels=2
+            )
+            yield
+        SSHSessionPool.close_all()
+
+    def test_open_channel_metrics(self):
+        with self._connection.open_channel(timeout=10) as channel:
+            assert channel == self.transport.open_session.return_value
+            assert self._connection.metrics.in_flight == 1
+
+        metrics = self._connection.metrics.as_dict()
+        assert metrics["channels"] == 1
+        assert metrics["in_flight"] == 0
+        assert self.transport.set_keepalive.call_count == 1
+        assert channel.close.call_count == 1
+
+    def test_open_channel_failure_releases_slot(self):
+        self.transport.open_session.side_effect = [
+            Exception("refused"),
+            mock.Mock(),
+            mock.Mock(),
+        ]
+        with pytest.raises(Exception):
+            with self._connection.open_channel():
+                pass
+
+        with self._connection.open_channel(), self._connection.open_channel():
+            pass
+
+        assert self._connection.metrics.failures == 1
+        assert self._connection.metrics.channels == 2
+
+    def test_open_channel_limit(self):
+        with self._connection.open_channel(), self._connection.open_channel():
+            sem = self._connection._SSHConnectionManager__channels
+            assert not sem.acquire(blocking=False)
+
+    def _sftp_client(self, *args):
+        client = mock.Mock()
+        client.get_channel.return_value.closed = False
+        client.get_channel.return_value.get_transport.return_value = self.transport
+        return client
+
+    @mock.patch("ceph.ceph.paramiko.SFTPClient.from_transport")
+    def test_sftp_reuse(self, sftp_mock):
+        sftp_mock.side_effect = self._sftp_client
+        with self._connection.sftp() as first:
+            pass
+
+        with self._connection.sftp() as second, self._connection.sftp() as third:
+            pass
+
+        assert first is second
+        assert third is not first
+        assert sftp_mock.call_count == 2
+        # Only one of the released sessions is kept open
+        assert first.close.call_count + third.close.call_count == 1
+        assert self._connection.metrics.sftp_reuses == 1
+
+        # The idle session holds on to its channel slot till closed
+        sem = self._connection._SSHConnectionManager__channels
+        assert sem.acquire(blocking=False)
+        assert not sem.acquire(blocking=False)
+        sem.release()
+        self._connection.close()
+        assert first.close.call_count + third.close.call_count == 2
+        assert sem.acquire(blocking=False)
+
+    @mock.patch("ceph.ceph.paramiko.SFTPClient.from_transport")
+    def test_sftp_discards_closed_session(self, sftp_mock):
+        sftp_mock.side_effect = self._sftp_client
+        with self._connection.sftp() as first:
+            pass
+
+        first.get_channel.return_value.closed = True
+        with self._connection.sftp() as second:
+            pass
+
+        assert second is not first
+        assert first.close.call_count == 1
+
+    def test_session_pool_reuse(self):
+        first = SSHSessionPool.get("10.0.0.1", "cephuser", "pass")
+        second = SSHSessionPool.get("10.0.0.1", "cephuser", "pass")
+        root = SSHSessionPool.get("10.0.0.1", "root", "pass")
+
+        assert first is second
+        assert first is not root
+        assert set(SSHSessionPool.metrics()) == {
+            "cephuser@10.0.0.1",
+            "root@10.0.0.1",
+        }
+
+
+FACTS = "".join(
+    f"{NODE_FACT_MARKER}:{line}\n"
+    for line in [
+        'os_release NAME="Red Hat Enterprise Linux"',
+        'os_release VERSION_ID="9.2"',
+        "os_release ",
+        "release Red Hat Enterprise Linux release 9.2 (Plow)",
+        "uname Linux ceph-node1 5.14.0-284.el9.x86_64 #1 SMP x86_64 GNU/Linux",
+        "kernel 5.14.0-284.el9.x86_64",
+        "cpus 8",
+        "cpu_model model name\t: Intel Xeon Processor (Cascadelake)",
+        "memory MemTotal:       16080384 kB",
+        "interfaces 1: lo    inet 127.0.0.1/8 scope host lo",
+        "interfaces 2: eth0    inet 10.0.0.1/24 brd 10.0.0.255 scope global eth0",
+        "interfaces 2: eth0    inet6 fe80::1/64 scope link",
+        "disks vda 80G disk",
+        "disks vdb 20G disk",
+        "container_runtime /usr/bin/podman",
+    ]
+)
+
+
+class TestNodeFacts:
+    @pytest.fixture(autouse=True)
+    def setUp(self):
+        self.node = CephNode.__new__(CephNode)
+        self.node.exec_command = mock.Mock(return_value=(FACTS, ""))
+
+    def test_parse_node_facts(self):
+        facts = parse_node_facts("ls output\n" + FACTS)
+
+        assert facts["distro_info"] == {
+            "NAME": "Red Hat Enterprise Linux",
+            "VERSION_ID": "9.2",
+        }
+        assert facts["release"] == "Red Hat Enterprise Linux release 9.2 (Plow)"
+        assert facts["cpus"] == 8
+        assert facts["cpu_model"] == "Intel Xeon Processor (Cascadelake)"
+        assert facts["memory_mb"] == 15703
+        assert facts["interfaces"] == {
+            "lo": ["127.0.0.1/8"],
+            "eth0": ["10.0.0.1/24", "fe80::1/64"],
+        }
+        assert facts["disks"][1] == {"name": "vdb", "size": "20G", "type": "disk"}
+        assert facts["container_runtime"] == "podman"
+
+    def test_parse_missing_facts(self):
+        facts = parse_node_facts("")
+
+        assert facts["distro_info"] == {}
+        assert facts["cpus"] == 0
+        assert facts["memory_mb"] == 0
+        assert facts["release"] == ""
+
+    def test_facts_cached(self):
+        assert self.node.distro_info["VERSION_ID"] == "9.2"
+        assert get_kernel_version(self.node)[0].startswith("Linux ceph-node1")
+        assert os_major_version(self.node) == "9"
+        assert self.node.exec_command.call_count == 1
+        assert "bash -s" == self.node.exec_command.call_args[1]["cmd"]
+
+    def test_facts_refresh(self):
+        self.node.facts
+        self.node.expire_facts()
+        self.node.facts
+
+        with mock.patch("ceph.ceph.time", return_value=time() + CephNode.FACTS_TTL):
+            self.node.facts
+        self.node.facts
+
+        assert self.node.exec_command.call_count == 3
+
+
+class TestCephNodeConnect:
+    @pytest.fixture(autouse=True)
+    def setUp(self):
+        self.node = CephNode.__new__(CephNode)
+        self.node.vmname = "ceph-node1"
+        self.node.ip_address = "10.0.0.1"
+        self.node.username = "cephuser"
+        self.node.password = "pass"
+        self.node.root_passwd = "rootpass"
+        self.node.vm_node = mock.Mock(node_type="openstack")
+        self.node.root_connection = mock.Mock()
+
+        self.channel = MockChannel(
+            out=[
+                b"bin boot etc\n",
+                f"{NODE_FACT_MARKER} hostname=ceph-node1.example.com\n".encode(),
+                f"{NODE_FACT_MARKER} internal_ip=10.1.0.5\n".encode(),
+                f"{NODE_FACT_MARKER} pkg_type=rpm\n".encode(),
+                FACTS.encode(),
+            ]
+        )
+        for method in ["settimeout", "exec_command", "sendall", "shutdown_write"]:
+            setattr(self.channel, method, mock.Mock())
+        self.channel.recv_exit_status = mock.Mock(return_value=0)
+        self.node.root_connection.open_channel.return_value.__enter__ = mock.Mock(
+            return_value=self.channel
+        )
+        self.node.root_connection.open_channel.return_value.__exit__ = mock.Mock(
+            return_value=False
+        )
+
+    @mock.patch("ceph.ceph.sleep")
+    @mock.patch("ceph.ceph.socket.create_connection")
+    def test_connect(self, connection_mock, sleep_mock):
+        sock = connection_mock.return_value.__enter__.return_value
+        connection_mock.side_effect = [ConnectionRefusedError(), mock.DEFAULT]
+        sock.recv.return_value = b"SSH-"
+
+        self.node.connect()
+
+        assert sleep_mock.call_count == 1
+        assert self.node.root_connection.open_channel.call_count == 1
+        assert "rootpass" not in self.channel.exec_command.call_args[0][0]
+        assert "rootpass" in self.channel.sendall.call_args[0][0]
+        assert self.node.hostname == "ceph-node1.example.com"
+        assert self.node.shortname == "ceph-node1"
+        assert self.node.internal_ip == "10.1.0.5"
+        assert self.node.pkg_type == "rpm"
+        assert self.node.distro_info["VERSION_ID"] == "9.2"
+        assert self.node.facts["kernel"] == "5.14.0-284.el9.x86_64"
+
+    @mock.patch("ceph.ceph.socket.create_connection")
+    def test_connect_timeout(self, connection_mock):
+        connection_mock.side_effect = ConnectionRefusedError()
+
+        with pytest.raises(AssertionError):
+            self.node.connect(timeout=0)
+
+
+USER_SSH_CONFIG = """Host *.example.com
+    User admin
+
+Host *
+    StrictHostKeyChecking no
+    ServerAliveInterval 30
+"""
+
+
+class TestCephSetupSSHKeys:
+    @pytest.fixture(autouse=True)
+    def setUp(self, tmp_path):
+        self.home = tmp_path / "home"
+        self.home.mkdir()
+        self.hosts = tmp_path / "hosts"
+        self.hosts.write_text(
+            "127.0.0.1 localhost node1\n"
+            "10.0.0.9\tnode2.lan\tnode2\n"
+            "10.0.0.1\tnode1.lan\tnode1\n"
+            "10.0.0.1\tnode1.lan\tnode1\n"
+        )
+        self.nodes = [self.node(i) for i in (1, 2)]
+        self.cluster = Ceph.__new__(Ceph)
+        self.cluster.get_nodes = mock.Mock(return_value=self.nodes)
+
+    def node(self, index):
+        node = mock.Mock(
+            ip_address=f"10.0.0.{index}",
+            hostname=f"node{index}.lan",
+            shortname=f"node{index}",
+        )
+
+        def generate_id_rsa():
+            node.id_rsa_pub = f"ssh-rsa KEY{index} cephuser@node{index}\n"
+
+        def exec_command(cmd, stdin):
+            # Runs the script locally against the temporary files
+            script = stdin.replace("/etc/hosts", str(self.hosts))
+            script = script.replace(" sudo ", " '' ")
+            subprocess.run(
+                ["bash", "-c", script],
+                env=dict(os.environ, HOME=str(self.home)),
+                check=True,
+            )
+
+        node.generate_id_rsa = generate_id_rsa
+        node.exec_command = exec_command
+        return node
+
+    def test_setup_ssh_keys(self):
+        (self.home / ".ssh").mkdir()
+        (self.home / ".ssh" / "authorized_keys").write_text(
+            "ssh-rsa USER user@laptop\nssh-rsa KEY1 cephuser@node1\n"
+        )
+
+        (self.home / ".ssh" / "config").write_text(USER_SSH_CONFIG)
+
+        self.cluster.setup_ssh_keys()
+        first = [
+            (self.home / ".ssh" / name).read_text()
+            for name in ("authorized_keys", "config")
+        ] + [self.hosts.read_text()]
+        self.cluster.setup_ssh_keys()
+
+        keys = (self.home / ".ssh" / "authorized_keys").read_text().splitlines()
+        assert keys == [
+            "ssh-rsa USER user@laptop",
+            "# BEGIN cephci cluster",
+            "ssh-rsa KEY1 cephuser@node1",
+            "ssh-rsa KEY2 cephuser@node2",
+            "# END cephci cluster",
+        ]
+        # The stale and duplicated entries are dropped, the loopback is kept
+        assert self.hosts.read_text().splitlines() == [
+            "127.0.0.1 localhost node1",
+            "# BEGIN cephci cluster",
+            "10.0.0.1\tnode1.lan\tnode1",
+            "10.0.0.2\tnode2.lan\tnode2",
+            "# END cephci cluster",
+        ]
+        config = self.home / ".ssh" / "config"
+        assert config.read_text().count("ServerAliveInterval 2400") == 1
+        # The user's own stanzas are kept as they are
+        assert config.read_text().startswith(USER_SSH_CONFIG)
+        assert oct(config.stat().st_mode & 0o777) == "0o400"
+
+        # Re-runs leave the files unchanged
+        assert first[:2] == [
+            (self.home / ".ssh" / name).read_text()
+            for name in ("authorized_keys", "config")
+        ]
+        assert first[2] == self.hosts.read_text()
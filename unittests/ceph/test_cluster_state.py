@@ -0,0 +1,90 @@
+import json
+
+import mock
+import pytest
+
+from ceph.ceph import Ceph, CephNode, CephOsd
+from ceph.cluster_state import (
+    ClusterStateError,
+    ClusterStateStore,
+    cluster_state,
+    load_cluster_state,
+)
+
+
+def _node(index, roles):
+    return CephNode(
+        username="cephuser",
+        password="cephuser",
+        root_password="passwd",
+        look_for_key=False,
+        private_key_path="",
+        root_login="root",
+        private_ip=f"10.0.0.{index}",
+        ip_address=f"10.0.1.{index}",
+        subnet="10.0.0.0/24",
+        hostname=f"ceph-node{index}.example.com",
+        ceph_nodename=f"node{index}",
+        role=roles,
+        no_of_volumes=2 if "osd" in roles else 0,
+        ceph_vmnode=mock.Mock(node_type="openstack", osd_scenario=None),
+    )
+
+
+class TestClusterState:
+    @pytest.fixture(autouse=True)
+    def setUp(self, tmp_path):
+        self.path = str(tmp_path / "state")
+        nodes = [_node(1, ["installer", "mon", "mgr"])]
+        nodes += [_node(i, ["osd"]) for i in range(2, 5)]
+        self.clusters = {"ceph": Ceph("ceph", nodes)}
+        self.clusters["ceph"].rhcs_version = "7.1"
+
+    def _lines(self):
+        with open(self.path) as fd:
+            return [json.loads(line) for line in fd]
+
+    def test_store_and_load(self):
+        store = ClusterStateStore(self.path)
+        store.save(self.clusters)
+
+        loaded = load_cluster_state(self.path, reconnect=False)
+        cluster = loaded["ceph"]
+        assert cluster_state(cluster) == cluster_state(self.clusters["ceph"])
+        assert str(cluster.rhcs_version) == "7.1"
+        assert len(cluster.get_ceph_objects("osd")) == 6
+        assert isinstance(cluster.get_ceph_objects("osd")[0], CephOsd)
+        assert cluster.get_ceph_objects("osd")[0].node is cluster[1]
+
+    def test_store_changes_only(self):
+        store = ClusterStateStore(self.path)
+        store.save(self.clusters)
+        # The cached node facts are not part of the state
+        self.clusters["ceph"][1]._set_facts("")
+        store.save(self.clusters)
+        self.clusters["ceph"][2].hostname = "ceph-node3"
+        store.save(self.clusters)
+
+        lines = self._lines()
+        assert len(lines) == 3
+        assert list(lines[2]["clusters"]["ceph"]["nodes"]) == ["ceph-node3.example.com"]
+
+        loaded = load_cluster_state(self.path, reconnect=False)
+        assert loaded["ceph"][2].hostname == "ceph-node3"
+
+    def test_store_snapshot_on_node_change(self):
+        store = ClusterStateStore(self.path)
+        store.save(self.clusters)
+        self.clusters["ceph"].node_list.append(_node(5, ["client"]))
+        store.save(self.clusters)
+
+        assert len(self._lines()) == 2
+        loaded = load_cluster_state(self.path, reconnect=False)
+        assert len(loaded["ceph"]) == 5
+
+    def test_load_unsupported_version(self):
+        with open(self.path, "w") as fd:
+            fd.write(json.dumps({"format": "cephci-cluster-state", "version": 0}))
+
+        with pytest.raises(ClusterStateError):
+            load_cluster_state(self.path, reconnect=False)
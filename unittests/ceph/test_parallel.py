@@ -0,0 +1,85 @@
+import gevent
+import pytest
+
+from ceph.parallel import parallel
+
+
+def _sleep_and_return(value, duration=0.0):
+    gevent.sleep(duration)
+    return value
+
+
+def _fail(duration=0.0):
+    gevent.sleep(duration)
+    raise ValueError("failed")
+
+
+class TestParallel:
+    def test_parallel_results(self):
+        with parallel() as p:
+            for i in range(5):
+                p.spawn(_sleep_and_return, i)
+
+            results = sorted(p)
+
+        assert results == [0, 1, 2, 3, 4]
+
+    def test_parallel_ordered(self):
+        with parallel(ordered=True) as p:
+            for i in range(5):
+                p.spawn(_sleep_and_return, i, duration=(5 - i) * 0.01)
+
+            results = list(p)
+
+        assert results == [0, 1, 2, 3, 4]
+
+    def test_parallel_results_by_tag(self):
+        with parallel() as p:
+            for name in ["node3", "node1", "node2"]:
+                p.spawn_tagged(name, _sleep_and_return, name.upper())
+
+        results = p.results_by_tag()
+        assert list(results) == ["node3", "node1", "node2"]
+        assert results["node1"] == "NODE1"
+
+    def test_parallel_max_workers(self):
+        running = []
+        peak = []
+
+        def _track():
+            running.append(1)
+            peak.append(len(running))
+            gevent.sleep(0.01)
+            running.pop()
+
+        with parallel(max_workers=2) as p:
+            for _ in range(6):
+                p.spawn(_track)
+
+        assert max(peak) == 2
+        assert all(task.status == "done" for task in p.tasks)
+
+    def test_parallel_fail_fast(self):
+        with pytest.raises(ValueError):
+            with parallel(fail_fast=True) as p:
+                p.spawn(_fail, 0.01)
+                for i in range(3):
+                    p.spawn(_sleep_and_return, i, duration=5)
+
+        statuses = [task.status for task in p.tasks]
+        assert statuses == ["failed", "cancelled", "cancelled", "cancelled"]
+
+    def test_parallel_exception_raised(self):
+        with pytest.raises(ValueError):
+            with parallel() as p:
+                p.spawn(_fail)
+                p.spawn(_sleep_and_return, 1)
+
+    def test_parallel_timeout(self):
+        with pytest.raises(TimeoutError):
+            with parallel(timeout=0.05) as p:
+                p.spawn_tagged("slow", _sleep_and_return, 1, duration=5)
+                p.spawn_tagged("fast", _sleep_and_return, 2)
+
+        assert p.tasks[0].status == "failed"
+        assert p.tasks[1].status == "done"
@@ -0,0 +1,151 @@
+import os
+from contextlib import contextmanager
+
+import pytest
+
+from ceph import sftp
+
+
+class FakeFile:
+    """SFTP file backed by a local file."""
+
+    def __init__(self, path, mode):
+        self._fp = open(path, mode)
+        self.pipelined = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._fp, name)
+
+    def set_pipelined(self, pipelined=True):
+        self.pipelined = pipelined
+
+    def readv(self, chunks):
+        for offset, length in chunks:
+            self._fp.seek(offset)
+            yield self._fp.read(length)
+
+
+class FakeSFTP:
+    """SFTP client serving the files of a local directory."""
+
+    def __init__(self, root):
+        self.root = root
+        self.files = []
+
+    def _path(self, path):
+        return os.path.join(self.root, path.lstrip("/"))
+
+    def open(self, path, mode="r"):
+        self.files.append(FakeFile(self._path(path), mode))
+        return self.files[-1]
+
+    def stat(self, path):
+        return os.stat(self._path(path))
+
+    def put(self, localpath, remotepath):
+        with open(localpath, "rb") as src, open(self._path(remotepath), "wb") as dst:
+            dst.write(src.read())
+
+    def get(self, remotepath, localpath):
+        with open(self._path(remotepath), "rb") as src, open(localpath, "wb") as dst:
+            dst.write(src.read())
+
+
+class FakeConnection:
+    """Connection handing out SFTP clients of a local directory."""
+
+    def __init__(self, root):
+        os.makedirs(root)
+        self.root = root
+        self.sessions = []
+
+    @contextmanager
+    def sftp(self):
+        self.sessions.append(FakeSFTP(self.root))
+        yield self.sessions[-1]
+
+
+class TestTransfers:
+    @pytest.fixture(autouse=True)
+    def setUp(self, tmp_path):
+        self.local = tmp_path / "local"
+        self.local.mkdir()
+        self.node1 = FakeConnection(str(tmp_path / "node1"))
+        self.node2 = FakeConnection(str(tmp_path / "node2"))
+        self.data = os.urandom(100 * 1024 + 7)
+        self.kw = {"chunk_size": 40 * 1024, "threshold": 64 * 1024}
+
+    def _write(self, path):
+        with open(path, "wb") as fp:
+            fp.write(self.data)
+
+    def _read(self, path):
+        with open(path, "rb") as fp:
+            return fp.read()
+
+    def test_upload_small_file(self):
+        self._write(self.local / "small")
+
+        size = sftp.upload(self.node1, str(self.local / "small"), "/small")
+
+        assert size == len(self.data)
+        assert len(self.node1.sessions) == 1
+        assert self._read(os.path.join(self.node1.root, "small")) == self.data
+
+    def test_upload_in_chunks(self):
+        self._write(self.local / "big")
+
+        size = sftp.upload(self.node1, str(self.local / "big"), "/big", **self.kw)
+
+        assert size == len(self.data)
+        # One session creating the file and one for every chunk
+        assert len(self.node1.sessions) == 4
+        assert all(s.files[0].pipelined for s in self.node1.sessions[1:])
+        assert self._read(os.path.join(self.node1.root, "big")) == self.data
+
+    def test_download_in_chunks(self):
+        self._write(os.path.join(self.node1.root, "big"))
+
+        size = sftp.download(self.node1, "/big", str(self.local / "big"), **self.kw)
+
+        assert size == len(self.data)
+        assert len(self.node1.sessions) == 4
+        assert self._read(self.local / "big") == self.data
+
+    def test_download_small_file_overwrites(self):
+        self._write(os.path.join(self.node1.root, "small"))
+        with open(self.local / "small", "wb") as fp:
+            fp.write(b"x" * (len(self.data) * 2))
+
+        sftp.download(self.node1, "/small", str(self.local / "small"))
+
+        assert self._read(self.local / "small") == self.data
+
+    @pytest.mark.parametrize("threshold", [0, 1024 * 1024])
+    def test_copy_between_nodes(self, threshold):
+        self._write(os.path.join(self.node1.root, "conf"))
+        with open(os.path.join(self.node2.root, "conf"), "wb") as fp:
+            fp.write(b"x" * (len(self.data) * 2))
+
+        kw = dict(self.kw, threshold=threshold)
+        size = sftp.copy(self.node1, "/conf", self.node2, **kw)
+
+        assert size == len(self.data)
+        assert self._read(os.path.join(self.node2.root, "conf")) == self.data
+        assert self.node2.sessions[-1].files[0].pipelined
+
+    def test_copy_empty_file(self):
+        open(os.path.join(self.node1.root, "empty"), "wb").close()
+
+        assert sftp.copy(self.node1, "/empty", self.node2, "/copy") == 0
+        assert self._read(os.path.join(self.node2.root, "copy")) == b""
+
+    def test_copy_onto_itself(self):
+        with pytest.raises(ValueError):
+            sftp.copy(self.node1, "/conf", self.node1)
@@ -0,0 +1,126 @@
+import csv
+import json
+import os
+
+import pytest
+
+from cli.performance.metrics import analyze, load_samples, percentile, slope
+from cli.performance.utilities.proc_sampler import FIELDS
+
+
+def write_samples(path, daemons, count=12, interval=360):
+    """Write count samples of the daemons, taken every interval seconds."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", newline="") as fp:
+        writer = csv.writer(fp)
+        writer.writerow(FIELDS)
+        for idx in range(count):
+            seconds = idx * interval
+            timestamp = f"2024-01-01 {seconds // 3600:02}:{seconds % 3600 // 60:02}:00"
+            for process, daemon, cpu, rss, growth in daemons:
+                writer.writerow(
+                    [timestamp, process, daemon, 1, cpu + idx % 2, rss + growth * idx]
+                    + [0] * 5
+                )
+
+
+class TestMetrics:
+    @pytest.fixture(autouse=True)
+    def setUp(self, tmp_path):
+        self.run_dir = str(tmp_path / "run")
+        self.metrics_dir = os.path.join(self.run_dir, "performance-metrics")
+
+    def test_percentile(self):
+        assert percentile([4, 1, 3, 2], 50) == 2.5
+        assert percentile(range(101), 95) == 95
+        assert percentile([], 95) == 0.0
+
+    def test_slope(self):
+        times = [i * 360 for i in range(12)]
+
+        assert slope(times, [100 + 5 * i for i in range(12)]) == pytest.approx(50)
+        assert slope(times[:3], [1, 2, 3]) == 0.0
+
+    def test_analyze(self):
+        write_samples(
+            os.path.join(self.metrics_dir, "test_1", "node1.csv"),
+            [("ceph-osd", "osd.0", 10, 500, 0), ("ceph-mon", "mon.node1", 2, 100, 5)],
+        )
+        write_samples(
+            os.path.join(self.metrics_dir, "test_1", "node2.csv"),
+            [("ceph-osd", "osd.1", 20, 700, 0)],
+        )
+
+        result = analyze(self.run_dir)
+        stats = result["tests"]["test_1"]
+
+        assert set(stats["daemons"]) == {
+            "node1/osd.0",
+            "node1/mon.node1",
+            "node2/osd.1",
+        }
+        assert stats["daemons"]["node2/osd.1"]["cpu_max"] == 21
+        assert stats["processes"]["ceph-osd"]["samples"] == 24
+        assert stats["processes"]["ceph-osd"]["rss_max"] == 700
+        assert stats["processes"]["ceph-mon"]["rss_slope"] == 50
+
+        # The growing mon is flagged without a baseline
+        assert [(r["process"], r["metric"]) for r in result["regressions"]] == [
+            ("ceph-mon", "rss_slope")
+        ]
+        with open(os.path.join(self.metrics_dir, "summary.json")) as fp:
+            assert json.load(fp) == result
+
+    def test_analyze_with_baseline(self, tmp_path):
+        baseline_dir = str(tmp_path / "baseline")
+        write_samples(
+            os.path.join(baseline_dir, "performance-metrics", "test_1", "node1.csv"),
+            [("ceph-osd", "osd.0", 10, 500, 0), ("ceph-mgr", "mgr.x", 10, 500, 0)],
+        )
+        baseline = analyze(baseline_dir)
+        assert not baseline["regressions"]
+
+        write_samples(
+            os.path.join(self.metrics_dir, "test_1", "node3.csv"),
+            [("ceph-osd", "osd.0", 12, 520, 0), ("ceph-mgr", "mgr.y", 30, 900, 0)],
+        )
+        baseline_file = os.path.join(
+            baseline_dir, "performance-metrics", "summary.json"
+        )
+        result = analyze(self.run_dir, baseline=baseline_file)
+
+        assert result["baseline"] == baseline_file
+        assert [(r["process"], r["metric"]) for r in result["regressions"]] == [
+            ("ceph-mgr", "cpu_p95"),
+            ("ceph-mgr", "cpu_max"),
+            ("ceph-mgr", "rss_p95"),
+            ("ceph-mgr", "rss_max"),
+        ]
+        assert result["regressions"][3]["baseline"] == 500
+
+    def test_load_samples_truncated_row(self):
+        path = os.path.join(self.metrics_dir, "test_1", "node1.csv")
+        write_samples(path, [("ceph-osd", "osd.0", 10, 500, 0)], count=2)
+        with open(path, "a") as fp:
+            fp.write("2024-01-01 00:12:00,ceph-osd,osd.0,1\n")
+
+        series = load_samples(self.metrics_dir)["test_1"][
+            ("node1", "ceph-osd", "osd.0")
+        ]
+
+        assert len(series) == 2
+        assert len(series.cpu) == len(series.rss) == 2
+
+    def test_analyze_without_samples(self):
+        assert analyze(self.run_dir) is None
+
+    def test_analyze_missing_baseline(self):
+        write_samples(
+            os.path.join(self.metrics_dir, "test_1", "node1.csv"),
+            [("ceph-osd", "osd.0", 10, 500, 0)],
+        )
+
+        result = analyze(self.run_dir, baseline="/nonexistent/summary.json")
+
+        assert result["regressions"] == []
+        assert "test_1" in result["tests"]
@@ -0,0 +1,123 @@
+import csv
+import signal
+import threading
+
+import pytest
+
+from cli.performance.utilities import proc_sampler
+from cli.performance.utilities.proc_sampler import (
+    CLK_TCK,
+    FIELDS,
+    Sampler,
+    daemon_name,
+    find_processes,
+    read_counters,
+    run,
+)
+
+STATUS = "Name:\t{comm}\nVmRSS:\t  {rss} kB\nvoluntary_ctxt_switches:\t{vcs}\nnonvoluntary_ctxt_switches:\t7\n"
+IO = "rchar: 10\nread_bytes: {read}\nwrite_bytes: 4096\n"
+
+
+class FakeProc:
+    """procfs tree with the given processes."""
+
+    def __init__(self, root):
+        self.root = root
+        self.root.mkdir()
+        (self.root / "self").mkdir()
+        self.uptime(100)
+
+    def uptime(self, seconds):
+        (self.root / "uptime").write_text(f"{seconds} 50.00\n")
+
+    def process(self, pid, comm, args, ticks=0, rss=1024, start=0, io=True):
+        path = self.root / str(pid)
+        path.mkdir(exist_ok=True)
+        (path / "comm").write_text(f"{comm}\n")
+        (path / "cmdline").write_text("\0".join([comm] + args) + "\0")
+        # utime, stime, num_threads and starttime are the fields 14, 15, 20 and 22
+        fields = ["S"] + ["0"] * 10 + [str(ticks), "0"] + ["0"] * 4 + ["12"]
+        fields += ["0", str(start * CLK_TCK)]
+        (path / "stat").write_text(f"{pid} ({comm} x) {' '.join(fields)}\n")
+        (path / "status").write_text(STATUS.format(comm=comm, rss=rss, vcs=pid))
+        if io:
+            (path / "io").write_text(IO.format(read=pid * 10))
+
+
+class StoppingSampler(Sampler):
+    """Sampler receiving SIGTERM while taking the second sample."""
+
+    def sample(self):
+        rows = super().sample()
+        if self.count == 2:
+            signal.pthread_kill(threading.get_ident(), signal.SIGTERM)
+        return rows
+
+
+class TestProcSampler:
+    @pytest.fixture(autouse=True)
+    def setUp(self, tmp_path):
+        self.proc = FakeProc(tmp_path / "proc")
+        self.proc.process(100, "ceph-osd", ["-n", "osd.3"], ticks=CLK_TCK * 10)
+        self.proc.process(200, "ceph-mon", ["--id", "node1"], io=False)
+        self.proc.process(300, "sshd", [])
+        self.output = str(tmp_path / "samples.csv")
+
+    def test_daemon_name(self):
+        assert daemon_name("ceph-osd", ["ceph-osd", "-f", "--id", "3"]) == "osd.3"
+        assert daemon_name("ceph-mgr", ["ceph-mgr", "-n", "mgr.x"]) == "mgr.x"
+        assert daemon_name("radosgw", ["radosgw", "-f"]) == "radosgw"
+
+    def test_find_processes(self):
+        found = find_processes(["ceph-osd", "ceph-mon"], str(self.proc.root))
+
+        assert found == {100: ("ceph-osd", "osd.3"), 200: ("ceph-mon", "mon.node1")}
+
+    def test_read_counters(self):
+        counters = read_counters(100, str(self.proc.root))
+
+        assert counters["cpu_ticks"] == CLK_TCK * 10
+        assert counters["threads"] == 12
+        assert counters["rss_kb"] == 1024
+        assert counters["read_bytes"] == 1000
+        assert counters["voluntary_ctxt_switches"] == 100
+
+        # io is not readable for the processes of other users
+        assert read_counters(200, str(self.proc.root))["read_bytes"] == ""
+
+    def test_sample(self):
+        sampler = Sampler(["ceph-osd", "ceph-mon"], str(self.proc.root))
+        rows = sampler.sample()
+
+        # Average since the start of the process at first
+        assert [r[:5] for r in rows] == [
+            [rows[0][0], "ceph-osd", "osd.3", 100, 10.0],
+            [rows[0][0], "ceph-mon", "mon.node1", 200, 0.0],
+        ]
+        assert rows[0][5] == 1.0
+
+        self.proc.uptime(110)
+        self.proc.process(100, "ceph-osd", ["-n", "osd.3"], ticks=CLK_TCK * 15)
+        assert sampler.sample()[0][4] == 50.0
+
+    def test_sample_exited_process(self):
+        sampler = Sampler(["ceph-osd", "ceph-mon"], str(self.proc.root))
+        sampler.sample()
+        (self.proc.root / "200" / "stat").unlink()
+
+        assert [r[3] for r in sampler.sample()] == [100]
+        assert 200 not in sampler.processes
+
+    def test_run_stops_on_sigterm(self):
+        sampler = StoppingSampler(["ceph-osd"], str(self.proc.root))
+
+        run(sampler, self.output, interval=0.01, flush_interval=60)
+
+        with open(self.output) as fp:
+            rows = list(csv.reader(fp))
+
+        # Pending samples are written out before exiting
+        assert rows[0] == FIELDS
+        assert len(rows) == 3
+        assert not signal.pthread_sigmask(signal.SIG_BLOCK, []) & proc_sampler.SIGNALS
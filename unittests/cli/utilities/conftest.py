@@ -0,0 +1,40 @@
+import subprocess
+import sys
+
+import pytest
+
+from cli.utilities.file_agent import AGENT_MISSING, REMOTE_SCRIPT, SCRIPT, FileAgent
+
+
+class LocalNode:
+    """Node running the agent locally, from its source once uploaded."""
+
+    def __init__(self, hostname="node1"):
+        self.hostname = hostname
+        self.exit_status = 0
+        self.commands = []
+        self.uploads = []
+
+    def upload_file(self, src, dst, sudo=False):
+        self.uploads.append(dst)
+
+    def exec_command(self, cmd, stdin, **kw):
+        self.commands.append(cmd)
+        if REMOTE_SCRIPT not in self.uploads:
+            self.exit_status = AGENT_MISSING
+            return "", ""
+
+        cmd = cmd.replace(REMOTE_SCRIPT, SCRIPT)
+        cmd = cmd.replace("python3", sys.executable)
+        proc = subprocess.run(
+            cmd, shell=True, input=stdin, capture_output=True, text=True
+        )
+        self.exit_status = proc.returncode
+        return proc.stdout, proc.stderr
+
+
+@pytest.fixture
+def node():
+    FileAgent._installed.clear()
+    yield LocalNode()
+    FileAgent._installed.clear()
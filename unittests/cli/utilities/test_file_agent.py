@@ -0,0 +1,149 @@
+import hashlib
+import importlib.util
+import io
+import json
+import os
+
+import mock
+import pytest
+
+from cli.exceptions import OperationFailedError
+from cli.utilities.file_agent import REMOTE_SCRIPT, SCRIPT, FileAgent
+from cli.utilities.utils import create_files, perform_lookups, rename_file
+
+spec = importlib.util.spec_from_file_location("file_ops_agent", SCRIPT)
+agent = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(agent)
+
+
+class TestFileOpsAgent:
+    @pytest.fixture(autouse=True)
+    def setUp(self, tmp_path):
+        self.dir = str(tmp_path)
+
+    def run(self, ops):
+        output = io.StringIO()
+        agent.run(ops, output, workers=4)
+        results = dict()
+        for line in output.getvalue().splitlines():
+            index, error, value = json.loads(line)
+            results[index] = (error, value)
+        return [results[i] for i in range(len(ops))]
+
+    def test_operations(self):
+        path = os.path.join(self.dir, "a", "file1")
+        results = self.run(
+            [
+                {"op": "create", "path": path, "data": "data\n", "parents": True},
+                {"op": "create", "path": os.path.join(self.dir, "file2"), "size": 8},
+            ]
+        )
+        assert results == [(None, None), (None, None)]
+
+        results = self.run(
+            [
+                {"op": "chmod", "path": path, "mode": "640"},
+                {"op": "chmod", "path": os.path.join(self.dir, "file2"), "mode": "u+x"},
+                {"op": "checksum", "path": path},
+                {"op": "walk", "path": self.dir},
+                {"op": "listdir", "path": self.dir},
+            ]
+        )
+        assert [error for error, _ in results] == [None] * 5
+        assert results[2][1] == hashlib.md5(b"data\n").hexdigest()
+        assert results[3][1] == 3
+        assert results[4][1] == ["a", "file2"]
+
+        stats = self.run([{"op": "stat", "path": path}])[0][1]
+        assert stats["mode"] == "0o640"
+        assert stats["size"] == 5
+        assert os.stat(os.path.join(self.dir, "file2")).st_mode & 0o100
+
+    def test_rename_and_remove(self):
+        path = os.path.join(self.dir, "file1")
+        self.run([{"op": "create", "path": path, "size": 1}])
+
+        results = self.run(
+            [
+                {"op": "rename", "path": path, "dst": path + ".new"},
+                {"op": "remove", "path": os.path.join(self.dir, "missing")},
+            ]
+        )
+        assert results == [(None, None), (None, None)]
+
+        self.run([{"op": "remove", "path": self.dir}])
+        assert not os.path.exists(self.dir)
+
+    def test_errors(self):
+        results = self.run(
+            [
+                {"op": "checksum", "path": os.path.join(self.dir, "missing")},
+                {"op": "unknown", "path": self.dir},
+                {"op": "walk", "path": os.path.join(self.dir, "missing")},
+            ]
+        )
+
+        assert results[0][0].startswith("FileNotFoundError")
+        assert results[1][0].startswith("KeyError")
+        assert results[2][0].startswith("FileNotFoundError")
+
+
+class TestFileAgent:
+    @pytest.fixture(autouse=True)
+    def setUp(self, tmp_path, node):
+        self.dir = str(tmp_path)
+        self.node = node
+
+    def test_run(self):
+        ops = [
+            {"op": "create", "path": os.path.join(self.dir, f"file{i}"), "size": 1}
+            for i in range(1, 21)
+        ]
+
+        results = FileAgent(self.node, workers=4).run(ops)
+
+        assert results == [(None, None)] * 20
+        assert len(os.listdir(self.dir)) == 20
+        assert len(self.node.commands) == 1
+
+        # The agent is uploaded once per node
+        FileAgent(self.node).run(ops[:1])
+        assert self.node.uploads == [REMOTE_SCRIPT]
+
+    def test_run_reinstalls_missing_agent(self):
+        # Uploaded earlier in the run, but removed since from the node
+        FileAgent._installed.add(self.node.hostname)
+
+        results = FileAgent(self.node).run([{"op": "listdir", "path": self.dir}])
+
+        assert results == [(None, [])]
+        assert self.node.uploads == [REMOTE_SCRIPT]
+        assert len(self.node.commands) == 2
+
+    def test_run_failure(self):
+        self.node.uploads.append(REMOTE_SCRIPT)
+        self.node.exec_command = mock.Mock(return_value=("", "Traceback"))
+        self.node.exit_status = 1
+
+        with pytest.raises(OperationFailedError, match="Traceback"):
+            FileAgent(self.node).run([{"op": "listdir", "path": self.dir}])
+
+    def test_helpers(self):
+        create_files(self.node, self.dir, 5)
+        rename_file(self.node, self.dir, 5)
+        assert sorted(os.listdir(self.dir)) == [f"new_file{i}" for i in range(1, 6)]
+
+        perform_lookups(self.node, self.dir, 3)
+        perform_lookups(self.node, os.path.join(self.dir, "missing"), 1)
+
+        with pytest.raises(OperationFailedError, match="failed to rename file file1"):
+            rename_file(self.node, self.dir, 5)
+
+    def test_helpers_batch_failure(self):
+        self.node.uploads.append(REMOTE_SCRIPT)
+        self.node.exec_command = mock.Mock(return_value=("", "Traceback"))
+        self.node.exit_status = 1
+
+        with pytest.raises(OperationFailedError, match="batch of 5") as err:
+            create_files(self.node, self.dir, 5)
+        assert isinstance(err.value.__cause__, OperationFailedError)
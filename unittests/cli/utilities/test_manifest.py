@@ -0,0 +1,66 @@
+import hashlib
+import os
+
+import pytest
+
+from cli.exceptions import OperationFailedError
+from cli.utilities.manifest import Entry, diff_manifests, get_manifest, manifests_match
+
+
+def entry(path, digest="d", size=1):
+    return Entry(path, size, 0, digest)
+
+
+class TestManifest:
+    @pytest.fixture(autouse=True)
+    def setUp(self, tmp_path, node):
+        self.dir = tmp_path
+        self.node = node
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "b").write_text("b\n")
+        (tmp_path / "sub" / "a").write_text("a\n")
+        os.symlink(tmp_path / "b", tmp_path / "link")
+
+    def test_get_manifest(self):
+        manifest = get_manifest(self.node, str(self.dir))
+
+        # Regular files only, sorted by their relative path
+        assert [(e.path, e.size) for e in manifest] == [("b", 2), ("sub/a", 2)]
+        assert manifest[0].digest == hashlib.md5(b"b\n").hexdigest()
+        assert manifest[0].mtime == os.stat(self.dir / "b").st_mtime_ns
+
+        top = get_manifest(self.node, str(self.dir), "blake2b", recursive=False)
+        assert top == [
+            Entry("b", 2, manifest[0].mtime, hashlib.blake2b(b"b\n").hexdigest())
+        ]
+
+    def test_get_manifest_incremental(self):
+        previous = get_manifest(self.node, str(self.dir))
+        # Unchanged files are not read again, so keep their earlier digest
+        previous[1] = previous[1]._replace(digest="cached")
+        (self.dir / "b").write_text("bb\n")
+
+        manifest = get_manifest(self.node, str(self.dir), previous=previous)
+
+        assert manifest[0].digest == hashlib.md5(b"bb\n").hexdigest()
+        assert manifest[1].digest == "cached"
+
+    def test_get_manifest_failure(self):
+        with pytest.raises(OperationFailedError, match="FileNotFoundError"):
+            get_manifest(self.node, str(self.dir / "missing"))
+
+        with pytest.raises(OperationFailedError, match="unsupported hash type"):
+            get_manifest(self.node, str(self.dir), "unknown")
+
+    def test_diff_manifests(self):
+        first = [entry("a"), entry("b"), entry("c"), entry("e", size=2)]
+        second = [entry("b", "x"), entry("c"), entry("d"), entry("e", size=3)]
+
+        assert diff_manifests(first, second) == {
+            "missing": ["a"],
+            "added": ["d"],
+            "changed": ["b", "e"],
+        }
+        assert diff_manifests([], second)["added"] == ["b", "c", "d", "e"]
+        assert manifests_match(first, list(first))
+        assert not manifests_match(first, second)
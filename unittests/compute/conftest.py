@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+
+
+class FakeResource:
+    """Node or volume whose state advances on every listing."""
+
+    def __init__(self, id_, states, **extra):
+        self.id = id_
+        self.name = id_
+        self.states = list(states)
+        self.state = self.states[0]
+        self.public_ips = []
+        self.private_ips = []
+        self.extra = extra
+
+    def advance(self):
+        if len(self.states) > 1:
+            self.states.pop(0)
+        self.state = self.states[0]
+
+
+class FakeDriver:
+    """libcloud driver simulating the state transitions of its resources.
+
+    Example:
+        driver.add("node", "vm-1", ["pending", "pending", "running"])
+    lists vm-1 as pending twice and as running from the third listing on. A
+    resource whose state becomes None is no longer listed.
+    """
+
+    def __init__(self):
+        self.resources = {"node": {}, "volume": {}}
+        self.calls = {"node": 0, "volume": 0}
+        self.operations = []
+        self.failures = set()
+        self._lock = threading.Lock()
+
+    def add(self, kind, id_, states, **extra):
+        self.resources[kind][id_] = FakeResource(id_, states, **extra)
+        return self.resources[kind][id_]
+
+    def remove(self, kind, id_):
+        self.resources[kind].pop(id_)
+
+    def _list(self, kind):
+        with self._lock:
+            self.calls[kind] += 1
+            for id_, resource in list(self.resources[kind].items()):
+                resource.advance()
+                if resource.state is None:
+                    del self.resources[kind][id_]
+
+            return list(self.resources[kind].values())
+
+    def _operate(self, operation, kind, resource, states):
+        self.operations.append((operation, resource.id))
+        if resource.id in self.failures:
+            raise Exception(f"{operation} of {resource.id} failed")
+
+        self.resources[kind][resource.id].states = states
+        return True
+
+    def list_nodes(self):
+        return self._list("node")
+
+    def list_volumes(self):
+        return self._list("volume")
+
+    def create_volume(self, size, name):
+        self.operations.append(("create", name))
+        if name in self.failures:
+            return None
+
+        return self.add("volume", name, ["creating", "available"], attachments=[])
+
+    def attach_volume(self, node, volume):
+        self.operations.append(("attach", volume.id))
+        if volume.id in self.failures:
+            return False
+
+        volume.extra["attachments"] = [{"id": volume.id, "server_id": node.id}]
+        self.resources["volume"][volume.id].states = ["inuse"]
+        return True
+
+    def ex_get_volume(self, id_):
+        return self.resources["volume"][id_]
+
+    def detach_volume(self, volume):
+        volume.extra["attachments"] = []
+        return self._operate("detach", "volume", volume, ["detaching", "available"])
+
+    def destroy_volume(self, volume):
+        return self._operate("destroy", "volume", volume, ["deleting", None])
+
+    def ex_get_node_details(self, node_id):
+        return self.resources["node"].get(node_id)
+
+    def ex_detach_floating_ip_from_node(self, node, ip):
+        self.operations.append(("release", ip))
+        return True
+
+    def destroy_node(self, node):
+        return self._operate("destroy", "node", node, ["deleting", None])
+
+
+@pytest.fixture
+def fake_driver():
+    return FakeDriver()
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import mock
+import pytest
+
+from compute.catalog import CloudCatalog
+
+SCOPE = ("https://cloud:13000", "redhat", "ceph-ci", "regionOne")
+
+
+class TestCloudCatalog:
+    @pytest.fixture(autouse=True)
+    def setUp(self):
+        self.catalog = CloudCatalog(ttl=60)
+        self.fetch = mock.Mock(return_value="image-id")
+
+    def test_get(self):
+        assert self.catalog.get(SCOPE, "image", "rhel-9", self.fetch) == "image-id"
+        assert self.catalog.get(SCOPE, "image", "rhel-9", self.fetch) == "image-id"
+        self.catalog.get(("other",), "image", "rhel-9", self.fetch)
+
+        assert self.fetch.call_count == 2
+        assert (self.catalog.hits, self.catalog.misses) == (1, 2)
+
+    @mock.patch("compute.catalog.monotonic")
+    def test_get_expired(self, monotonic_mock):
+        monotonic_mock.return_value = 100
+        self.catalog.get(SCOPE, "image", "rhel-9", self.fetch)
+        monotonic_mock.return_value = 161
+        self.catalog.get(SCOPE, "image", "rhel-9", self.fetch)
+
+        assert self.fetch.call_count == 2
+
+    def test_get_single_fetch(self):
+        def fetch():
+            time.sleep(0.05)
+            return "flavor"
+
+        fetch_mock = mock.Mock(side_effect=fetch)
+        threads = [
+            threading.Thread(
+                target=self.catalog.get, args=(SCOPE, "flavors", None, fetch_mock)
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert fetch_mock.call_count == 1
+
+    def test_invalidate(self):
+        self.catalog.get(SCOPE, "image", "rhel-9", self.fetch)
+        self.catalog.get(SCOPE, "network", "net-1", self.fetch)
+        self.catalog.invalidate(scope=SCOPE, kind="image")
+        self.catalog.get(SCOPE, "image", "rhel-9", self.fetch)
+        self.catalog.get(SCOPE, "network", "net-1", self.fetch)
+
+        assert self.fetch.call_count == 3
+
+    def test_reserve_ip(self):
+        subnets = [
+            {"cidr": "10.0.0.0/24", "total_ips": 10, "used_ips": 5},
+            {"cidr": "10.0.1.0/24", "total_ips": 10, "used_ips": 0},
+        ]
+        fetch = mock.Mock(return_value=subnets)
+        cidrs = [self.catalog.reserve_ip(SCOPE, "net-1", fetch) for _ in range(10)]
+
+        assert cidrs == ["10.0.0.0/24"] * 2 + ["10.0.1.0/24"] * 7 + [None]
+        assert fetch.call_count == 1
+
+    def test_reserve_ip_allocated(self):
+        subnets = [{"cidr": "10.0.0.0/24", "total_ips": 10, "used_ips": 5}]
+        self.catalog.reserve_ip(SCOPE, "net-1", mock.Mock(return_value=subnets))
+        self.catalog.reserve_ip(SCOPE, "net-1", mock.Mock(return_value=subnets))
+        self.catalog.invalidate(kind="ip-availability")
+
+        # One of the reserved addresses got allocated to its node.
+        subnets = [{"cidr": "10.0.0.0/24", "total_ips": 10, "used_ips": 6}]
+        cidr = self.catalog.reserve_ip(SCOPE, "net-1", mock.Mock(return_value=subnets))
+
+        assert cidr is None
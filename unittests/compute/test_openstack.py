@@ -0,0 +1,42 @@
+import mock
+import pytest
+
+from compute.exceptions import VolumeOpFailure
+from compute.openstack import CephVMNodeV2
+
+
+class TestCreateAttachVolumes:
+    @pytest.fixture(autouse=True)
+    def setUp(self, fake_driver):
+        self.driver = fake_driver
+        self.vm = CephVMNodeV2.__new__(CephVMNodeV2)
+        self.vm.driver = fake_driver
+        self.vm.volume_metrics = []
+        self.vm.node = fake_driver.add("node", "vm-1", ["running"])
+        fake_driver.add("volume", "other-vol", ["available"])
+        with mock.patch("compute.waiter.sleep"):
+            yield
+
+    def test_create_attach_volumes(self):
+        self.vm._create_attach_volumes(no_of_volumes=4, size_of_disk=20)
+
+        attached = [
+            v
+            for v in self.driver.resources["volume"].values()
+            if v.extra.get("attachments") == [{"id": v.id, "server_id": "vm-1"}]
+        ]
+        assert len(attached) == 4
+        assert sorted(m["name"] for m in self.vm.volume_metrics) == [
+            f"vm-1-vol-{i}" for i in range(4)
+        ]
+        assert all(m["total"] >= m["attach"] for m in self.vm.volume_metrics)
+
+    def test_create_attach_volumes_failure(self):
+        self.driver.failures.add("vm-1-vol-1")
+
+        with pytest.raises(VolumeOpFailure):
+            self.vm._create_attach_volumes(no_of_volumes=3, size_of_disk=20)
+
+        # Only the volumes created for the node are removed.
+        assert list(self.driver.resources["volume"]) == ["other-vol"]
+        assert ("detach", "vm-1-vol-0") in self.driver.operations
@@ -0,0 +1,137 @@
+import mock
+import pytest
+
+from compute.exceptions import NodeDeleteFailure
+from compute.teardown import Teardown, delete_node, openstack_teardown
+from utility.rate_limit import TokenBucket
+
+
+class TestTeardown:
+    @pytest.fixture(autouse=True)
+    def setUp(self):
+        self.teardown = Teardown(max_workers=2)
+        self.removed = []
+
+    def remove(self, name):
+        self.removed.append(name)
+
+    def fail(self, name):
+        raise Exception(f"{name} is locked")
+
+    def test_run(self):
+        self.teardown.add("volume-1", self.remove, "volume-1", after=["detach-1"])
+        self.teardown.add("detach-1", self.remove, "detach-1")
+        self.teardown.add("node-1", self.remove, "node-1", after=["detach-1"])
+        self.teardown.add("node-2", self.remove, "node-2", after=["unknown"])
+        summary = self.teardown.run()
+
+        assert summary.ok
+        assert self.removed[0] == "detach-1"
+        assert set(self.removed) == {"detach-1", "volume-1", "node-1", "node-2"}
+
+    def test_run_failure(self):
+        self.teardown.add("detach-1", self.fail, "detach-1")
+        self.teardown.add("node-1", self.remove, "node-1", after=["detach-1"])
+        self.teardown.add("volume-1", self.remove, "volume-1", after=["node-1"])
+        self.teardown.add("node-2", self.remove, "node-2")
+        summary = self.teardown.run()
+
+        assert not summary.ok
+        assert summary.removed == ["node-2"]
+        assert summary.failed == {"detach-1": "detach-1 is locked"}
+        assert summary.skipped == {
+            "node-1": "detach-1 was not removed",
+            "volume-1": "node-1 was not removed",
+        }
+
+    def test_run_follows_failure(self):
+        self.teardown.add("detach-1", self.fail, "detach-1")
+        self.teardown.add("node-1", self.remove, "node-1", follows=["detach-1"])
+        summary = self.teardown.run()
+
+        assert self.removed == ["node-1"]
+        assert summary.failed == {"detach-1": "detach-1 is locked"}
+        assert not summary.skipped
+
+    def test_run_circular(self):
+        self.teardown.add("node-1", self.remove, "node-1", after=["volume-1"])
+        self.teardown.add("volume-1", self.remove, "volume-1", after=["node-1"])
+        summary = self.teardown.run()
+
+        assert not self.removed
+        assert set(summary.skipped) == {"node-1", "volume-1"}
+
+    def test_add_duplicate(self):
+        self.teardown.add("node-1", self.remove, "node-1")
+
+        with pytest.raises(ValueError):
+            self.teardown.add("node-1", self.remove, "node-1")
+
+    def test_rate_limit(self):
+        rate_limit = mock.Mock(spec=TokenBucket)
+        teardown = Teardown(rate_limit=rate_limit)
+        for name in ["node-1", "node-2"]:
+            teardown.add(name, self.remove, name)
+        teardown.run()
+
+        assert rate_limit.acquire.call_count == 2
+
+
+class TestOpenStackTeardown:
+    @pytest.fixture(autouse=True)
+    def setUp(self, fake_driver):
+        self.driver = fake_driver
+        self.nodes = [
+            fake_driver.add("node", f"vm-{i}", ["running"]) for i in range(1, 3)
+        ]
+        self.volumes = [
+            fake_driver.add(
+                "volume",
+                "vol-1",
+                ["inuse"],
+                attachments=[{"id": "att-1", "server_id": "vm-1"}],
+            ),
+            fake_driver.add("volume", "vol-2", ["available"]),
+        ]
+        with mock.patch("compute.waiter.sleep"):
+            yield
+
+    def test_openstack_teardown(self):
+        summary = openstack_teardown(self.driver, self.nodes, self.volumes).run()
+
+        assert summary.ok
+        assert len(summary.removed) == 5
+        ops = self.driver.operations
+        assert ops.index(("detach", "vol-1")) < ops.index(("destroy", "vm-1"))
+        assert ops.index(("detach", "vol-1")) < ops.index(("destroy", "vol-1"))
+        assert ("detach", "vol-2") not in ops
+        assert not self.driver.resources["node"]
+        assert not self.driver.resources["volume"]
+
+    def test_openstack_teardown_failure(self):
+        self.driver.failures.add("vol-1")
+        summary = openstack_teardown(self.driver, self.nodes, self.volumes).run()
+
+        assert list(summary.failed) == ["detach/vol-1/vol-1"]
+        assert set(summary.skipped) == {"volume/vol-1/vol-1"}
+        ops = self.driver.operations
+        assert ops.index(("detach", "vol-1")) < ops.index(("destroy", "vm-1"))
+        assert not self.driver.resources["node"]
+
+    def test_delete_node(self):
+        self.nodes[0].public_ips = ["10.0.0.1"]
+        summary = openstack_teardown(
+            self.driver, self.nodes, self.volumes, node_action=delete_node
+        ).run()
+
+        assert summary.ok
+        ops = self.driver.operations
+        assert ops.index(("release", "10.0.0.1")) < ops.index(("destroy", "vm-1"))
+        assert not self.driver.resources["node"]
+
+    def test_delete_node_pending(self):
+        node = self.driver.add("node", "vm-3", ["pending"])
+
+        with pytest.raises(NodeDeleteFailure):
+            delete_node(self.driver, node)
+        assert ("destroy", "vm-3") not in self.driver.operations
@@ -0,0 +1,89 @@
+import threading
+
+import mock
+import pytest
+
+from compute.exceptions import NodeError, WaitTimeout
+from compute.openstack import CephVMNodeV2
+from compute.waiter import ResourceWatcher
+
+
+def running(node):
+    return node is not None and node.state == "running"
+
+
+class TestResourceWatcher:
+    @pytest.fixture(autouse=True)
+    def setUp(self, fake_driver):
+        self.driver = fake_driver
+        self.watcher = ResourceWatcher(fake_driver, min_interval=0.01)
+
+    def test_wait(self):
+        nodes = [f"vm-{i}" for i in range(5)]
+        for id_ in nodes:
+            self.driver.add("node", id_, ["pending"] * 3 + ["running"])
+
+        results = dict()
+
+        def wait(id_):
+            results[id_] = self.watcher.wait("node", id_, running, timeout=10)
+
+        threads = [threading.Thread(target=wait, args=(id_,)) for id_ in nodes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert all(results[id_].state == "running" for id_ in nodes)
+        # One listing per interval covers all the waiting nodes.
+        assert self.driver.calls["node"] < 2 * len(nodes)
+        assert self.driver.calls["volume"] == 0
+
+    def test_wait_missing(self):
+        self.driver.add("volume", "vol-1", ["deleting"] * 2)
+        threading.Timer(0.05, self.driver.remove, ("volume", "vol-1")).start()
+
+        assert self.watcher.wait("volume", "vol-1", lambda v: v is None) is None
+
+    def test_wait_timeout(self):
+        self.driver.add("node", "vm-1", ["pending"])
+
+        with pytest.raises(WaitTimeout, match="pending"):
+            self.watcher.wait("node", "vm-1", running, timeout=0.1)
+
+    @mock.patch("compute.waiter.sleep")
+    def test_backoff(self, sleep_mock):
+        self.driver.add("node", "vm-1", ["pending"] * 4 + ["building", "running"])
+        self.watcher.wait("node", "vm-1", running, timeout=10)
+
+        intervals = [round(c[0][0], 4) for c in sleep_mock.call_args_list]
+        assert intervals == [0.01, 0.015, 0.0225, 0.0338, 0.01, 0.01]
+
+
+class TestCephVMNodeV2Waiters:
+    @pytest.fixture(autouse=True)
+    def setUp(self, fake_driver):
+        self.driver = fake_driver
+        self.vm = CephVMNodeV2.__new__(CephVMNodeV2)
+        self.vm.driver = fake_driver
+        self.vm.node = fake_driver.add("node", "vm-1", ["pending", "running"])
+        with mock.patch("compute.waiter.sleep"):
+            yield
+
+    def test_vm_state_running(self):
+        self.vm._wait_until_vm_state_running()
+
+    def test_vm_state_error(self):
+        self.driver.add(
+            "node", "vm-1", ["pending", "error"], fault={"message": "No valid host"}
+        )
+
+        with pytest.raises(NodeError, match="No valid host"):
+            self.vm._wait_until_vm_state_running()
+
+    def test_volume_available(self):
+        volume = self.driver.add("volume", "vol-1", ["creating", "available"])
+        failed = self.driver.add("volume", "vol-2", ["creating", "error"])
+
+        assert self.vm._wait_until_volume_available(volume)
+        assert not self.vm._wait_until_volume_available(failed)
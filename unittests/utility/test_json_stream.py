@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from utility.json_stream import JSONArrayStream, JSONStreamError
+
+PG_DUMP = {
+    "pg_ready": True,
+    "pg_map": {
+        "version": 12,
+        "stamp": 'stamp "[{',
+        "pg_stats_sum": {"stat_sum": [1, 2, {"acting": "]"}]},
+        "pg_stats": [
+            {"pgid": f"1.{idx}", "state": "active+clean", "acting": [0, 1, 2]}
+            for idx in range(20)
+        ],
+        "pool_stats": [{"poolid": 1}],
+    },
+}
+
+
+def feed(stream, data, size):
+    for idx in range(0, len(data), size):
+        stream.feed(data[idx : idx + size])
+
+    return stream.close()
+
+
+class TestJSONArrayStream:
+    @pytest.mark.parametrize("size", [1, 7, 1024])
+    @pytest.mark.parametrize("indent", [None, 2])
+    def test_projection(self, size, indent):
+        data = json.dumps(PG_DUMP, indent=indent).encode()
+        stream = JSONArrayStream(path=["pg_map", "pg_stats"], fields=["pgid", "state"])
+
+        assert feed(stream, data, size) == [
+            {"pgid": pg["pgid"], "state": pg["state"]}
+            for pg in PG_DUMP["pg_map"]["pg_stats"]
+        ]
+
+    def test_filter(self):
+        stream = JSONArrayStream(
+            path=["pg_map", "pg_stats"], where=lambda pg: pg["pgid"] == "1.3"
+        )
+
+        assert feed(stream, json.dumps(PG_DUMP), 10) == [
+            PG_DUMP["pg_map"]["pg_stats"][3]
+        ]
+
+    def test_top_level_scalars(self):
+        stream = JSONArrayStream()
+
+        assert feed(stream, b'[1, 23, "a", 4.5, true, null]', 1) == [
+            1,
+            23,
+            "a",
+            4.5,
+            True,
+            None,
+        ]
+
+    def test_missing_array(self):
+        stream = JSONArrayStream(path=["pool_stats"])
+
+        with pytest.raises(JSONStreamError):
+            feed(stream, json.dumps(PG_DUMP), 1024)
+
+    def test_incomplete_array(self):
+        stream = JSONArrayStream(path=["pg_map", "pg_stats"])
+
+        with pytest.raises(JSONStreamError):
+            feed(stream, json.dumps(PG_DUMP)[:300], 1024)
@@ -0,0 +1,72 @@
+import inspect
+import logging
+
+import gevent
+import mock
+import pytest
+
+from utility.log import Log, LogContextFilter, set_test_context
+
+
+class TestLog:
+    @pytest.fixture(autouse=True)
+    def setUp(self):
+        self._log = Log("test_log")
+        self._level = self._log.logger.level
+        yield
+        self._log.logger.setLevel(self._level)
+
+    def test_log_caller_location(self):
+        self._log.logger.setLevel(logging.DEBUG)
+        with mock.patch.object(self._log.logger, "debug") as debug_mock:
+            line = inspect.currentframe().f_lineno + 1
+            self._log.debug("message")
+
+        extra = debug_mock.call_args.kwargs["extra"]
+        assert extra["FILENAME"].endswith("test_log.py")
+        assert extra["LINENUM"] == line
+        assert debug_mock.call_args.args[0].endswith(f":{line} - message")
+
+    def test_log_level_disabled(self):
+        self._log.logger.setLevel(logging.INFO)
+        with mock.patch.object(self._log.logger, "debug") as debug_mock:
+            with mock.patch.object(Log, "_run_metadata") as metadata_mock:
+                self._log.debug("message")
+
+        assert debug_mock.call_count == 0
+        assert metadata_mock.call_count == 0
+
+    def test_log_metadata_cached(self):
+        self._log.logger.setLevel(logging.INFO)
+        with mock.patch.object(
+            Log, "metadata", new_callable=mock.PropertyMock
+        ) as metadata_mock:
+            metadata_mock.return_value = {"testing_tool": "cephci"}
+            Log._metadata_cache = (None, None)
+            self._log.info("first")
+            self._log.info("second")
+
+        assert metadata_mock.call_count == 1
+
+
+def test_log_test_context_filter():
+    records = []
+    record = mock.Mock()
+    _filter = LogContextFilter("test_1")
+
+    def _child(name):
+        records.append((name, _filter.filter(record)))
+
+    def _test(name):
+        set_test_context(name)
+        records.append((name, _filter.filter(record)))
+        gevent.spawn(_child, f"{name}_child").join()
+
+    gevent.joinall([gevent.spawn(_test, "test_1"), gevent.spawn(_test, "test_2")])
+
+    assert sorted(records) == [
+        ("test_1", True),
+        ("test_1_child", True),
+        ("test_2", False),
+        ("test_2_child", False),
+    ]
@@ -0,0 +1,77 @@
+import json
+import os
+
+import mock
+import pytest
+
+from utility.log_collector import MANIFEST, LogCollector
+
+SOS_OUTPUT = "Your sosreport has been generated and saved in:\n\t/var/tmp/{}\n"
+
+
+class FakeNode:
+    """Node streaming fixed archive contents for the collection commands."""
+
+    def __init__(self, hostname, fail=None):
+        self.hostname = hostname
+        self.fail = fail
+        self.exit_status = 0
+        self.commands = []
+
+    def exec_command(self, cmd, stream=None, **kw):
+        self.commands.append(cmd)
+        self.exit_status = 2 if self.fail and self.fail in cmd else 0
+        if cmd.startswith("sos report"):
+            return SOS_OUTPUT.format(f"sosreport-{self.hostname}-1.tar.xz"), ""
+
+        if stream:
+            stream(b"archive-" + self.hostname.encode())
+
+        return "", "error" if self.exit_status else ""
+
+
+class TestLogCollector:
+    @pytest.fixture(autouse=True)
+    def setUp(self, tmp_path):
+        self.directory = str(tmp_path)
+        self.nodes = [FakeNode("node1"), FakeNode("node2", fail="tar -czf")]
+        self.cluster = mock.Mock()
+        self.cluster.get_nodes.return_value = self.nodes
+        with mock.patch("utility.log_collector.setup_cluster_access"):
+            yield
+
+    def test_collect(self):
+        failed = LogCollector(self.directory).collect(self.cluster)
+
+        with open(os.path.join(self.directory, MANIFEST)) as fp:
+            manifest = json.load(fp)
+
+        assert list(failed) == ["node2/ceph_logs"]
+        assert manifest["node1/sosreport"]["path"] == os.path.join(
+            "sosreports", "sosreport-node1-1.tar.xz"
+        )
+        assert manifest["node1/ceph_logs"]["size"] == len(b"archive-node1")
+        assert manifest["node2/ceph_logs"]["status"] == "failed"
+        # The partial archive of the failed collection is removed.
+        assert not os.path.exists(
+            os.path.join(self.directory, "ceph_logs", "node2-cephlog.tar")
+        )
+        with open(
+            os.path.join(self.directory, "ceph_logs", "node1-cephlog.tar"), "rb"
+        ) as fp:
+            assert fp.read() == b"archive-node1"
+
+    def test_collect_skips_collected(self):
+        LogCollector(self.directory).collect(self.cluster)
+        for node in self.nodes:
+            node.commands = []
+        self.nodes[1].fail = None
+        LogCollector(self.directory).collect(self.cluster)
+
+        assert self.nodes[0].commands == []
+        assert self.nodes[1].commands == ["tar -czf - /var/log/ceph"]
+
+    def test_collect_ceph_logs_only(self):
+        LogCollector(self.directory).collect(self.cluster, sosreport=False)
+
+        assert not os.path.exists(os.path.join(self.directory, "sosreports"))
@@ -0,0 +1,37 @@
+import mock
+import pytest
+
+from utility.rate_limit import TokenBucket
+
+
+class TestTokenBucket:
+    @pytest.fixture(autouse=True)
+    def setUp(self):
+        self.now = [100.0]
+
+        def sleep(seconds):
+            self.now[0] += seconds
+
+        with mock.patch(
+            "utility.rate_limit.monotonic", side_effect=lambda: self.now[0]
+        ), mock.patch("utility.rate_limit.sleep", side_effect=sleep):
+            yield
+
+    def test_burst(self):
+        bucket = TokenBucket(rate=1, burst=3)
+        waits = [bucket.acquire() for _ in range(5)]
+
+        assert waits == [0, 0, 0, 1, 1]
+        assert bucket.waited == 2
+
+    def test_refill(self):
+        bucket = TokenBucket(rate=0.5, burst=2)
+        bucket.acquire()
+        bucket.acquire()
+        self.now[0] += 10
+
+        assert [bucket.acquire() for _ in range(3)] == [0, 0, 2]
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
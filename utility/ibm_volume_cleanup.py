@@ -1,15 +1,24 @@
 """
     Utility to cleanup orphan volumes from IBM environment
 """
+from gevent import monkey
 
+monkey.patch_all()
 import sys
-from time import sleep
 from typing import Dict
 
 import yaml
 from docopt import docopt
+from ibm_cloud_sdk_core.api_exception import ApiException
 
+from cli.utilities.waiter import WaitUntil
+from compute.exceptions import VolumeOpFailure
 from compute.ibm_vpc import get_ibm_service
+from compute.teardown import Teardown
+from utility.rate_limit import TokenBucket
+
+# Removals started per second, Cloudflare blacklists faster ones.
+REMOVAL_RATE = 1
 
 doc = """
 Utility to cleanup orphan volumes from IBM cloud.
@@ -29,6 +38,30 @@ Utility to cleanup orphan volumes from IBM cloud.
 """
 
 
+def delete_volume(ibmc_client, volume: Dict, timeout: int = 300) -> None:
+    """
+    Deletes the volume and waits till it is removed.
+
+    Arguments:
+        ibmc_client: IBM VPC service
+        volume: Dict - the volume as listed by the service
+        timeout: int - seconds to wait for the volume to be removed
+
+    Raises:
+        VolumeOpFailure when the volume is not removed within the timeout
+    """
+    ibmc_client.delete_volume(id=volume["id"])
+    for _ in WaitUntil(timeout=timeout, interval=5):
+        try:
+            ibmc_client.get_volume(id=volume["id"])
+        except ApiException as ae:
+            if ae.code == 404:
+                return
+            raise
+
+    raise VolumeOpFailure(f"{volume['name']} is not removed in {timeout}s")
+
+
 def run(args: Dict):
     """
     Using the provided credential file, this method removes the orphan volume entries from ibm cloud.
@@ -59,16 +92,21 @@ def run(args: Dict):
         if not orphan_volumes:
             print("\nThere are no orphan volumes in the IBM environment\n")
             return 0
-        sleep_time = 1
+        teardown = Teardown(rate_limit=TokenBucket(rate=REMOVAL_RATE))
         for volume in orphan_volumes:
-            print(f"\nDeleting orphan volume {volume['name']}\n")
-            resp = ibmc_client.delete_volume(id=volume["id"])
-            if resp.get_status_code() != 200:
-                print("\nFailed to delete volume\n")
-                return 1
-            sleep(sleep_time)
-            sleep_time += 1
-        print("\nSuccessfully removed the orphan volumes from IBM environment\n")
+            teardown.add(
+                f"volume/{volume['name']}/{volume['id']}",
+                delete_volume,
+                ibmc_client,
+                volume,
+            )
+
+        summary = teardown.run()
+        print(f"\nRemoved {len(summary.removed)} orphan volumes from IBM environment\n")
+        if not summary.ok:
+            for name, reason in summary.failed.items():
+                print(f"\nFailed to delete {name}: {reason}\n")
+            return 1
     return 0
 
 
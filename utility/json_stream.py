@@ -0,0 +1,153 @@
+"""Incremental parsing of large JSON documents.
+
+The output of commands like "ceph pg dump" runs into tens of megabytes on large
+clusters while the callers are interested in the elements of a single array.
+JSONArrayStream is fed with the data as it arrives and keeps only the elements
+of that array, optionally filtered and reduced to the required fields::
+
+    stream = JSONArrayStream(
+        path=["pg_map", "pg_stats"], fields=["pgid", "state", "last_scrub_stamp"]
+    )
+    node.exec_command(cmd="ceph pg dump_json pgs", stream=stream.feed)
+    pg_stats = stream.close()
+"""
+
+import codecs
+import json
+import re
+
+# Structural characters, strings and scalars preceded by optional whitespace.
+TOKEN = re.compile(r'\s*(?:("(?:[^"\\]|\\.)*")|([\[\]{}:,])|([^\s\[\]{}:,"]+))')
+SPACE = re.compile(r"[\s,]*")
+SCALAR_END = " \t\r\n,]"
+
+
+class JSONStreamError(Exception):
+    pass
+
+
+class JSONArrayStream(object):
+    """Collects the elements of the array found at the given path of a JSON document."""
+
+    def __init__(self, path=(), fields=None, where=None):
+        """
+        Initialize the stream.
+
+        Args:
+            path (list): keys leading to the array, empty for a top level array
+            fields (list): keys of the elements to be kept, all when not provided
+            where (callable): keep only the elements for which it returns True
+        """
+        self.path = list(path)
+        self.fields = fields
+        self.where = where
+        self.items = []
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._buffer = ""
+        self._stack = []
+        self._in_array = False
+        self._done = False
+
+    def feed(self, data):
+        """Parse the next chunk of the document."""
+        if self._done:
+            return
+
+        if isinstance(data, bytes):
+            data = self._utf8.decode(data)
+
+        self._buffer += data
+        pos = self._collect(0) if self._in_array else self._locate(0)
+        self._buffer = self._buffer[pos:]
+
+    def close(self):
+        """
+        Parse the remaining data and return the collected elements.
+
+        Raises:
+            JSONStreamError: when the array is not found or is incomplete
+        """
+        self.feed(self._utf8.decode(b"", final=True))
+        if not (self._in_array and self._done):
+            raise JSONStreamError(f"Array at {self.path} not found or incomplete")
+
+        return self.items
+
+    def _locate(self, pos):
+        """Walk the document till the array at the path opens."""
+        buffer = self._buffer
+        while True:
+            match = TOKEN.match(buffer, pos)
+            if not match or match.end() == len(buffer) and not match.group(2):
+                # Incomplete token, wait for more data.
+                return pos
+
+            pos = match.end()
+            string, char = match.group(1), match.group(2)
+            frame = self._stack[-1] if self._stack else None
+
+            if char is None:
+                if string is not None and frame and frame["expect_key"]:
+                    frame["key"] = json.loads(string)
+                    frame["expect_key"] = False
+            elif char in "[{":
+                if char == "[" and self._at_path():
+                    self._in_array = True
+                    return self._collect(pos)
+
+                self._stack.append(
+                    {"type": char, "key": None, "expect_key": char == "{"}
+                )
+            elif char in "]}":
+                self._stack.pop()
+                if not self._stack:
+                    self._done = True
+                    return len(buffer)
+            elif char == "," and frame and frame["type"] == "{":
+                frame["expect_key"] = True
+
+    def _at_path(self):
+        if len(self._stack) != len(self.path):
+            return False
+
+        return all(
+            frame["type"] == "{" and frame["key"] == key
+            for frame, key in zip(self._stack, self.path)
+        )
+
+    def _collect(self, pos):
+        """Decode the elements of the array one at a time."""
+        buffer = self._buffer
+        while True:
+            pos = SPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                return pos
+
+            if buffer[pos] == "]":
+                self._done = True
+                return len(buffer)
+
+            try:
+                item, end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Element is yet to be received completely.
+                return pos
+
+            if not isinstance(item, (dict, list, str)) and (
+                end == len(buffer) or buffer[end] not in SCALAR_END
+            ):
+                # A number or literal could continue in the next chunk.
+                return pos
+
+            pos = end
+            self._add(item)
+
+    def _add(self, item):
+        if self.where and not self.where(item):
+            return
+
+        if self.fields and isinstance(item, dict):
+            item = {key: item.get(key) for key in self.fields}
+
+        self.items.append(item)
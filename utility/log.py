@@ -18,27 +18,76 @@ Along with the above, it provides support for pushing events to
 Initial Log format will be 'datetime - level - message'
 later updating log format with 'datetime - level -filename:line_number - message'
 """
-import inspect
 import logging
 import logging.handlers
 import os
-from copy import deepcopy
+import sys
+from functools import lru_cache
 from typing import Any, Dict
 
+from gevent import getcurrent
+
 from .config import TestMetaData
 
 LOG_FORMAT = "%(asctime)s (%(name)s) [%(levelname)s] - %(message)s"
 magna_server = "http://magna002.ceph.redhat.com"
 magna_url = f"{magna_server}/cephci-jenkins/"
+LOG_LEVELS = {
+    "info": logging.INFO,
+    "debug": logging.DEBUG,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "exception": logging.ERROR,
+}
+TEST_CONTEXT = "cephci_test_name"
 
 
 class LoggerInitializationException:
     pass
 
 
+def set_test_context(test_name: str) -> None:
+    """Associate the current greenlet and the greenlets it spawns with the test.
+
+    Used when tests are executed concurrently, so that the records emitted on
+    behalf of a test are written to its own log file.
+
+    Args:
+        test_name (str):    Unique name of the test being executed.
+    """
+    getcurrent().spawn_tree_locals[TEST_CONTEXT] = test_name
+
+
+def current_test_context() -> str:
+    """Return the name of the test the current greenlet is executing for."""
+    tree_locals = getattr(getcurrent(), "spawn_tree_locals", None) or {}
+    return tree_locals.get(TEST_CONTEXT)
+
+
+class LogContextFilter(logging.Filter):
+    """Allow only the records emitted on behalf of the given test."""
+
+    def __init__(self, test_name: str) -> None:
+        super().__init__()
+        self.test_name = test_name
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return current_test_context() == self.test_name
+
+
+@lru_cache(maxsize=None)
+def _caller_file_name(file_path: str) -> str:
+    """Return the dotted module path used in log records for the given file."""
+    files = file_path.split("/")
+    files = files if len(files) == 1 else files[5:]
+    return ".".join(files)
+
+
 class Log:
     """CephCI Logger object to help streamline logging."""
 
+    _metadata_cache = (None, None)
+
     def __init__(self, name=None) -> None:
         """Initializes the logging mechanism based on the inputs provided."""
         self._logger = logging.getLogger("cephci")
@@ -94,6 +143,26 @@ class Log:
             }
         )
 
+    def _run_metadata(self) -> Dict:
+        """Return the cached metadata of the execution run.
+
+        The metadata is rebuilt only when the run configuration it is derived from
+        changes, the returned dictionary must not be modified by the caller.
+        """
+        config = self.config
+        key = (
+            config.get("run_id"),
+            config.get("rhcs"),
+            config.get("rhbuild", "released"),
+            id(config.get("rp_logger")),
+        )
+        cached_key, metadata = Log._metadata_cache
+        if cached_key != key:
+            metadata = self.metadata
+            Log._metadata_cache = (key, metadata)
+
+        return metadata
+
     def _log(self, level: str, message: Any, *args, **kwargs) -> None:
         """
         Log the given message using the provided level along with the metadata.
@@ -109,6 +178,9 @@ class Log:
         Returns:
             None.
         """
+        if not self._logger.isEnabledFor(LOG_LEVELS[level]):
+            return
+
         log = {
             "info": self._logger.info,
             "debug": self._logger.debug,
@@ -116,13 +188,17 @@ class Log:
             "error": self._logger.error,
             "exception": self._logger.exception,
         }
-        extra = deepcopy(self.metadata)
+        extra = dict(self._run_metadata())
         extra.update(kwargs.get("metadata", {}))
-        calling_frame = inspect.stack()[2].frame
-        trace = inspect.getframeinfo(calling_frame)
-        file_path = trace.filename.split("/")
-        files = file_path if len(file_path) == 1 else file_path[5:]
-        extra.update({"LINENUM": trace.lineno, "FILENAME": ".".join(files)})
+
+        # Frame 0 is this method, 1 is the public log method and 2 its caller.
+        calling_frame = sys._getframe(2)
+        extra.update(
+            {
+                "LINENUM": calling_frame.f_lineno,
+                "FILENAME": _caller_file_name(calling_frame.f_code.co_filename),
+            }
+        )
         log[level](
             f"cephci.{extra['FILENAME']}:{extra['LINENUM']} - {message}",
             *args,
@@ -200,12 +276,16 @@ class Log:
         kwargs["exc_info"] = kwargs.get("exc_info", True)
         self._log("exception", message, *args, **kwargs)
 
-    def configure_logger(self, test_name, run_dir, disable_console_log):
+    def configure_logger(
+        self, test_name, run_dir, disable_console_log, test_context=False
+    ):
         """
         Configures a new FileHandler for the root logger.
         Args:
             test_name: name of the test being executed. used for naming the logfile
             run_dir: directory where logs are being placed
+            test_context: keep the existing handlers and write only the records of
+                          the test's context, used when tests run concurrently
         Returns:
             URL where the log file can be viewed or None if the run_dir does not exist
         """
@@ -214,7 +294,8 @@ class Log:
                 f"Run directory '{run_dir}' does not exist, logs will not output to file."
             )
             return None
-        self.close_and_remove_filehandlers()
+        if not test_context:
+            self.close_and_remove_filehandlers()
         log_format = logging.Formatter(self.log_format)
         full_log_name = f"{test_name}.log"
         test_logfile = os.path.join(run_dir, full_log_name)
@@ -228,12 +309,16 @@ class Log:
             backupCount=20,  # Keep up to 20 old log files which will be 200 MB per test case
         )
         _handler.setFormatter(log_format)
+        if test_context:
+            _handler.addFilter(LogContextFilter(test_name))
         self._logger.addHandler(_handler)
         # error file handler
         err_logfile = os.path.join(run_dir, f"{test_name}.err")
         _err_handler = logging.FileHandler(err_logfile)
         _err_handler.setFormatter(log_format)
         _err_handler.setLevel(logging.ERROR)
+        if test_context:
+            _err_handler.addFilter(LogContextFilter(test_name))
         self._logger.addHandler(_err_handler)
 
         url_base = (
@@ -0,0 +1,173 @@
+"""Collects the sosreports and ceph logs of the cluster nodes after failed runs.
+
+The nodes are processed concurrently and the archives are streamed over the
+existing SSH connections straight into the run directory::
+
+    collector = LogCollector(run_dir)
+    collector.collect(cluster)
+
+Every collected file is recorded in the manifest of the run directory along
+with its size and the time taken. Files already collected in the run are not
+collected again.
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+
+from ceph.ceph import CommandFailed
+from ceph.parallel import parallel
+from utility.log import Log
+from utility.utils import setup_cluster_access
+
+log = Log(__name__)
+
+CEPH_VAR_LOG_DIR = "/var/log/ceph"
+MANIFEST = "collection_manifest.json"
+MAX_WORKERS = 8
+SOSREPORT_TIMEOUT = 3600
+
+
+class LogCollector:
+    """Collects the logs of the cluster nodes into the given directory."""
+
+    def __init__(self, directory, max_workers=MAX_WORKERS):
+        """
+        Initialize the collector.
+
+        Args:
+            directory (str): run directory to which the logs are written
+            max_workers (int): number of nodes processed at a time
+        """
+        self.directory = directory
+        self.max_workers = max_workers
+        self.manifest_path = os.path.join(directory, MANIFEST)
+        self.entries = dict()
+
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as fp:
+                self.entries = json.load(fp)
+
+    def collect(self, *clusters, sosreport=True, ceph_logs=True):
+        """
+        Collect the logs of all the nodes of the clusters.
+
+        Args:
+            clusters (Ceph): clusters whose nodes are processed
+            sosreport (bool): generate and collect the sosreports
+            ceph_logs (bool): collect the archive of /var/log/ceph
+
+        Returns:
+            dict of the manifest entries that failed
+        """
+        try:
+            with parallel(max_workers=self.max_workers) as p:
+                for cluster in clusters:
+                    for node in cluster.get_nodes():
+                        p.spawn(self._collect_node, cluster, node, sosreport, ceph_logs)
+        finally:
+            self.write_manifest()
+
+        failed = {k: v for k, v in self.entries.items() if v["status"] != "collected"}
+        if failed:
+            log.error(f"Failed to collect the logs {sorted(failed)}")
+
+        return failed
+
+    def write_manifest(self):
+        """Write the manifest of the collected files."""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.manifest_path, "w") as fp:
+            json.dump(self.entries, fp, indent=2, sort_keys=True)
+
+    def _collect_node(self, cluster, node, sosreport, ceph_logs):
+        if sosreport and not self._collected(node, "sosreport"):
+            try:
+                # sos needs the ceph CLI on the node to gather the cluster details
+                setup_cluster_access(cluster, node)
+            except BaseException as be:  # noqa
+                log.warning(f"Unable to setup cluster access on {node.hostname}: {be}")
+
+            self._collect(node, "sosreport", self._get_sosreport)
+
+        if ceph_logs:
+            self._collect(node, "ceph_logs", self._get_ceph_logs)
+
+    def _collected(self, node, kind):
+        entry = self.entries.get(f"{node.hostname}/{kind}")
+        return bool(
+            entry
+            and entry["status"] == "collected"
+            and os.path.exists(os.path.join(self.directory, entry["path"]))
+        )
+
+    def _collect(self, node, kind, method):
+        """Collect a file of the node and record it in the manifest."""
+        key = f"{node.hostname}/{kind}"
+        if self._collected(node, kind):
+            log.info(f"Skipping {key}, already collected in this run")
+            return
+
+        start = datetime.now()
+        entry = {"host": node.hostname, "kind": kind, "path": None, "size": 0}
+        try:
+            path = method(node)
+            entry["path"] = os.path.relpath(path, self.directory)
+            entry["size"] = os.path.getsize(path)
+            entry["status"] = "collected"
+            log.info(f"Collected {key} of {entry['size']} bytes")
+        except BaseException as be:  # noqa
+            log.error(f"Failed to collect {key}: {be}")
+            entry.update({"status": "failed", "error": str(be)})
+
+        entry["seconds"] = round((datetime.now() - start).total_seconds(), 2)
+        self.entries[key] = entry
+
+    def _stream(self, node, cmd, path, timeout, ok_codes=(0,)):
+        """Stream the stdout of the command run as root into the file."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            with open(path, "wb") as fp:
+                _, err = node.exec_command(
+                    cmd=cmd, sudo=True, stream=fp.write, timeout=timeout, check_ec=False
+                )
+
+            if node.exit_status not in ok_codes:
+                raise CommandFailed(f"{cmd} returned {err} and code {node.exit_status}")
+        except BaseException:
+            # Do not leave a partial archive behind
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+
+        return path
+
+    def _get_sosreport(self, node):
+        node.exec_command(cmd="rpm -q sos || yum -y install sos", sudo=True)
+        out, _ = node.exec_command(
+            cmd="sos report -a --all-logs --batch",
+            sudo=True,
+            timeout=SOSREPORT_TIMEOUT,
+        )
+        sosreport = re.search(r"sosreport-\S+\.tar\.xz", out)
+        if not sosreport:
+            raise CommandFailed(f"No sosreport generated on {node.hostname}")
+
+        name = sosreport.group()
+        return self._stream(
+            node,
+            f"cat /var/tmp/{name} && rm -f /var/tmp/{name}*",
+            os.path.join(self.directory, "sosreports", name),
+            SOSREPORT_TIMEOUT,
+        )
+
+    def _get_ceph_logs(self, node):
+        # tar exits with 1 when the logs are written to while being archived
+        return self._stream(
+            node,
+            f"tar -czf - {CEPH_VAR_LOG_DIR}",
+            os.path.join(self.directory, "ceph_logs", f"{node.hostname}-cephlog.tar"),
+            SOSREPORT_TIMEOUT,
+            ok_codes=(0, 1),
+        )
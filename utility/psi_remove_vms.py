@@ -10,14 +10,16 @@
         ceph-ci             1 week
         ceph-core           1 weeks
 """
+from gevent import monkey
 
+monkey.patch_all()
 import smtplib
 import sys
 from datetime import datetime, timezone
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from types import SimpleNamespace
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 
 import yaml
 from docopt import docopt
@@ -25,7 +27,8 @@ from libcloud.compute.providers import get_driver
 from libcloud.compute.types import Provider
 
 from ceph.parallel import parallel
-from compute.openstack import CephVMNodeV2, Node
+from compute.openstack import Node
+from compute.teardown import delete_node, openstack_teardown, task_name
 
 doc = """
 Red Hat OpenStack Instance Removal Utility.
@@ -68,24 +71,21 @@ def add_key_to_ref(
         ref.update({email: {category: {tenant: [vm_name]}}})
 
 
-def cleanup(
-    osp_identity, osp_cred: Dict, node: Node, results: Dict, tenant: str
-) -> None:
+def cleanup(osp_identity, node: Node, results: Dict, tenant: str) -> Optional[Tuple]:
     """
-    Removes VMs whose subscription has expired.
+    Checks whether the subscription of the VM has expired.
 
     The instances are not removed if they have do-not-delete or is locked. They are
-    deleted if they have crossed the specified duration.
+    to be deleted if they have crossed the specified duration or are in error state.
 
     Arguments:
          osp_identity   Class Object of libcloud
-         osp_cred       Credential information for accessing the cloud
          node           The NodeDriver instance of the VM
          results        Captures the results of the operation
          tenant         The project to which the node belongs
 
     Returns:
-        None
+        (node, owner) when the node has to be removed else None
     """
     try:
         user_ = osp_identity.get_user(node.extra["userId"])
@@ -109,28 +109,48 @@ def cleanup(
     else:
         add_key_to_ref(results, "error", user_.email, node.name, tenant)
 
-    try:
-        ceph_node = CephVMNodeV2(
-            username=osp_cred["username"],
-            password=osp_cred["password"],
-            auth_url=osp_cred["auth-url"],
-            auth_version=osp_cred["auth-version"],
-            tenant_name=tenant,
-            tenant_domain_id=osp_cred["tenant-domain-id"],
-            service_region=osp_cred["service-region"],
-            domain_name=osp_cred["domain"],
-            node_name=node.name,
-        )
-
-        ceph_node.delete()
+    return node, user_
+
+
+def remove_nodes(osp_driver, expired: List[Tuple], results: Dict, tenant: str) -> None:
+    """
+    Removes the expired VMs along with their volumes.
+
+    VMs that are still being built are left for the next run and the floating IPs
+    of the rest are released before they are destroyed.
+
+    Arguments:
+         osp_driver     The libcloud driver of the tenant
+         expired        (node, owner) of the VMs to be removed
+         results        Captures the results of the operation
+         tenant         The project to which the nodes belong
+
+    Returns:
+        None
+    """
+    nodes = [node for node, _ in expired]
+    volume_ids = {
+        vol["id"] for node in nodes for vol in node.extra.get("volumes_attached", [])
+    }
+    volumes = [vol for vol in osp_driver.list_volumes() if vol.id in volume_ids]
+    summary = openstack_teardown(
+        osp_driver, nodes, volumes, node_action=delete_node
+    ).run()
+
+    for node, user_ in expired:
+        if task_name("node", node) not in summary.removed:
+            reason = summary.failed.get(task_name("node", node)) or summary.skipped.get(
+                task_name("node", node)
+            )
+            print(f"For Node:{node.name} exception occurred is {reason}")
+            add_key_to_ref(results, "marked", user_.email, node.name, tenant)
+            continue
+
         if user_.name == "psi-ceph-jenkins":
             # PSI Ceph Jenkins is a service account. Hence, ignoring email
-            return
+            continue
 
         add_key_to_ref(results, "deleted", user_.email, node.name, tenant)
-    except BaseException as e:  # noqa
-        print(f"For Node:{node.name} exception occurred is {e}")
-        add_key_to_ref(results, "marked", user_.email, node.name, tenant)
 
 
 def send_email(payload: Dict) -> list:
@@ -249,7 +269,11 @@ def run(args: Dict) -> int:
 
             with parallel() as p:
                 for node in osp_driver.list_nodes():
-                    p.spawn(cleanup, osp_identity, osp_cred, node, results, tenant)
+                    p.spawn(cleanup, osp_identity, node, results, tenant)
+
+                expired = [result for result in p if result]
+
+            remove_nodes(osp_driver, expired, results, tenant)
 
     response = send_email(results)
 
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """Utility to remove orphaned volumes."""
-from gevent import monkey, sleep
+from gevent import monkey
 
 monkey.patch_all()
 import sys
@@ -11,7 +11,7 @@ from docopt import docopt
 from libcloud.compute.providers import get_driver
 from libcloud.compute.types import Provider
 
-from ceph.parallel import parallel
+from compute.teardown import openstack_teardown
 
 doc = """
 Utility to cleanup orphaned volumes.
@@ -52,16 +52,6 @@ def get_openstack_driver(yaml, project):
     return driver
 
 
-def volume_cleanup(volume, driver):
-    """Detach and delete a particular volume."""
-    print("Removing volume", volume.name)
-    try:
-        driver.detach_volume(volume)
-        driver.destroy_volume(volume)
-    except BaseException as e:
-        print(e)
-
-
 def cleanup_ceph_vols(osp_cred):
     """Cleanup stale volumes with satus deleting, error."""
     projects = ["ceph-jenkins", "ceph-core", "ceph-ci", "ceph-sys-test", "ceph-perf"]
@@ -69,20 +59,23 @@ def cleanup_ceph_vols(osp_cred):
     for each_project in projects:
         print("Checking in project : ", each_project)
         driver = get_openstack_driver(osp_cred, each_project)
-        with parallel() as p:
-            for volume in driver.list_volumes():
-                if volume.state not in vol_states:
+        volumes = list()
+        for volume in driver.list_volumes():
+            if volume.state not in vol_states:
+                continue
+            if volume.state == "available":
+                create_datetime = datetime.strptime(
+                    volume.extra["created_at"], "%Y-%m-%dT%H:%M:%S.%f"
+                )
+                allowed_duration = create_datetime + timedelta(minutes=30)
+                if allowed_duration > datetime.utcnow():
                     continue
-                if volume.state == "available":
-                    create_datetime = datetime.strptime(
-                        volume.extra["created_at"], "%Y-%m-%dT%H:%M:%S.%f"
-                    )
-                    allowed_duration = create_datetime + timedelta(minutes=30)
-                    if allowed_duration > datetime.utcnow():
-                        continue
-                p.spawn(volume_cleanup, volume, driver)
-                sleep(1)
-        sleep(10)
+            volumes.append(volume)
+
+        summary = openstack_teardown(driver, volumes=volumes).run()
+        print(f"Removed {len(summary.removed)} volumes from {each_project}")
+        for name, reason in {**summary.failed, **summary.skipped}.items():
+            print(f"Failed to remove {name}: {reason}")
 
 
 def run(args):
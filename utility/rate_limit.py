@@ -0,0 +1,59 @@
+import threading
+from time import monotonic, sleep
+
+
+class TokenBucket(object):
+    """
+    Limit the rate of operations, allowing short bursts.
+
+    Tokens are added at the given rate up to the burst size and every operation
+    consumes one. Callers block till a token is available, in the order they
+    arrived::
+
+        bucket = TokenBucket(rate=0.5, burst=4)
+        for node in nodes:
+            bucket.acquire()
+            create(node)
+    """
+
+    def __init__(self, rate, burst=1):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate: tokens added per second
+            burst: maximum number of tokens held by the bucket
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+
+        self.rate = float(rate)
+        self.burst = burst
+        self.waited = 0.0
+        self._tokens = float(burst)
+        self._updated = monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Wait for a token and consume it.
+
+        Returns:
+            seconds spent waiting for the token
+        """
+        with self._lock:
+            self._refill()
+            wait = 0.0
+            if self._tokens < 1:
+                wait = (1 - self._tokens) / self.rate
+                sleep(wait)
+                self._refill()
+
+            self._tokens -= 1
+            self.waited += wait
+
+        return wait
@@ -9,13 +9,19 @@ then upload all the collected logs to magna/directory(run_dir) provided
   python sosreport.py -h
 """
 
+import datetime
 import os
 import re
 import sys
 
-import paramiko
 from docopt import docopt
 
+from ceph.ceph import SSHSessionPool, read_channel
+from ceph.parallel import parallel
+
+# Number of nodes whose sosreports are generated at a time.
+MAX_WORKERS = 8
+
 doc = """
 Standard script to collect all the logs from ceph cluster
 
@@ -32,6 +38,26 @@ Standard script to collect all the logs from ceph cluster
 """
 
 
+def execute(connection, cmd: str, timeout: int = 3600, stream=None) -> tuple:
+    """Execute the command over a channel of the pooled connection.
+
+    Args:
+       connection          SSHConnectionManager of the host
+       cmd                 command to be executed
+       timeout             maximum time allowed for the command
+       stream              callable fed with the stdout data as it arrives
+
+    Returns:
+        tuple of stdout and exit status
+    """
+    with connection.open_channel(timeout=timeout) as channel:
+        channel.settimeout(timeout)
+        channel.exec_command(cmd)
+        end_time = datetime.datetime.now() + datetime.timedelta(seconds=timeout)
+        out, _ = read_channel(channel, end_time, timeout, log=False, stream=stream)
+        return out, channel.recv_exit_status()
+
+
 def generate_sosreport_in_node(
     nodeip: str, uname: str, pword: str, directory: str, results: list
 ) -> None:
@@ -49,33 +75,32 @@ def generate_sosreport_in_node(
     """
     print(f"Connecting {nodeip} to generate sosreport")
     try:
-        ssh_d = paramiko.SSHClient()
-        ssh_d.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh_d.connect(nodeip, username=uname, password=pword)
-        ssh_d.exec_command("sudo yum -y install sos")
-        stdin, stdout, stderr = ssh_d.exec_command(
-            "sudo sos report -a --all-logs --batch"
-        )
-        rc = stdout.channel.recv_exit_status()
-        sosreport = re.search(r"sosreport-.*.tar.xz", stdout.read().decode())
-        if rc and not sosreport:
+        ssh_d = SSHSessionPool.get(nodeip, uname, pword)
+        execute(ssh_d, "rpm -q sos || sudo yum -y install sos")
+        out, rc = execute(ssh_d, "sudo sos report -a --all-logs --batch")
+        sosreport = re.search(r"sosreport-\S+\.tar\.xz", out)
+        if not sosreport:
             print(f"Failed to generate sosreport {nodeip}")
             results.append(nodeip)
             return
         source_file = f"/var/tmp/{sosreport.group()}"
-        ssh_d.exec_command(f"sudo chown {uname} {source_file}")
         directory_path = os.path.join(directory, "sosreports")
-        dir_exist = os.path.exists(directory_path)
-        if not dir_exist:
-            os.makedirs(directory_path)
-        ftp_client = ssh_d.open_sftp()
-        ftp_client.get(f"{source_file}", f"{directory_path}/{sosreport.group()}")
-        ftp_client.close()
+        os.makedirs(directory_path, exist_ok=True)
+
+        # Stream the report over the connection instead of a separate SFTP session
+        with open(f"{directory_path}/{sosreport.group()}", "wb") as fp:
+            _, rc = execute(
+                ssh_d,
+                f"sudo cat {source_file} && sudo rm -f {source_file}*",
+                stream=fp.write,
+            )
+        if rc:
+            print(f"Failed to copy sosreport from {nodeip}")
+            results.append(nodeip)
+            return
         print(
             f"Successfully generated sosreport for node {nodeip} :{sosreport.group()}"
         )
-        ssh_d.exec_command(f"sudo rm -rf {source_file}")
-        ssh_d.close()
     except Exception:
         results.append(nodeip)
 
@@ -100,21 +125,20 @@ def run(installer_ip: str, uname: str, pword: str, directory: str) -> int:
     """
     results = []
 
-    ssh_install = paramiko.SSHClient()
-    ssh_install.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    ssh_install.connect(installer_ip, username=uname, password=pword)
-    stdin, stdout, stderr = ssh_install.exec_command("hostname")
-    if "installer" not in stdout.read().decode():
+    ssh_install = SSHSessionPool.get(installer_ip, uname, pword)
+    out, _ = execute(ssh_install, "hostname")
+    if "installer" not in out:
         raise AssertionError("Please provide installer node details")
-    stdin, stdout, stderr = ssh_install.exec_command(
-        "cut -f 1 /etc/hosts | cut -d ' ' -f 3"
-    )
-    nodes = stdout.read().decode().split("\n")
+    out, _ = execute(ssh_install, "cut -f 1 /etc/hosts | cut -d ' ' -f 3")
+    nodes = out.split("\n")
 
     print(f"Host that are obtained from given host: {nodes}")
-    for nodeip in nodes:
-        if nodeip:
-            generate_sosreport_in_node(nodeip, uname, pword, directory, results)
+    with parallel(max_workers=MAX_WORKERS) as p:
+        for nodeip in nodes:
+            if nodeip:
+                p.spawn(
+                    generate_sosreport_in_node, nodeip, uname, pword, directory, results
+                )
     print(f"\n\nFailed to collect logs from nodes :{results}")
     return 1 if results else 0
 
@@ -26,6 +26,7 @@ from jinja2 import Environment, FileSystemLoader, select_autoescape
 from jinja_markdown import MarkdownExtension
 from reportportal_client import ReportPortalService
 
+from cli.utilities.manifest import get_manifest
 from utility.log import Log
 
 log = Log(__name__)
@@ -654,12 +655,8 @@ def fuse_client_md5(fuse_clients, md5sum_list1):
     try:
         log.info("Calculating MD5 sums of files in fuse-clients:")
         for client in fuse_clients:
-            md5sum_list1.append(
-                client.exec_command(
-                    cmd="sudo md5sum %s* | awk '{print $1}' " % (mounting_dir),
-                    long_running=True,
-                )
-            )
+            manifest = get_manifest(client, mounting_dir, recursive=False)
+            md5sum_list1.append([entry.digest for entry in manifest])
 
     except Exception as e:
         log.error(e)
@@ -669,12 +666,8 @@ def kernel_client_md5(kernel_clients, md5sum_list2):
     try:
         log.info("Calculating MD5 sums of files in kernel-clients:")
         for client in kernel_clients:
-            md5sum_list2.append(
-                client.exec_command(
-                    cmd="sudo md5sum %s* | awk '{print $1}' " % (mounting_dir),
-                    long_running=True,
-                )
-            )
+            manifest = get_manifest(client, mounting_dir, recursive=False)
+            md5sum_list2.append([entry.digest for entry in manifest])
     except Exception as e:
         log.error(e)
 
@@ -1158,6 +1151,7 @@ def create_html_file(test_result) -> str:
         run_dir (str): log directory path
         run_time (dict): suite total duration info
         info (dict): General information about the test run
+        performance (dict): summary of the performance samples of the tests
 
     Returns: HTML file
     """
@@ -1175,6 +1169,7 @@ def create_html_file(test_result) -> str:
 
     # Check for cluster info
     cluster_info = test_result.get("cluster_info", None)
+    performance = test_result.get("performance", None)
 
     # we are checking for /ceph/cephci-jenkins to see if the magna is already mounted
     # on system we are executing
@@ -1203,6 +1198,7 @@ def create_html_file(test_result) -> str:
         use_abs_log_link=True,
         prefix=prefix,
         cluster_info=cluster_info,
+        performance=performance,
     )
 
     # Result.html file is stored in the folder containing the log files.
@@ -1218,6 +1214,7 @@ def create_html_file(test_result) -> str:
         use_abs_log_link=False,
         cluster_info=cluster_info,
         prefix=prefix,
+        performance=performance,
     )
 
     abs_path = os.path.join(run_dir, "index.html")